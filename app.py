@@ -1,24 +1,18 @@
+# First import: the startup clock starts when this module loads
+from src.utils.startup import startup_profile
 import os
 import logging
 from flask import Flask, render_template, jsonify, request
 from src.controllers.presentation_controller import PresentationController
+from src.services import export_renderer
+from src.utils.logging_config import configure_logging
 from werkzeug.exceptions import HTTPException
 import traceback
 
-# Configure logging
-log_dir = "logs"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(log_dir, 'app.log')),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging (LOG_* settings) for the whole application
+configure_logging()
 logger = logging.getLogger(__name__)
+startup_profile.mark('imports')
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
@@ -26,11 +20,18 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 # Initialize and register controllers
 presentation_controller = PresentationController()
 app.register_blueprint(presentation_controller.blueprint, url_prefix='/api')
+startup_profile.mark('init')
+startup_profile.report()
+
+# Renderers otherwise load on the first export
+if os.getenv("RENDERER_WARMUP", "false").lower() in ("1", "true", "yes"):
+    export_renderer.start_warm_up(on_done=lambda seconds: startup_profile.record('renderer_warm_up', seconds))
 
 @app.before_request
 def log_request_info():
     """Log request details for debugging."""
-    if request.path != '/favicon.ico':  # Skip favicon requests
+    # Skip favicon requests and readiness probes, and the work of copying headers unless DEBUG is on
+    if request.path not in ('/favicon.ico', '/ready') and logger.isEnabledFor(logging.DEBUG):
         logger.debug('Headers: %s', dict(request.headers))
         if request.is_json:
             logger.debug('Body: %s', request.get_data())
@@ -38,7 +39,7 @@ def log_request_info():
 @app.after_request
 def after_request(response):
     """Log response details."""
-    if request.path != '/favicon.ico':  # Skip favicon requests
+    if request.path not in ('/favicon.ico', '/ready'):  # Skip favicon requests and readiness probes
         logger.info(f'{request.method} {request.path} {response.status_code}')
     return response
 
@@ -62,6 +63,12 @@ def index():
     logger.info('Serving index page')
     return render_template('index.html')
 
+@app.route('/ready')
+def ready():
+    """Readiness probe for load balancers; 503 while this worker should not get traffic."""
+    payload, is_ready = presentation_controller.readiness()
+    return jsonify(payload), 200 if is_ready else 503
+
 if __name__ == '__main__':
     logger.info('Starting Flask application...')
     # Ensure the presentations directory exists
@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import SyncToAsync
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+from app import app, presentation_controller
+
+logger = logging.getLogger(__name__)
+
+class _ThreadedWsgiToAsgiInstance(WsgiToAsgiInstance):
+    """Runs the WSGI app on a thread pool.
+
+    asgiref runs every WSGI request on one shared thread by default, which
+    would serialize exports and streams behind each other.
+    """
+
+    def __init__(self, wsgi_application, executor: ThreadPoolExecutor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        # The parent wraps the sync method in a thread-sensitive SyncToAsync; rewrap the plain function
+        run = SyncToAsync(WsgiToAsgiInstance.__dict__['run_wsgi_app'].func,
+                          thread_sensitive=False, executor=self.executor)
+        await run(self, body)
+
+class _ThreadedWsgiToAsgi(WsgiToAsgi):
+    def __init__(self, wsgi_application, executor: ThreadPoolExecutor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def __call__(self, scope, receive, send):
+        await _ThreadedWsgiToAsgiInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+class GenerationASGIApp:
+    """ASGI front for the Flask app.
+
+    ``POST /api/generate`` spends nearly all its time waiting on the model, so
+    it is served on the event loop with the async LLM client: a waiting request
+    holds no thread, and one worker process can keep hundreds of generations in
+    flight. Every other route (exports, jobs, stored decks, streaming, stats,
+    pages) is the unchanged Flask app, run on a thread pool of
+    ASGI_SYNC_THREADS threads.
+    """
+
+    def __init__(self, controller, wsgi_app, sync_threads: int = 32):
+        self.controller = controller
+        self.max_body_bytes = wsgi_app.config.get('MAX_CONTENT_LENGTH')
+        self.executor = ThreadPoolExecutor(max_workers=sync_threads, thread_name_prefix='wsgi')
+        self.fallback = _ThreadedWsgiToAsgi(wsgi_app, self.executor)
+        self.routes = {
+            ('POST', '/api/generate'): controller.generate_preview_async,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        handler = self.routes.get((scope.get('method'), scope.get('path'))) if scope['type'] == 'http' else None
+        if handler is None:
+            await self.fallback(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            payload, status, headers = {'error': 'Request body is too large'}, 413, {}
+        else:
+            payload, status, headers = await handler(body, self._client_key(scope))
+        await self._send_json(send, payload, status, headers)
+        logger.info(f"{scope['method']} {scope['path']} {status}")
+
+    async def _read_body(self, receive):
+        """Read the whole request body, or None if it exceeds MAX_CONTENT_LENGTH."""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if self.max_body_bytes and size > self.max_body_bytes:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+
+    def _client_key(self, scope) -> str:
+        remote_addr = scope['client'][0] if scope.get('client') else None
+        headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope.get('headers', [])}
+        return self.controller.client_key(remote_addr, headers)
+
+    @staticmethod
+    async def _send_json(send, payload: dict, status: int, headers: dict) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('ascii')),
+            ] + [(name.lower().encode('latin-1'), str(value).encode('latin-1')) for name, value in headers.items()],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                logger.info('Starting ASGI application...')
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                # Async connections can only be closed from the loop that opened them
+                await self.controller.llm_service.aclose()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+application = GenerationASGIApp(
+    presentation_controller, app,
+    sync_threads=int(os.getenv("ASGI_SYNC_THREADS", "32"))
+)
@@ -0,0 +1,148 @@
+"""Benchmark the single-pass PresentationSchema against the previous validation chain.
+
+Usage: python scripts/benchmark_validation.py [--slides N] [--rounds N]
+
+The legacy chain is reproduced here as it was in LLMService: regex cleanup of
+the raw text, json.loads, the deck-level check, a per-slide check loop and a
+recursive clean of every string. Both paths must produce identical output.
+Timings are reported for the full chain and for the validate-and-clean stage
+alone, since parsing the raw text is shared by both.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from html import unescape
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.services.presentation_schema import PRESENTATION_SCHEMA  # noqa: E402
+
+def legacy_clean_json_string(json_str):
+    json_str = re.sub(r'```json\s*|\s*```', '', json_str)
+    json_str = json_str.strip()
+    return re.sub(r',(\s*[}\]])', r'\1', json_str)
+
+def legacy_validate_presentation_data(data):
+    if any(field not in data for field in ('title', 'subtitle', 'slides')):
+        return False
+    if not isinstance(data['title'], str) or not data['title'].strip():
+        return False
+    if not isinstance(data['subtitle'], str) or not data['subtitle'].strip():
+        return False
+    return isinstance(data['slides'], list) and bool(data['slides'])
+
+def legacy_validate_slide(i, slide):
+    if not isinstance(slide, dict):
+        raise ValueError(f"Invalid slide {i+1}. Please try again.")
+    if not isinstance(slide.get('title'), str):
+        raise ValueError(f"Invalid title in slide {i+1}. Please try again.")
+    if slide.get('type') not in ['title', 'content', 'table']:
+        raise ValueError(f"Invalid type in slide {i+1}. Please try again.")
+    if slide.get('layout') not in ['centered', 'split', 'table']:
+        raise ValueError(f"Invalid layout in slide {i+1}. Please try again.")
+    content = slide.get('content', [])
+    if slide.get('type') == 'table':
+        if not isinstance(content, list) or not all(isinstance(row, list) for row in content):
+            raise ValueError(f"Invalid table content in slide {i+1}. Please try again.")
+    elif not isinstance(content, list) or not all(isinstance(item, str) for item in content):
+        raise ValueError(f"Invalid content in slide {i+1}. Please try again.")
+
+def legacy_clean_text(text):
+    text = re.sub(r'<[^>]+>', '', text)
+    text = unescape(text)
+    text = text.replace('*', '')
+    text = ' '.join(text.split())
+    return text.strip()
+
+def legacy_clean_content(content):
+    if isinstance(content, str):
+        return legacy_clean_text(content)
+    if isinstance(content, list):
+        return [legacy_clean_content(item) for item in content]
+    if isinstance(content, dict):
+        return {k: legacy_clean_content(v) for k, v in content.items()}
+    return content
+
+def legacy_validate_and_clean(data):
+    if not legacy_validate_presentation_data(data):
+        raise ValueError("incomplete")
+    for i, slide in enumerate(data['slides']):
+        legacy_validate_slide(i, slide)
+    return legacy_clean_content(data)
+
+def legacy_chain(raw):
+    return legacy_validate_and_clean(json.loads(legacy_clean_json_string(raw)))
+
+def schema_chain(raw):
+    return PRESENTATION_SCHEMA.normalize(json.loads(legacy_clean_json_string(raw)))
+
+def make_deck(slide_count):
+    slides = [{
+        'title': 'Benchmark Deck',
+        'type': 'title',
+        'layout': 'centered',
+        'content': ['A deck used to time validation']
+    }]
+    for i in range(1, slide_count):
+        if i % 4 == 0:
+            slides.append({
+                'title': f'Comparison {i}',
+                'type': 'table',
+                'layout': 'table',
+                'content': [['Option', 'Cost', 'Notes']] + [
+                    [f'Option {r}', f'${r * 10}', 'Plain cell text' if r % 2 else '<b>Bold</b> &amp; *starred*']
+                    for r in range(6)
+                ]
+            })
+        else:
+            slides.append({
+                'title': f'Section {i}',
+                'type': 'content',
+                'layout': 'split' if i % 2 else 'centered',
+                'content': [
+                    'A plain bullet point with ordinary text',
+                    'Another point that needs no cleaning at all',
+                    '**Highlighted** point with <em>markup</em> &amp; entities',
+                    'Point with   irregular\nwhitespace ',
+                ]
+            })
+    return json.dumps({
+        'title': 'Benchmark Deck',
+        'subtitle': 'Validation timing',
+        'theme': {'primary_color': '#0072C6', 'secondary_color': '#404040',
+                  'accent_color': '#00B294', 'background_color': '#FFFFFF'},
+        'slides': slides
+    }, indent=2)
+
+def time_it(fn, arg, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(arg)
+    return (time.perf_counter() - start) / rounds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--slides', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    raw = make_deck(args.slides)
+    assert legacy_chain(raw) == schema_chain(raw), "schema output differs from the legacy chain"
+
+    data = json.loads(legacy_clean_json_string(raw))
+    print(f"Deck: {args.slides} slides, {len(raw)} bytes, {args.rounds} rounds")
+    for label, legacy_fn, schema_fn, arg in (
+        ('parse + validate + clean', legacy_chain, schema_chain, raw),
+        ('validate + clean only', legacy_validate_and_clean, PRESENTATION_SCHEMA.normalize, data),
+    ):
+        legacy = time_it(legacy_fn, arg, args.rounds)
+        schema = time_it(schema_fn, arg, args.rounds)
+        print(f"{label}:")
+        print(f"  legacy : {legacy * 1e6:8.1f} us/deck")
+        print(f"  schema : {schema * 1e6:8.1f} us/deck  ({legacy / schema:.2f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import logging
+import os
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.workers.gthread import ThreadWorker
+
+logger = logging.getLogger(__name__)
+
+class RecyclingThreadWorker(ThreadWorker):
+    """gthread worker that hands no accepted connection over to its exit.
+
+    The stock worker stops when its request count reaches max_requests, and
+    drops connections it had accepted but not read yet. This one stops
+    accepting once its open connections (each brings at least one more
+    request) fill the rest of its budget, or once it is told to exit, and
+    leaves new connections in the shared backlog for the other workers. When
+    the last of its connections is done it exits.
+    """
+
+    accepting = True
+
+    def accept(self, server, listener):
+        if self.alive and self.nr + self.nr_conns < self.max_requests:
+            super().accept(server, listener)
+            return
+        if self.accepting:
+            self.accepting = False
+            with self._lock:
+                for sock in self.sockets:
+                    self.poller.unregister(sock)
+
+    def murder_keepalived(self):
+        super().murder_keepalived()
+        if not self.accepting and self.nr_conns == 0:
+            self.alive = False
+
+class PresentationServer(BaseApplication):
+    """Gunicorn master with the application preloaded.
+
+    The app is imported once in the master, which also warms up the export
+    renderers (WeasyPrint, python-pptx) that otherwise load on the first
+    export, and then SERVE_WORKERS workers are forked from it. The workers
+    share the listening socket and the already-loaded modules (copy-on-write),
+    so a new worker starts serving immediately.
+
+    Workers are recycled after SERVE_MAX_REQUESTS requests (plus up to
+    SERVE_MAX_REQUESTS_JITTER, so they do not all restart at once) to bound
+    memory growth. ``kill -HUP <master>`` replaces every worker gracefully;
+    ``kill -TERM`` lets in-flight requests finish for up to
+    SERVE_GRACEFUL_TIMEOUT seconds before shutting down.
+    """
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        if self.cfg.worker_class_str.startswith('uvicorn'):
+            from asgi import application
+        else:
+            from app import app as application
+        from app import presentation_controller
+        from src.services import export_renderer
+
+        # Before forking, so no worker pays for it on its first export
+        try:
+            seconds = export_renderer.warm_up()
+            logger.info(f"Renderers warmed up in {seconds:.2f}s")
+        except Exception as e:
+            # Generation still works; exports will report the renderer error
+            logger.error(f"Renderer warm-up failed: {str(e)}")
+
+        # SQLite connections must not cross a fork; each worker opens its own
+        presentation_controller.presentation_store.close()
+        return application
+
+def _post_fork(server, worker):
+    logger.info(f"Worker {worker.pid} forked from preloaded master")
+
+def options_from_env() -> dict:
+    """Gunicorn settings from the SERVE_* environment variables."""
+    worker_class = os.getenv("SERVE_WORKER_CLASS", "gthread")
+    return {
+        'bind': os.getenv("SERVE_BIND", "0.0.0.0:5000"),
+        'workers': int(os.getenv("SERVE_WORKERS", str((os.cpu_count() or 1) + 1))),
+        # Generation mostly waits on the model, so each worker serves several requests at once
+        'worker_class': worker_class if worker_class != 'gthread' else RecyclingThreadWorker,
+        'threads': int(os.getenv("SERVE_THREADS", "8")),
+        'preload_app': True,
+        'max_requests': int(os.getenv("SERVE_MAX_REQUESTS", "1000")),
+        'max_requests_jitter': int(os.getenv("SERVE_MAX_REQUESTS_JITTER", "100")),
+        'timeout': int(os.getenv("SERVE_TIMEOUT", "120")),
+        'graceful_timeout': int(os.getenv("SERVE_GRACEFUL_TIMEOUT", "30")),
+        'keepalive': int(os.getenv("SERVE_KEEPALIVE", "5")),
+        'accesslog': os.getenv("SERVE_ACCESS_LOG") or None,
+        'errorlog': '-',
+        'post_fork': _post_fork,
+    }
+
+if __name__ == '__main__':
+    PresentationServer(options_from_env()).run()
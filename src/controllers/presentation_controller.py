@@ -1,40 +1,58 @@
-from flask import Blueprint, jsonify, request, send_file, session, render_template
+from flask import Blueprint, jsonify, request, send_file, render_template, Response, stream_with_context, url_for, current_app
+import asyncio
 import logging
 import os
 import glob
 import json
-from typing import Tuple, Union
+from typing import Tuple
 from datetime import datetime, timedelta
-from weasyprint import HTML, CSS
-from pptx import Presentation as PPTXPresentation
-from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN
-from pptx.dml.color import RGBColor
+from ..services.admission import AdmissionRejectedError
 from ..services.llm_service import LLMService
-from ..services.presentation_generator import PresentationGenerator
-from ..models import Presentation, Theme, Slide
+from ..services.batch_service import BatchGenerationService
+from ..services.artifact_cache import ArtifactCache
+from ..services.fragment_cache import FragmentCache
+from ..services.export_jobs import ExportJob, ExportJobQueue, QueueFullError
+from ..services.presentation_store import PresentationStore, VersionConflictError
+from ..services import export_renderer
+from ..models import Presentation
+from ..utils import logging_config
+from ..utils.startup import startup_profile
 import io
 
-# Configure logging to write to both file and console
-log_dir = "logs"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(log_dir, 'app.log')),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+DEFAULT_THEME = {
+    'primary_color': '#0072C6',
+    'secondary_color': '#404040',
+    'accent_color': '#00B294',
+    'background_color': '#FFFFFF'
+}
+
+EXPORT_FORMATS = {
+    'pdf': {
+        'mimetype': 'application/pdf',
+        'download_name': 'presentation.pdf'
+    },
+    'pptx': {
+        'mimetype': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        'download_name': 'presentation.pptx'
+    }
+}
+
 class PresentationController:
     def __init__(self):
         self.blueprint = Blueprint('presentation', __name__)
         self.llm_service = LLMService()
-        self.presentation_generator = PresentationGenerator()
+        self.batch_service = BatchGenerationService(self.llm_service)
+        self.export_jobs = ExportJobQueue.from_env()
+        self.artifact_cache = ArtifactCache(
+            max_bytes=int(float(os.getenv("EXPORT_CACHE_MAX_MB", "128")) * 1024 * 1024)
+        )
+        self.presentation_store = PresentationStore.from_env()
+        self.fragment_cache = FragmentCache(
+            'html', max_entries=int(os.getenv("SLIDE_CACHE_MAX_ENTRIES", "2048"))
+        )
+        self.pdf_renderer = export_renderer.ParallelPDFRenderer.from_env()
         self.output_dir = "presentations"
         
         # Create output directory if it doesn't exist
@@ -43,8 +61,19 @@ class PresentationController:
 
         # Register routes
         self.blueprint.route('/generate', methods=['POST'])(self.generate_preview)
+        self.blueprint.route('/generate/stream', methods=['POST'])(self.generate_stream)
+        self.blueprint.route('/generate/batch', methods=['POST'])(self.generate_batch)
         self.blueprint.route('/export/pdf', methods=['POST'])(self.export_pdf)
         self.blueprint.route('/export/ppt', methods=['POST'])(self.export_pptx)
+        self.blueprint.route('/export/jobs', methods=['POST'])(self.submit_export_job)
+        self.blueprint.route('/export/jobs/<job_id>', methods=['GET'])(self.get_export_job)
+        self.blueprint.route('/export/jobs/<job_id>', methods=['DELETE'])(self.cancel_export_job)
+        self.blueprint.route('/export/jobs/<job_id>/result', methods=['GET'])(self.get_export_job_result)
+        self.blueprint.route('/presentations/<presentation_id>', methods=['GET'])(self.get_presentation)
+        self.blueprint.route('/presentations/<presentation_id>', methods=['PATCH'])(self.patch_presentation)
+        self.blueprint.route('/presentations/<presentation_id>', methods=['DELETE'])(self.delete_presentation)
+        self.blueprint.route('/presentations/<presentation_id>/preview', methods=['GET'])(self.preview_presentation)
+        self.blueprint.route('/stats', methods=['GET'])(self.get_stats)
         
         # Clean up old presentations
         self.cleanup_old_presentations()
@@ -69,58 +98,20 @@ class PresentationController:
     def generate_preview(self):
         """Generate presentation content and return HTML preview."""
         try:
-            data = request.get_json()
-            if not data:
-                logger.error("No data provided in request")
-                return jsonify({'error': 'No data provided'}), 400
-                
-            topic = data.get('topic')
-            if not topic or not topic.strip():
-                logger.error("No topic provided")
-                return jsonify({'error': 'Please provide a presentation topic'}), 400
-                
-            style = data.get('style', 'corporate')
-            logger.info(f"Generating presentation preview for topic: {topic}, style: {style}")
+            data = request.get_json(silent=True)
+            topic, options, error = self._generation_request(data)
+            if error:
+                return jsonify({'error': error}), 400
             
             try:
                 # Generate content using LLM service
-                content_data = self.llm_service.generate_presentation_content(topic)
-                
-                # Add theme if not present
-                if 'theme' not in content_data:
-                    content_data['theme'] = {
-                        'primary_color': '#0072C6',
-                        'secondary_color': '#404040',
-                        'accent_color': '#00B294',
-                        'background_color': '#FFFFFF'
-                    }
-
-                return jsonify({
-                    'presentation': content_data
-                })
-                
-            except ValueError as e:
-                # Handle validation errors with specific messages
-                error_msg = str(e)
-                logger.error(f"Validation error: {error_msg}")
-                return jsonify({
-                    'error': error_msg
-                }), 400
-                
-            except ConnectionError as e:
-                # Handle LLM service connection errors
-                error_msg = str(e)
-                logger.error(f"LLM service error: {error_msg}")
-                return jsonify({
-                    'error': error_msg
-                }), 503
-                
+                content_data = self.llm_service.generate_presentation_content(
+                    topic, client=self.client_key(request.remote_addr, request.headers), **options
+                )
+                return jsonify(self._preview_payload(content_data))
             except Exception as e:
-                # Handle unexpected errors
-                logger.error(f"Unexpected error in LLM service: {str(e)}", exc_info=True)
-                return jsonify({
-                    'error': 'An unexpected error occurred while generating the presentation. Please try again with a different topic.'
-                }), 500
+                payload, status, headers = self._generation_error(e)
+                return jsonify(payload), status, headers
 
         except Exception as e:
             # Handle request processing errors
@@ -129,50 +120,355 @@ class PresentationController:
                 'error': 'An error occurred while processing your request. Please try again.'
             }), 500
 
-    def export_pdf(self):
-        """Export presentation as PDF."""
+    async def generate_preview_async(self, body: bytes, client: str) -> Tuple[dict, int, dict]:
+        """Async version of generate_preview for the ASGI app; returns the JSON payload, status and headers.
+
+        The LLM round trip is awaited on the event loop instead of holding a
+        worker thread. Storing the deck touches SQLite, so it runs in a thread.
+        """
         try:
-            data = request.get_json()
-            if not data or 'presentation' not in data:
-                return jsonify({'error': 'No presentation data provided'}), 400
+            try:
+                data = json.loads(body) if body else None
+            except ValueError:
+                data = None
+            topic, options, error = self._generation_request(data)
+            if error:
+                return {'error': error}, 400, {}
 
-            # Generate HTML with print-optimized styles
-            html = render_template('presentation.html', 
-                                 presentation=data['presentation'],
-                                 print_mode=True)
+            try:
+                content_data = await self.llm_service.agenerate_presentation_content(topic, client=client, **options)
+                return await asyncio.to_thread(self._preview_payload, content_data), 200, {}
+            except Exception as e:
+                return self._generation_error(e)
 
-            # Create temporary HTML file for WeasyPrint
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            temp_html_path = os.path.join(self.output_dir, f"temp_{timestamp}.html")
-            
-            with open(temp_html_path, 'w', encoding='utf-8') as f:
-                f.write(html)
-
-            # Configure WeasyPrint with custom settings
-            css = CSS(string='''
-                @page {
-                    size: 1280px 720px;
-                    margin: 0;
-                }
-                body { margin: 0; }
-            ''')
-            
-            pdf = HTML(filename=temp_html_path).write_pdf(
-                stylesheets=[css],
-                presentational_hints=True
-            )
+        except Exception as e:
+            logger.error(f"Error processing request: {str(e)}", exc_info=True)
+            return {'error': 'An error occurred while processing your request. Please try again.'}, 500, {}
+
+    def client_key(self, remote_addr: str, headers) -> str:
+        """The client a generation request is queued and rate-limited under."""
+        return self.llm_service.admission.client_key(remote_addr, headers)
+
+    @staticmethod
+    def _generation_request(data) -> Tuple[str, dict, str]:
+        """Read the topic and generation options from a request body; the last item is an error message."""
+        if not data or not isinstance(data, dict):
+            logger.error("No data provided in request")
+            return None, None, 'No data provided'
             
-            # Clean up temporary HTML file
-            os.remove(temp_html_path)
+        topic = data.get('topic')
+        if not isinstance(topic, str) or not topic.strip():
+            logger.error("No topic provided")
+            return None, None, 'Please provide a presentation topic'
             
-            # Return PDF as attachment
-            return send_file(
-                io.BytesIO(pdf),
-                mimetype='application/pdf',
-                as_attachment=True,
-                download_name='presentation.pdf'
+        style = data.get('style', 'corporate')
+        options = {
+            # 'fresh' lets users skip the response cache and get a newly generated deck
+            'use_cache': not bool(data.get('fresh', False)),
+            # 'mode' selects single-call or outline-then-fan-out generation
+            'mode': data.get('mode'),
+            # 'slide_count' asks for an exact number of slides and scales the token budget to it
+            'slide_count': data.get('slide_count')
+        }
+        logger.info(f"Generating presentation for topic: {topic}, style: {style}, "
+                    f"use_cache: {options['use_cache']}, mode: {options['mode']}, slide_count: {options['slide_count']}")
+        return topic, options, None
+
+    def _preview_payload(self, content_data: dict) -> dict:
+        # Add theme if not present
+        if 'theme' not in content_data:
+            content_data['theme'] = dict(DEFAULT_THEME)
+
+        # Keep the deck server-side so exports and edits can refer to it by id
+        return {
+            'presentation': content_data,
+            **self._store_presentation(content_data)
+        }
+
+    @staticmethod
+    def _generation_error(e: Exception) -> Tuple[dict, int, dict]:
+        """Map a generation failure to an error payload, status code and response headers."""
+        if isinstance(e, AdmissionRejectedError):
+            # Too many generations in flight; tell the client when to come back
+            return {
+                'error': str(e),
+                'queue_position': e.queue_position,
+                'retry_after': e.retry_after
+            }, 429, {'Retry-After': str(e.retry_after)}
+        if isinstance(e, ValueError):
+            # Handle validation errors with specific messages
+            logger.error(f"Validation error: {str(e)}")
+            return {'error': str(e)}, 400, {}
+        if isinstance(e, ConnectionError):
+            # Handle LLM service connection errors
+            logger.error(f"LLM service error: {str(e)}")
+            return {'error': str(e)}, 503, {}
+        # Handle unexpected errors
+        logger.error(f"Unexpected error in LLM service: {str(e)}", exc_info=e)
+        return {
+            'error': 'An unexpected error occurred while generating the presentation. Please try again with a different topic.'
+        }, 500, {}
+
+    @staticmethod
+    def _sse(event: str, payload: dict) -> str:
+        """Format a single Server-Sent Events message."""
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    def generate_stream(self):
+        """Generate presentation content and stream each slide as a Server-Sent Event."""
+        topic, options, error = self._generation_request(request.get_json(silent=True))
+        if error:
+            return jsonify({'error': error}), 400
+
+        try:
+            events = self.llm_service.stream_presentation_content(
+                topic, client=self.client_key(request.remote_addr, request.headers), **options
             )
+        except (ValueError, AdmissionRejectedError) as e:
+            payload, status, headers = self._generation_error(e)
+            return jsonify(payload), status, headers
+
+        def event_stream():
+            # Assemble the deck as it streams so it can be stored once complete
+            deck, slides = {}, {}
+            try:
+                for event, payload in events:
+                    if event == 'meta':
+                        deck.update(payload)
+                    elif event == 'slide':
+                        slides[payload['index']] = payload['slide']
+                    elif event == 'done':
+                        deck['slides'] = [slides[index] for index in sorted(slides)]
+                        if 'theme' not in deck:
+                            deck['theme'] = dict(DEFAULT_THEME)
+                            yield self._sse('meta', {'theme': deck['theme']})
+                        payload = {**payload, **self._store_presentation(deck)}
+                    yield self._sse(event, payload)
+            except ValueError as e:
+                logger.error(f"Validation error: {str(e)}")
+                yield self._sse('error', {'error': str(e), 'status': 400})
+            except ConnectionError as e:
+                logger.error(f"LLM service error: {str(e)}")
+                yield self._sse('error', {'error': str(e), 'status': 503})
+            except Exception as e:
+                logger.error(f"Unexpected error while streaming: {str(e)}", exc_info=True)
+                yield self._sse('error', {
+                    'error': 'An unexpected error occurred while generating the presentation. Please try again with a different topic.',
+                    'status': 500
+                })
+
+        return Response(
+            stream_with_context(event_stream()),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
+    def generate_batch(self):
+        """Generate presentations for a list of topics and stream results as NDJSON."""
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data, dict):
+            logger.error("No data provided in request")
+            return jsonify({'error': 'No data provided'}), 400
+
+        topics = data.get('topics')
+        options = data.get('options') or {}
+        if not isinstance(options, dict):
+            logger.error(f"Invalid batch options: {options!r}")
+            return jsonify({'error': 'Batch options must be an object'}), 400
+        use_cache = not bool(options.get('fresh', False))
+        mode = options.get('mode')
+        slide_count = options.get('slide_count')
+
+        try:
+            concurrency = self.batch_service.validate(topics, options.get('concurrency', data.get('concurrency')))
+        except ValueError as e:
+            logger.error(f"Invalid batch request: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+
+        logger.info(f"Starting batch generation of {len(topics)} topics, concurrency: {concurrency}, mode: {mode}")
+        # Batch items queue under the caller's client key, so a batch waits its turn like any other client
+        client = self.client_key(request.remote_addr, request.headers)
+
+        def ndjson_stream():
+            for record in self.batch_service.run(topics, concurrency, use_cache=use_cache, mode=mode,
+                                                 slide_count=slide_count, client=client):
+                presentation = record.get('presentation')
+                if presentation is not None and 'theme' not in presentation:
+                    presentation['theme'] = dict(DEFAULT_THEME)
+                yield json.dumps(record) + '\n'
+
+        return Response(
+            stream_with_context(ndjson_stream()),
+            mimetype='application/x-ndjson',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
+    def get_stats(self):
+        """Return runtime statistics for the generation pipeline."""
+        return jsonify({
+            'llm': self.llm_service.get_stats(),
+            'export_jobs': self.export_jobs.stats(),
+            'export_cache': self.artifact_cache.stats(),
+            'pdf_renderer': self.pdf_renderer.stats(),
+            'presentation_store': self.presentation_store.stats(),
+            'slide_cache': {
+                'html': self.fragment_cache.stats(),
+                'pptx': export_renderer.pptx_slide_cache_stats()
+            },
+            'startup': startup_profile.stats(),
+            'logging': logging_config.stats()
+        })
+
+    def readiness(self) -> Tuple[dict, bool]:
+        """Whether this worker should be sent traffic, with the result of each check.
+
+        The model servers are shared by every worker, so their state is reported
+        but does not fail the check. A full admission queue does, so a load
+        balancer sends new work to another instance.
+        """
+        checks = {}
+        try:
+            self.presentation_store.ping()
+            checks['presentation_store'] = 'ok'
+        except Exception as e:
+            logger.error(f"Readiness check failed for the presentation store: {str(e)}")
+            checks['presentation_store'] = f'error: {str(e)}'
+
+        admission = self.llm_service.admission.stats()
+        queue_full = admission['enabled'] and admission['queued_now'] >= admission['max_queue']
+        checks['admission'] = 'full' if queue_full else 'ok'
+
+        backends = self.llm_service.router.stats()['backends']
+        checks['llm_backends'] = {
+            'healthy': sum(1 for backend in backends if backend['state'] == 'healthy'),
+            'total': len(backends)
+        }
+
+        ready = checks['presentation_store'] == 'ok' and not queue_full
+        return {'status': 'ready' if ready else 'not_ready', 'pid': os.getpid(), 'checks': checks}, ready
+
+    def _render_slide_fragment(self, presentation: dict, index: int, slide: dict, tally: dict = None) -> str:
+        """Render one print-mode slide, reusing the cached fragment when the slide is unchanged."""
+        is_title = index == 0
+        extra = {'is_title': is_title}
+        if is_title:
+            extra.update(title=presentation.get('title'), subtitle=presentation.get('subtitle'))
 
+        key = FragmentCache.make_key(slide, presentation.get('theme'), **extra)
+        fragment = self.fragment_cache.get(key, tally)
+        if fragment is None:
+            fragment = render_template('print_slide.html',
+                                       presentation=presentation,
+                                       slide=slide,
+                                       is_title=is_title)
+            self.fragment_cache.put(key, fragment)
+        return fragment
+
+    def _render_print_html(self, presentation: dict, slide_offset: int = 0, tally: dict = None) -> str:
+        """Render the print-mode HTML used for PDF export."""
+        fragments = [
+            self._render_slide_fragment(presentation, slide_offset + i, slide, tally)
+            for i, slide in enumerate(presentation.get('slides', []))
+        ]
+        return render_template('presentation.html',
+                               presentation=presentation,
+                               print_mode=True,
+                               slide_fragments=fragments)
+
+    def _render_pdf(self, presentation: dict, tally: dict = None) -> bytes:
+        """Render a PDF, splitting large decks into chunks laid out in parallel."""
+        slides = presentation.get('slides', [])
+        chunks = [
+            self._render_print_html({**presentation, 'slides': slides[bounds.start:bounds.stop]},
+                                    slide_offset=bounds.start, tally=tally)
+            for bounds in self.pdf_renderer.chunk_bounds(len(slides))
+        ]
+        return self.pdf_renderer.render(chunks, **self._pdf_render_options())
+
+    def _pdf_render_options(self) -> dict:
+        """Where WeasyPrint should resolve the template's static asset links."""
+        return {
+            'base_url': request.url_root,
+            'static_folder': current_app.static_folder,
+            'static_url_path': current_app.static_url_path
+        }
+
+    def _load_export_source(self, data: dict) -> Tuple[dict, dict]:
+        """Resolve an export request to the deck and the identity it is cached under.
+
+        Requests either reference a stored deck with ``presentation_id`` or post
+        the full ``presentation``. Stored decks are cached by id and version, so
+        the deck does not have to be hashed. Raises LookupError for unknown ids.
+        """
+        if data.get('presentation_id'):
+            stored = self.presentation_store.get(data['presentation_id'])
+            if stored is None:
+                raise LookupError(f"Presentation {data['presentation_id']} not found")
+            presentation, version = stored
+            return presentation, {'presentation_id': data['presentation_id'], 'version': version}
+        return data['presentation'], data['presentation']
+
+    @staticmethod
+    def _has_export_source(data: dict) -> bool:
+        return bool(data) and ('presentation' in data or bool(data.get('presentation_id')))
+
+    def _send_export(self, export_format: str, data: dict, render) -> Response:
+        """Serve an export from the artifact cache, rendering it only on a miss.
+
+        The cache key is also the ETag, so a client that already has the file
+        gets a 304 without the deck being rendered. ``render`` is called with
+        the deck and a dict it fills with slide cache hits and misses, which are
+        reported in the X-Slide-Cache-Hits / X-Slide-Cache-Misses headers.
+        """
+        presentation, identity = self._load_export_source(data)
+        key = ArtifactCache.make_key(identity, export_format, data.get('options'))
+        if request.if_none_match.contains(key):
+            self.artifact_cache.record_not_modified()
+            response = Response(status=304)
+            response.set_etag(key)
+            return response
+
+        tally = None
+        content = self.artifact_cache.get(key)
+        if content is None:
+            tally = {'hits': 0, 'misses': 0}
+            content = render(presentation, tally)
+            self.artifact_cache.put(key, content)
+            logger.info(f"Rendered {export_format} export {key[:12]} "
+                        f"(slide cache: {tally['hits']} hits, {tally['misses']} misses)")
+        else:
+            logger.info(f"Serving cached {export_format} export {key[:12]}")
+
+        # Return file as attachment
+        response = send_file(
+            io.BytesIO(content),
+            mimetype=EXPORT_FORMATS[export_format]['mimetype'],
+            as_attachment=True,
+            download_name=EXPORT_FORMATS[export_format]['download_name'],
+            etag=key
+        )
+        if tally is not None:
+            response.headers['X-Slide-Cache-Hits'] = str(tally['hits'])
+            response.headers['X-Slide-Cache-Misses'] = str(tally['misses'])
+        return response
+
+    def export_pdf(self):
+        """Export presentation as PDF."""
+        try:
+            data = request.get_json()
+            if not self._has_export_source(data):
+                return jsonify({'error': 'No presentation data provided'}), 400
+
+            return self._send_export('pdf', data, self._render_pdf)
+
+        except LookupError as e:
+            return jsonify({'error': str(e)}), 404
         except Exception as e:
             logger.error(f"Error in export_pdf: {str(e)}", exc_info=True)
             return jsonify({'error': f'Internal server error: {str(e)}'}), 500
@@ -181,82 +477,173 @@ class PresentationController:
         """Export presentation as PowerPoint."""
         try:
             data = request.get_json()
-            if not data or 'presentation' not in data:
+            if not self._has_export_source(data):
                 return jsonify({'error': 'No presentation data provided'}), 400
 
-            # Create PowerPoint presentation
-            prs = PPTXPresentation()
-            prs.slide_width = Inches(13.333)
-            prs.slide_height = Inches(7.5)
-
-            # Set theme colors
-            theme = data['presentation'].get('theme', {})
-            colors = {
-                'primary': RGBColor.from_string(theme.get('primary_color', '#0072C6').lstrip('#')),
-                'secondary': RGBColor.from_string(theme.get('secondary_color', '#404040').lstrip('#')),
-                'accent': RGBColor.from_string(theme.get('accent_color', '#00B294').lstrip('#')),
-                'background': RGBColor.from_string(theme.get('background_color', '#FFFFFF').lstrip('#')),
-                'text': RGBColor(0x00, 0x00, 0x00)  # Black
-            }
+            return self._send_export('pptx', data, export_renderer.render_pptx)
 
-            # Create slides
-            for slide_data in data['presentation']['slides']:
-                slide = prs.slides.add_slide(prs.slide_layouts[5])  # Blank layout
-                shapes = slide.shapes
-                
-                # Add title
-                title = shapes.title
-                title.text = slide_data['title']
-                title.text_frame.paragraphs[0].font.size = Pt(36)
-                title.text_frame.paragraphs[0].font.color.rgb = colors['primary']
-                
-                # Add content based on slide type
-                if slide_data['type'] == 'table':
-                    # Add table
-                    rows = len(slide_data['content'])
-                    cols = len(slide_data['content'][0]) if rows > 0 else 2
-                    
-                    left = Inches(2.0)
-                    top = Inches(2.0)
-                    width = Inches(9.0)
-                    height = Inches(4.0)
-                    
-                    table = shapes.add_table(rows, cols, left, top, width, height).table
-                    
-                    # Populate table
-                    for row_idx, row in enumerate(slide_data['content']):
-                        for col_idx, cell_text in enumerate(row):
-                            cell = table.cell(row_idx, col_idx)
-                            cell.text = str(cell_text)
-                            cell.text_frame.paragraphs[0].font.size = Pt(14)
-                            cell.text_frame.paragraphs[0].font.color.rgb = colors['text']
-                else:
-                    # Add text content
-                    content = slide_data.get('content', [])
-                    if isinstance(content, list):
-                        text_box = shapes.add_textbox(Inches(1), Inches(2), Inches(11), Inches(4))
-                        text_frame = text_box.text_frame
-                        
-                        for point in content:
-                            p = text_frame.add_paragraph()
-                            p.text = str(point)
-                            p.font.size = Pt(18)
-                            p.font.color.rgb = colors['text']
-                            p.level = 0
-            
-            # Save to BytesIO
-            pptx_stream = io.BytesIO()
-            prs.save(pptx_stream)
-            pptx_stream.seek(0)
-            
-            # Return PPTX as attachment
-            return send_file(
-                pptx_stream,
-                mimetype='application/vnd.openxmlformats-officedocument.presentationml.presentation',
-                as_attachment=True,
-                download_name='presentation.pptx'
+        except LookupError as e:
+            return jsonify({'error': str(e)}), 404
+        except ValueError as e:
+            logger.error(f"Invalid presentation data for pptx export: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            logger.error(f"Error in export_pptx: {str(e)}", exc_info=True)
+            return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+    def submit_export_job(self):
+        """Queue a PDF or PPTX export on the worker pool and return its job id."""
+        try:
+            data = request.get_json(silent=True)
+            if not self._has_export_source(data):
+                return jsonify({'error': 'No presentation data provided'}), 400
+
+            export_format = data.get('format', 'pdf')
+            if export_format not in EXPORT_FORMATS:
+                return jsonify({'error': f"Unsupported export format: {export_format}"}), 400
+
+            presentation, _ = self._load_export_source(data)
+
+            # Templates need the app context, so the HTML is rendered here and
+            # only the CPU-heavy layout work is shipped to the worker process
+            if export_format == 'pdf':
+                job = self.export_jobs.submit(
+                    export_format, export_renderer.render_pdf,
+                    self._render_print_html(presentation), **self._pdf_render_options()
+                )
+            else:
+                job = self.export_jobs.submit(export_format, export_renderer.render_pptx, presentation)
+
+            response = self._job_response(job)
+            return jsonify(response), 202, {'Location': response['status_url']}
+
+        except LookupError as e:
+            return jsonify({'error': str(e)}), 404
+        except QueueFullError as e:
+            logger.warning(f"Rejected export job: {str(e)}")
+            return jsonify({'error': str(e)}), 429, {'Retry-After': '5'}
+        except Exception as e:
+            logger.error(f"Error in submit_export_job: {str(e)}", exc_info=True)
+            return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+    @staticmethod
+    def _validate_deck(presentation: dict) -> None:
+        """Reject edits that leave a deck the exporters cannot render."""
+        if not isinstance(presentation, dict) or not isinstance(presentation.get('slides'), list):
+            raise ValueError("A presentation must be an object with a 'slides' list")
+        Presentation.from_dict(presentation)
+
+    def _store_presentation(self, presentation: dict) -> dict:
+        """Save a generated deck and return its id fields; generation still succeeds if storing fails."""
+        try:
+            presentation_id, version = self.presentation_store.save(presentation)
+            return {'presentation_id': presentation_id, 'version': version}
+        except Exception as e:
+            logger.error(f"Error storing presentation: {str(e)}", exc_info=True)
+            return {}
+
+    def get_presentation(self, presentation_id: str):
+        """Return a stored deck and its version."""
+        stored = self.presentation_store.get(presentation_id)
+        if stored is None:
+            return jsonify({'error': 'Presentation not found'}), 404
+        presentation, version = stored
+        response = jsonify({'presentation_id': presentation_id, 'version': version, 'presentation': presentation})
+        response.set_etag(str(version))
+        return response
+
+    def preview_presentation(self, presentation_id: str):
+        """Render a stored deck as an HTML slide show."""
+        stored = self.presentation_store.get(presentation_id)
+        if stored is None:
+            return jsonify({'error': 'Presentation not found'}), 404
+        return render_template('presentation.html',
+                               presentation=stored[0],
+                               style=request.args.get('style', 'corporate'))
+
+    def patch_presentation(self, presentation_id: str):
+        """Apply a JSON Patch (RFC 6902) to a stored deck.
+
+        The body is either the patch array itself or ``{"patch": [...], "version": n}``.
+        The expected version may also be sent as ``If-Match``; a stale version
+        returns 409 and leaves the deck untouched.
+        """
+        try:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict):
+                operations = data.get('patch')
+                expected_version = data.get('version')
+            else:
+                operations, expected_version = data, None
+            if operations is None:
+                return jsonify({'error': 'No patch provided'}), 400
+            if expected_version is None and request.if_match:
+                tags = list(request.if_match.as_set())
+                if tags and tags[0].isdigit():
+                    expected_version = int(tags[0])
+
+            result = self.presentation_store.patch(
+                presentation_id, operations,
+                expected_version=expected_version,
+                validate=self._validate_deck
             )
+            if result is None:
+                return jsonify({'error': 'Presentation not found'}), 404
 
+            response = jsonify({'presentation_id': presentation_id, 'version': result[1]})
+            response.set_etag(str(result[1]))
+            return response
+
+        except VersionConflictError as e:
+            return jsonify({'error': str(e)}), 409
+        except ValueError as e:
+            logger.error(f"Rejected patch for presentation {presentation_id}: {str(e)}")
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
-            logger.error(f"Error in export_pptx: {str(e)}", exc_info=True)
-            return jsonify({'error': f'Internal server error: {str(e)}'}), 500 
\ No newline at end of file
+            logger.error(f"Error in patch_presentation: {str(e)}", exc_info=True)
+            return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+    def delete_presentation(self, presentation_id: str):
+        """Delete a stored deck."""
+        if not self.presentation_store.delete(presentation_id):
+            return jsonify({'error': 'Presentation not found'}), 404
+        return jsonify({'presentation_id': presentation_id, 'deleted': True})
+
+    def _job_response(self, job: ExportJob) -> dict:
+        response = job.to_dict()
+        response['status_url'] = url_for('.get_export_job', job_id=job.id)
+        if job.status == 'done':
+            response['result_url'] = url_for('.get_export_job_result', job_id=job.id)
+        return response
+
+    def get_export_job(self, job_id: str):
+        """Return the status of an export job."""
+        job = self.export_jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Export job not found or expired'}), 404
+        return jsonify(self._job_response(job))
+
+    def get_export_job_result(self, job_id: str):
+        """Download the rendered file of a finished export job."""
+        job = self.export_jobs.get(job_id, with_result=True)
+        if job is None:
+            return jsonify({'error': 'Export job not found or expired'}), 404
+        if job.status == 'failed':
+            return jsonify({'error': job.error, 'status': job.status}), 500
+        if job.status != 'done':
+            return jsonify({'error': f'Export job is {job.status}', 'status': job.status}), 409
+
+        export_format = EXPORT_FORMATS[job.format]
+        return send_file(
+            io.BytesIO(job.result),
+            mimetype=export_format['mimetype'],
+            as_attachment=True,
+            download_name=export_format['download_name']
+        )
+
+    def cancel_export_job(self, job_id: str):
+        """Cancel a queued export job."""
+        job = self.export_jobs.cancel(job_id)
+        if job is None:
+            return jsonify({'error': 'Export job not found or expired'}), 404
+        return jsonify(self._job_response(job))
@@ -18,6 +18,7 @@ class Presentation:
     subtitle: str
     theme: Theme
     slides: List[Slide]
+    template: Optional[str] = None
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'Presentation':
@@ -79,5 +80,6 @@ class Presentation:
             title=data['title'],
             subtitle=data['subtitle'],
             theme=theme,
-            slides=slides
+            slides=slides,
+            template=data.get('template')
         ) 
\ No newline at end of file
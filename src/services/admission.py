@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejectedError(Exception):
+    """Raised when a generation cannot be admitted; maps to 429 with Retry-After."""
+
+    def __init__(self, message: str, retry_after: int = 1, queue_position: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.queue_position = queue_position
+
+class _Ticket:
+    """A request waiting for, or holding, a generation slot."""
+
+    __slots__ = ('client', 'admitted', 'admitted_at', 'event', 'future', 'loop')
+
+    def __init__(self, client: str, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.client = client
+        self.admitted = False
+        self.admitted_at: Optional[float] = None
+        self.loop = loop
+        # Sync callers block on an event; async callers await a future on their loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+class AdmissionController:
+    """Bounded admission queue in front of the model.
+
+    At most ``max_in_flight`` generations run at once. Further requests wait in
+    a queue of at most ``max_queue`` entries, with no more than
+    ``max_queue_per_client`` from any one client, and are admitted round-robin
+    across clients so one busy client (a batch, say) cannot delay everyone
+    else. A request that finds the queue full, or is still waiting after
+    ``queue_timeout`` seconds, is rejected at once with an estimated queue
+    position and a Retry-After based on recent generation times.
+
+    Sync callers (Flask threads) and async callers (the ASGI event loop) share
+    the same slots and queue.
+    """
+
+    # Assumed generation time until the first one has finished
+    DEFAULT_SERVICE_SECONDS = 10.0
+
+    def __init__(self, enabled: bool = True, max_in_flight: int = 64, max_queue: int = 256,
+                 max_queue_per_client: int = 32, queue_timeout: float = 30.0, client_header: str = ''):
+        if max_in_flight < 1:
+            raise ValueError("ADMISSION_MAX_IN_FLIGHT must be at least 1")
+        self.enabled = enabled
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.queue_timeout = queue_timeout
+        self.client_header = client_header
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queued = 0
+        # Waiting tickets per client; the first client is served next, then moves to the back
+        self._queues: 'OrderedDict[str, deque]' = OrderedDict()
+        self._service_time: Optional[float] = None
+        self._counters = {
+            'admitted': 0,
+            'queued': 0,
+            'rejected_full': 0,
+            'rejected_client': 0,
+            'timed_out': 0,
+            'abandoned': 0,
+            'peak_queued': 0,
+        }
+        logger.info(f"AdmissionController initialized (enabled={enabled}, in_flight={max_in_flight}, "
+                    f"queue={max_queue}, per_client={max_queue_per_client}, timeout={queue_timeout}s)")
+
+    @classmethod
+    def from_env(cls) -> 'AdmissionController':
+        """Build a controller using the ADMISSION_* environment settings."""
+        return cls(
+            enabled=os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes"),
+            max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64")),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "256")),
+            max_queue_per_client=int(os.getenv("ADMISSION_MAX_QUEUE_PER_CLIENT", "32")),
+            queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30")),
+            client_header=os.getenv("ADMISSION_CLIENT_HEADER", "")
+        )
+
+    def client_key(self, remote_addr: Optional[str], headers: Mapping[str, str]) -> str:
+        """Identify the client a request counts against.
+
+        ADMISSION_CLIENT_HEADER (an API key header, or X-Forwarded-For behind a
+        proxy) takes precedence over the peer address. ``headers`` must look up
+        lower-case names.
+        """
+        if self.client_header:
+            value = headers.get(self.client_header.lower())
+            if value:
+                # X-Forwarded-For lists the original client first
+                return value.split(',')[0].strip()
+        return remote_addr or 'unknown'
+
+    @contextmanager
+    def admit(self, client: str):
+        """Hold a generation slot for the duration of the block, waiting in the queue if needed."""
+        if not self.enabled:
+            yield
+            return
+        ticket = self._enter(client, loop=None)
+        if not ticket.admitted:
+            ticket.event.wait(self.queue_timeout)
+            self._settle(ticket)
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    @asynccontextmanager
+    async def aadmit(self, client: str):
+        """Async version of ``admit``; a waiting task holds no thread."""
+        if not self.enabled:
+            yield
+            return
+        ticket = self._enter(client, loop=asyncio.get_running_loop())
+        if not ticket.admitted:
+            try:
+                await asyncio.wait_for(ticket.future, self.queue_timeout)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                self._abandon(ticket)
+                raise
+            self._settle(ticket)
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    def _enter(self, client: str, loop: Optional[asyncio.AbstractEventLoop]) -> _Ticket:
+        """Take a free slot, join the queue, or raise AdmissionRejectedError."""
+        ticket = _Ticket(client, loop)
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._queued:
+                self._grant(ticket)
+                return ticket
+
+            position = self._position(client)
+            waiting = len(self._queues.get(client, ()))
+            if waiting >= self.max_queue_per_client:
+                self._counters['rejected_client'] += 1
+                error = AdmissionRejectedError(
+                    f"You already have {waiting} presentations waiting to be generated. "
+                    f"Please wait for them to finish before sending more.",
+                    self._retry_after(position), position
+                )
+            elif self._queued >= self.max_queue:
+                self._counters['rejected_full'] += 1
+                error = AdmissionRejectedError(
+                    "The server is busy generating other presentations. Please try again shortly.",
+                    self._retry_after(position), position
+                )
+            else:
+                self._queues.setdefault(client, deque()).append(ticket)
+                self._queued += 1
+                self._counters['queued'] += 1
+                self._counters['peak_queued'] = max(self._counters['peak_queued'], self._queued)
+                logger.info(f"Queued generation for client {client} at position {position}")
+                return ticket
+
+        logger.warning(f"Rejected generation for client {client}: {str(error)}")
+        raise error
+
+    def _settle(self, ticket: _Ticket) -> None:
+        """After waiting: proceed if the ticket was admitted, otherwise leave the queue and reject."""
+        with self._lock:
+            if ticket.admitted:
+                return
+            self._dequeue(ticket)
+            self._counters['timed_out'] += 1
+            position = self._position(ticket.client)
+            error = AdmissionRejectedError(
+                f"The server is still busy after {self.queue_timeout:g} seconds. Please try again shortly.",
+                self._retry_after(position), position
+            )
+        logger.warning(f"Generation for client {ticket.client} timed out in the admission queue")
+        raise error
+
+    def _abandon(self, ticket: _Ticket) -> None:
+        """A waiting task was cancelled; give back its slot or its place in the queue."""
+        with self._lock:
+            self._counters['abandoned'] += 1
+            if not ticket.admitted:
+                self._dequeue(ticket)
+                return
+        self._release(ticket)
+
+    def _release(self, ticket: _Ticket) -> None:
+        with self._lock:
+            held = time.monotonic() - ticket.admitted_at
+            # Exponentially weighted so Retry-After follows the current load
+            self._service_time = held if self._service_time is None else 0.8 * self._service_time + 0.2 * held
+            self._in_flight -= 1
+            self._dispatch()
+
+    def _grant(self, ticket: _Ticket) -> None:
+        """Give a ticket a slot. Caller holds the lock."""
+        ticket.admitted = True
+        ticket.admitted_at = time.monotonic()
+        self._in_flight += 1
+        self._counters['admitted'] += 1
+
+    def _dispatch(self) -> None:
+        """Admit waiting tickets round-robin across clients. Caller holds the lock."""
+        while self._in_flight < self.max_in_flight and self._queues:
+            client, waiting = self._queues.popitem(last=False)
+            ticket = waiting.popleft()
+            if waiting:
+                self._queues[client] = waiting
+            self._queued -= 1
+            self._grant(ticket)
+            ticket.wake()
+
+    def _dequeue(self, ticket: _Ticket) -> None:
+        """Remove a ticket that gave up waiting. Caller holds the lock."""
+        waiting = self._queues.get(ticket.client)
+        if waiting is None or ticket not in waiting:
+            return
+        waiting.remove(ticket)
+        self._queued -= 1
+        if not waiting:
+            del self._queues[ticket.client]
+
+    def _position(self, client: str) -> int:
+        """Estimated queue position of a new request from ``client``. Caller holds the lock.
+
+        With round-robin admission the request is behind the client's own
+        waiting requests and, from every other client, at most as many as the
+        client has queued.
+        """
+        own = len(self._queues.get(client, ())) + 1
+        return own + sum(min(len(waiting), own) for other, waiting in self._queues.items() if other != client)
+
+    def _retry_after(self, position: int) -> int:
+        """Seconds until a request at ``position`` would likely be admitted. Caller holds the lock."""
+        service_time = self._service_time if self._service_time is not None else self.DEFAULT_SERVICE_SECONDS
+        return max(1, math.ceil(math.ceil(position / self.max_in_flight) * service_time))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({
+                'enabled': self.enabled,
+                'in_flight': self._in_flight,
+                'queued_now': self._queued,
+                'waiting_clients': len(self._queues),
+                'max_in_flight': self.max_in_flight,
+                'max_queue': self.max_queue,
+                'max_queue_per_client': self.max_queue_per_client,
+                'avg_generation_s': round(self._service_time, 3) if self._service_time is not None else None,
+            })
+        return stats
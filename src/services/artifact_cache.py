@@ -0,0 +1,78 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class ArtifactCache:
+    """Size-bounded LRU cache of rendered export files.
+
+    Keys are hashes of the canonical JSON of the submitted presentation (or of a
+    stored deck's id and version) plus the export format and options, so the key
+    doubles as a strong ETag.
+    """
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'not_modified': 0,
+            'evictions': 0,
+        }
+        logger.info(f"ArtifactCache initialized (max_bytes={max_bytes})")
+
+    @staticmethod
+    def make_key(presentation: Dict, export_format: str, options: Optional[Dict] = None) -> str:
+        """Hash the canonical form of an export request."""
+        canonical = json.dumps(
+            {'presentation': presentation, 'format': export_format, 'options': options or {}},
+            sort_keys=True, separators=(',', ':'), ensure_ascii=False
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            logger.warning(f"Artifact {key[:12]} ({len(data)} bytes) exceeds cache budget; not cached")
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._counters['evictions'] += 1
+
+    def record_not_modified(self) -> None:
+        """Count a conditional request answered with 304."""
+        with self._lock:
+            self._counters['not_modified'] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['max_bytes'] = self.max_bytes
+            return stats
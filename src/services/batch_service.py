@@ -0,0 +1,108 @@
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+
+from .admission import AdmissionRejectedError
+from .llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+class BatchGenerationService:
+    """Run many presentation generations through LLMService with bounded concurrency."""
+
+    def __init__(self, llm_service: LLMService):
+        self.llm_service = llm_service
+        self.max_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+        self.default_concurrency = int(os.getenv("BATCH_DEFAULT_CONCURRENCY", "2"))
+        self.max_topics = int(os.getenv("BATCH_MAX_TOPICS", "200"))
+        logger.info(f"BatchGenerationService initialized (max_concurrency={self.max_concurrency}, "
+                    f"max_topics={self.max_topics})")
+
+    def validate(self, topics: List, concurrency: Optional[int]) -> int:
+        """Check batch-level parameters and return the effective concurrency."""
+        if not isinstance(topics, list) or not topics:
+            raise ValueError("Please provide a non-empty list of topics")
+        if len(topics) > self.max_topics:
+            raise ValueError(f"A batch may contain at most {self.max_topics} topics")
+
+        if concurrency is None:
+            concurrency = self.default_concurrency
+        try:
+            concurrency = int(concurrency)
+        except (TypeError, ValueError):
+            raise ValueError("Concurrency must be an integer")
+        return max(1, min(concurrency, self.max_concurrency, len(topics)))
+
+    def _generate_one(self, index: int, topic, use_cache: bool, mode: Optional[str],
+                      slide_count: Optional[int] = None, client: str = 'local') -> Dict:
+        """Generate a single batch item, turning failures into an error record."""
+        started = time.perf_counter()
+        record = {'type': 'result', 'index': index, 'topic': topic}
+        try:
+            if not isinstance(topic, str) or not topic.strip():
+                raise ValueError("Please provide a presentation topic")
+            presentation = self.llm_service.generate_presentation_content(
+                topic, use_cache=use_cache, mode=mode, slide_count=slide_count, client=client
+            )
+            record.update({'status': 'ok', 'presentation': presentation})
+        except AdmissionRejectedError as e:
+            record.update({'status': 'error', 'error': str(e), 'code': 429, 'retry_after': e.retry_after})
+        except ValueError as e:
+            record.update({'status': 'error', 'error': str(e), 'code': 400})
+        except ConnectionError as e:
+            record.update({'status': 'error', 'error': str(e), 'code': 503})
+        except Exception as e:
+            logger.error(f"Unexpected error in batch item {index}: {str(e)}")
+            logger.error(f"Stack trace: {traceback.format_exc()}")
+            record.update({
+                'status': 'error',
+                'error': 'An unexpected error occurred while generating the presentation.',
+                'code': 500
+            })
+        record['elapsed_s'] = round(time.perf_counter() - started, 3)
+        return record
+
+    def run(self, topics: List, concurrency: int, use_cache: bool = True,
+            mode: Optional[str] = None, slide_count: Optional[int] = None,
+            client: str = 'local') -> Iterator[Dict]:
+        """Yield one record per topic as it finishes, followed by a summary record."""
+        started = time.perf_counter()
+        succeeded = 0
+        failed = 0
+        item_seconds = 0.0
+
+        logger.info(f"Starting batch of {len(topics)} topics with concurrency {concurrency}")
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch-worker')
+        try:
+            futures = [
+                executor.submit(self._generate_one, i, topic, use_cache, mode, slide_count, client)
+                for i, topic in enumerate(topics)
+            ]
+            for future in as_completed(futures):
+                record = future.result()
+                item_seconds += record['elapsed_s']
+                if record['status'] == 'ok':
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield record
+        finally:
+            # Stops queued items if the client goes away mid-batch
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.perf_counter() - started
+        total = succeeded + failed
+        logger.info(f"Batch finished: {succeeded} succeeded, {failed} failed in {elapsed:.2f}s")
+        yield {
+            'type': 'summary',
+            'total': total,
+            'succeeded': succeeded,
+            'failed': failed,
+            'concurrency': concurrency,
+            'elapsed_s': round(elapsed, 3),
+            'avg_item_s': round(item_seconds / total, 3) if total else 0.0,
+            'throughput_per_min': round(total / elapsed * 60, 2) if elapsed > 0 else 0.0
+        }
@@ -0,0 +1,97 @@
+import time
+from typing import Dict, Optional
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request while every backend's circuit is open."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Fail fast while a backend is clearly down.
+
+    ``closed``: requests flow and consecutive failures are counted. After
+    ``failure_threshold`` of them the circuit opens. ``open``: requests are
+    rejected without touching the network until ``reset_timeout`` seconds
+    have passed. ``half_open``: up to ``half_open_max_calls`` trial requests
+    are let through; a success closes the circuit again, a failure reopens it.
+
+    Not thread-safe on its own; LLMRouter calls it under its lock.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = self.CLOSED
+        self._opened_at: Optional[float] = None
+        self._consecutive_failures = 0
+        self._trials = 0
+        self.opens = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    def allows_request(self) -> bool:
+        """Whether a request may be sent now. Does not use up a half-open trial."""
+        state = self.state
+        if state == self.OPEN:
+            return False
+        return state == self.CLOSED or self._trials < self.half_open_max_calls
+
+    def on_dispatch(self) -> None:
+        """Note that a request was sent; in half-open state it uses up a trial."""
+        if self.state == self.HALF_OPEN:
+            self._trials += 1
+
+    def on_reject(self) -> None:
+        self.rejected += 1
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial request through."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        if self.state == self.HALF_OPEN:
+            self._state = self.CLOSED
+            self._trials = 0
+
+    def record_failure(self) -> bool:
+        """Count a failed request; returns True if this opened the circuit."""
+        self._consecutive_failures += 1
+        state = self.state
+        if state == self.HALF_OPEN or (state == self.CLOSED and self._consecutive_failures >= self.failure_threshold):
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self.opens += 1
+            return True
+        return False
+
+    def record_cancel(self) -> None:
+        """A request was abandoned by the caller; it says nothing about the backend."""
+        if self._state == self.HALF_OPEN and self._trials:
+            self._trials -= 1
+
+    def stats(self) -> Dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self._consecutive_failures,
+            'opens': self.opens,
+            'rejected': self.rejected,
+            'retry_after': round(self.retry_after(), 1),
+        }
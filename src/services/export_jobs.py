@@ -0,0 +1,309 @@
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from ..utils.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+class QueueFullError(Exception):
+    """Raised when the export queue has reached its depth limit."""
+
+UNFINISHED = ('queued', 'running')
+
+@dataclass
+class ExportJob:
+    """A single asynchronous export request."""
+    id: str
+    format: str
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    status: str = 'queued'
+    result: Optional[bytes] = None
+    error: Optional[str] = None
+    size: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'format': self.format,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+            'size': self.size
+        }
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS export_jobs ('
+        ' id TEXT PRIMARY KEY,'
+        ' format TEXT NOT NULL,'
+        ' status TEXT NOT NULL,'
+        ' owner_pid INTEGER NOT NULL,'
+        ' created_at REAL NOT NULL,'
+        ' finished_at REAL,'
+        ' error TEXT,'
+        ' size INTEGER,'
+        ' result BLOB)'
+    )
+    conn.commit()
+    return conn
+
+def _finish(conn: sqlite3.Connection, job_id: str, status: str, error: Optional[str] = None,
+            result: Optional[bytes] = None) -> bool:
+    """Record the outcome of a job unless it already has one (e.g. it was cancelled)."""
+    finished = conn.execute(
+        'UPDATE export_jobs SET status = ?, finished_at = ?, error = ?, size = ?, result = ?'
+        ' WHERE id = ? AND status IN (?, ?)',
+        (status, time.time(), error, len(result) if result is not None else None, result, job_id) + UNFINISHED
+    ).rowcount
+    conn.commit()
+    return finished > 0
+
+def _run_job(db_path: str, job_id: str, fn: Callable, args: tuple, kwargs: dict) -> Optional[int]:
+    """Run an export in a pool process and record the result; returns its size, or None if skipped."""
+    conn = _connect(db_path)
+    try:
+        claimed = conn.execute(
+            "UPDATE export_jobs SET status = 'running' WHERE id = ? AND status = 'queued'", (job_id,)
+        ).rowcount
+        conn.commit()
+        if not claimed:
+            # Cancelled from another web worker while it was waiting
+            return None
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            _finish(conn, job_id, 'failed', error=str(e))
+            raise
+        _finish(conn, job_id, 'done', result=result)
+        return len(result)
+    finally:
+        conn.close()
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class ExportJobQueue:
+    """Bounded queue of export renders executed on a process pool.
+
+    WeasyPrint and python-pptx are CPU-bound and hold the GIL, so renders run in
+    worker processes instead of web worker threads. The pool is created on first
+    use, which keeps it out of any parent process that forks web workers.
+
+    Job state and results are kept in a SQLite table (in the presentation
+    database by default), so with several web worker processes a job can be
+    polled, downloaded or cancelled through whichever worker gets the request.
+    Each web worker runs the jobs it accepted on its own pool, and the pool
+    process records the result itself. A job whose web worker exited before it
+    finished is reported as failed.
+    """
+
+    FINISHED = ('done', 'failed', 'cancelled')
+
+    def __init__(self, max_workers: int = 2, max_depth: int = 32, result_ttl: float = 600.0,
+                 start_method: str = 'spawn', db_path: str = os.path.join("data", "presentations.db")):
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self.start_method = start_method
+        self.db_path = db_path
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # Futures of the jobs this process submitted and that have not finished yet
+        self._futures: Dict[str, Future] = {}
+        self._counters = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'rejected': 0,
+            'expired': 0,
+            'orphaned': 0,
+        }
+        logger.info(f"ExportJobQueue initialized (workers={max_workers}, depth={max_depth}, ttl={result_ttl}s, "
+                    f"db={db_path})")
+
+    @classmethod
+    def from_env(cls) -> 'ExportJobQueue':
+        """Build a queue using the EXPORT_* environment settings."""
+        return cls(
+            max_workers=int(os.getenv("EXPORT_WORKERS", str(min(4, os.cpu_count() or 1)))),
+            max_depth=int(os.getenv("EXPORT_QUEUE_DEPTH", "32")),
+            result_ttl=float(os.getenv("EXPORT_RESULT_TTL", "600")),
+            start_method=os.getenv("EXPORT_START_METHOD", "spawn"),
+            db_path=os.getenv("PRESENTATION_DB", os.path.join("data", "presentations.db"))
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database lazily, and again after a fork. Caller holds the lock."""
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = _connect(self.db_path)
+            self._pid = os.getpid()
+        return self._conn
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=configure_logging
+            )
+            logger.info(f"Started export process pool with {self.max_workers} workers")
+        return self._executor
+
+    def _purge_expired(self, conn: sqlite3.Connection) -> None:
+        """Drop expired results and fail jobs left behind by exited workers. Caller holds the lock."""
+        expired = conn.execute(
+            'DELETE FROM export_jobs WHERE status IN (?, ?, ?) AND finished_at < ?',
+            self.FINISHED + (time.time() - self.result_ttl,)
+        ).rowcount
+        self._counters['expired'] += expired
+
+        owners = conn.execute(
+            'SELECT DISTINCT owner_pid FROM export_jobs WHERE status IN (?, ?) AND owner_pid != ?',
+            UNFINISHED + (os.getpid(),)
+        ).fetchall()
+        for (owner_pid,) in owners:
+            if not _process_alive(owner_pid):
+                orphaned = conn.execute(
+                    'UPDATE export_jobs SET status = ?, finished_at = ?, error = ?'
+                    ' WHERE owner_pid = ? AND status IN (?, ?)',
+                    ('failed', time.time(), 'The export worker stopped unexpectedly. Please try again.',
+                     owner_pid) + UNFINISHED
+                ).rowcount
+                self._counters['orphaned'] += orphaned
+                logger.warning(f"Failed {orphaned} export jobs of exited worker {owner_pid}")
+        conn.commit()
+
+    def _pending(self, conn: sqlite3.Connection) -> int:
+        return conn.execute('SELECT COUNT(*) FROM export_jobs WHERE status IN (?, ?)', UNFINISHED).fetchone()[0]
+
+    def submit(self, export_format: str, fn: Callable, *args, **kwargs) -> ExportJob:
+        """Queue fn(*args, **kwargs) for a worker process and return the job record."""
+        with self._lock:
+            conn = self._connection()
+            self._purge_expired(conn)
+            if self._pending(conn) >= self.max_depth:
+                self._counters['rejected'] += 1
+                raise QueueFullError(f"The export queue is full ({self.max_depth} jobs). Please try again shortly.")
+
+            job = ExportJob(id=uuid.uuid4().hex, format=export_format)
+            conn.execute(
+                'INSERT INTO export_jobs (id, format, status, owner_pid, created_at) VALUES (?, ?, ?, ?, ?)',
+                (job.id, job.format, job.status, os.getpid(), job.created_at)
+            )
+            conn.commit()
+            future = self._get_executor().submit(_run_job, self.db_path, job.id, fn, args, kwargs)
+            self._futures[job.id] = future
+            self._counters['submitted'] += 1
+
+        future.add_done_callback(lambda done: self._on_done(job.id, done))
+        logger.info(f"Queued {export_format} export job {job.id}")
+        return job
+
+    def _on_done(self, job_id: str, future: Future) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+            try:
+                size = future.result()
+                if size is None:
+                    self._counters['cancelled'] += 1
+                else:
+                    self._counters['completed'] += 1
+                    logger.info(f"Export job {job_id} finished ({size} bytes)")
+            except CancelledError:
+                _finish(self._connection(), job_id, 'cancelled')
+                self._counters['cancelled'] += 1
+            except BrokenProcessPool as e:
+                _finish(self._connection(), job_id, 'failed',
+                        error='The export worker stopped unexpectedly. Please try again.')
+                self._counters['failed'] += 1
+                logger.error(f"Export pool broken while running job {job_id}: {str(e)}")
+                # Start a fresh pool for the next submission
+                self._executor = None
+            except Exception as e:
+                # The pool process already recorded the error
+                self._counters['failed'] += 1
+                logger.error(f"Export job {job_id} failed: {str(e)}")
+
+    def get(self, job_id: str, with_result: bool = False) -> Optional[ExportJob]:
+        """Return a job by id, or None if unknown or expired; ``result`` is loaded only when asked for."""
+        with self._lock:
+            conn = self._connection()
+            self._purge_expired(conn)
+            row = conn.execute(
+                'SELECT id, format, created_at, finished_at, status, error, size'
+                + (', result' if with_result else '') + ' FROM export_jobs WHERE id = ?',
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return ExportJob(
+            id=row[0], format=row[1], created_at=row[2], finished_at=row[3], status=row[4],
+            error=row[5], size=row[6], result=row[7] if with_result else None
+        )
+
+    def cancel(self, job_id: str) -> Optional[ExportJob]:
+        """Cancel a queued job. Jobs already running in a worker finish normally."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            logger.info(f"Cancelled export job {job_id}")
+        else:
+            # Already handed to a pool process, or queued by another web worker:
+            # mark it, and the pool process skips it when its turn comes
+            with self._lock:
+                conn = self._connection()
+                cancelled = conn.execute(
+                    "UPDATE export_jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                    (time.time(), job_id)
+                ).rowcount
+                conn.commit()
+            if cancelled:
+                logger.info(f"Cancelled export job {job_id}")
+        return self.get(job_id)
+
+    def stats(self) -> Dict:
+        """Return queue depth and this process's lifetime counters."""
+        with self._lock:
+            conn = self._connection()
+            self._purge_expired(conn)
+            stats = dict(self._counters)
+            stats['pending'] = self._pending(conn)
+            stats['retained'] = conn.execute('SELECT COUNT(*) FROM export_jobs').fetchone()[0]
+            stats['max_depth'] = self.max_depth
+            stats['workers'] = self.max_workers
+            return stats
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, cancelling anything still queued."""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            logger.info("Export process pool shut down")
@@ -0,0 +1,285 @@
+import importlib.util
+import io
+import logging
+import multiprocessing
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+from ..models import Presentation
+from ..utils.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# WeasyPrint (with Pango and fonts), python-pptx and pypdf are imported on the
+# first export, or by warm_up(), so they stay out of startup
+HAS_PYPDF = importlib.util.find_spec('pypdf') is not None
+
+PAGE_CSS = '''
+    @page {
+        size: 1280px 720px;
+        margin: 0;
+    }
+    body { margin: 0; }
+'''
+
+# Renderers take plain data and return bytes so they can run either in the
+# request thread or in an export worker process.
+
+class _PDFRenderState:
+    """Parsed page stylesheet and font configuration for the PDF renders of one thread."""
+
+    def __init__(self):
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        self.font_config = FontConfiguration()
+        self.page_css = CSS(string=PAGE_CSS, font_config=self.font_config)
+
+# Pango font maps are not thread-safe, so every render thread gets its own
+# state; Pango and cairo release the GIL, so threads then render side by side
+_pdf_states = threading.local()
+_static_files: Dict[str, bytes] = {}
+_pptx_generator = None
+_pptx_generator_lock = threading.Lock()
+_warm_up_lock = threading.Lock()
+
+def _get_pdf_state() -> _PDFRenderState:
+    state = getattr(_pdf_states, 'state', None)
+    if state is None:
+        state = _pdf_states.state = _PDFRenderState()
+        logger.info(f"Initialized WeasyPrint font configuration for thread {threading.current_thread().name}")
+    return state
+
+def _get_pptx_generator():
+    global _pptx_generator
+    if _pptx_generator is None:
+        with _pptx_generator_lock:
+            if _pptx_generator is None:
+                from .presentation_generator import PresentationGenerator
+                _pptx_generator = PresentationGenerator()
+    return _pptx_generator
+
+def warm_up() -> float:
+    """Load the PDF and PPTX renderers now instead of on the first export; returns the seconds taken.
+
+    Safe to call more than once and from several threads; later calls return at once.
+    """
+    started = time.perf_counter()
+    with _warm_up_lock:
+        _get_pdf_state()
+        _get_pptx_generator()
+        if HAS_PYPDF:
+            import pypdf  # noqa: F401
+    return time.perf_counter() - started
+
+def start_warm_up(on_done: Optional[Callable[[float], None]] = None) -> threading.Thread:
+    """Run ``warm_up`` on a background thread; ``on_done`` receives the seconds it took."""
+    def run():
+        try:
+            seconds = warm_up()
+        except Exception as e:
+            logger.error(f"Renderer warm-up failed: {str(e)}")
+            return
+        logger.info(f"Renderers warmed up in {seconds:.2f}s")
+        if on_done is not None:
+            on_done(seconds)
+
+    thread = threading.Thread(target=run, name='renderer-warmup', daemon=True)
+    thread.start()
+    return thread
+
+def _read_static_file(path: str) -> bytes:
+    """Return a static asset from the in-process cache, reading it from disk once."""
+    data = _static_files.get(path)
+    if data is None:
+        with open(path, 'rb') as f:
+            data = f.read()
+        _static_files[path] = data
+    return data
+
+def _make_url_fetcher(base_url: str, static_folder: Optional[str], static_url_path: str):
+    """Serve the app's own static assets from memory and defer everything else to WeasyPrint."""
+    static_prefix = base_url.rstrip('/') + static_url_path.rstrip('/') + '/'
+
+    def fetch(url: str, *args, **kwargs):
+        if static_folder and url.startswith(static_prefix):
+            relative = url[len(static_prefix):].split('?', 1)[0].split('#', 1)[0]
+            path = os.path.normpath(os.path.join(static_folder, relative))
+            if path.startswith(os.path.abspath(static_folder) + os.sep):
+                return {
+                    'string': _read_static_file(path),
+                    'mime_type': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+                    'redirected_url': url
+                }
+        from weasyprint import default_url_fetcher
+        return default_url_fetcher(url, *args, **kwargs)
+
+    return fetch
+
+def render_pdf(html: str, base_url: str, static_folder: Optional[str] = None,
+               static_url_path: str = '/static') -> bytes:
+    """Render print-mode presentation HTML to PDF bytes without touching the disk.
+
+    ``base_url`` is the URL the HTML was rendered for (e.g. ``request.url_root``),
+    so root-relative links such as ``/static/css/style.css`` resolve; assets
+    under ``static_url_path`` are served from ``static_folder``.
+    """
+    from weasyprint import HTML
+
+    state = _get_pdf_state()
+    document = HTML(
+        string=html,
+        base_url=base_url,
+        url_fetcher=_make_url_fetcher(base_url, static_folder, static_url_path)
+    )
+    return document.write_pdf(
+        stylesheets=[state.page_css],
+        presentational_hints=True,
+        font_config=state.font_config
+    )
+
+def merge_pdfs(parts: List[bytes]) -> bytes:
+    """Concatenate the pages of several PDF documents, in order, into one PDF."""
+    from pypdf import PdfReader, PdfWriter
+
+    writer = PdfWriter()
+    for part in parts:
+        for page in PdfReader(io.BytesIO(part)).pages:
+            writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+class ParallelPDFRenderer:
+    """Lays out large decks as independent slide chunks on a process pool.
+
+    Every print-mode slide is exactly one page, so a deck can be split on slide
+    boundaries, each chunk rendered to its own PDF in a worker process and the
+    pages concatenated. Small decks, and installs without pypdf, use the
+    single-process ``render_pdf`` path.
+    """
+
+    def __init__(self, max_workers: int = 4, chunk_size: int = 8, min_slides: int = 16,
+                 start_method: str = 'spawn'):
+        self.max_workers = max_workers
+        self.chunk_size = max(1, chunk_size)
+        self.min_slides = min_slides
+        self.start_method = start_method
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._counters = {
+            'parallel_renders': 0,
+            'chunks_rendered': 0,
+            'single_renders': 0,
+            'failures': 0,
+        }
+        if not HAS_PYPDF:
+            logger.warning("pypdf is not installed; PDF exports will always render in a single process")
+        logger.info(f"ParallelPDFRenderer initialized (workers={max_workers}, chunk_size={self.chunk_size}, "
+                    f"min_slides={min_slides})")
+
+    @classmethod
+    def from_env(cls) -> 'ParallelPDFRenderer':
+        """Build a renderer using the PDF_PARALLEL_* environment settings."""
+        return cls(
+            max_workers=int(os.getenv("PDF_PARALLEL_WORKERS", str(min(4, os.cpu_count() or 1)))),
+            chunk_size=int(os.getenv("PDF_PARALLEL_CHUNK_SIZE", "8")),
+            min_slides=int(os.getenv("PDF_PARALLEL_MIN_SLIDES", "16")),
+            start_method=os.getenv("EXPORT_START_METHOD", "spawn")
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return HAS_PYPDF and self.max_workers > 1
+
+    def chunk_bounds(self, slide_count: int) -> List[range]:
+        """Slide index ranges to render separately, or a single range for small decks."""
+        if not self.enabled or slide_count < self.min_slides:
+            return [range(0, slide_count)]
+        return [range(start, min(start + self.chunk_size, slide_count))
+                for start in range(0, slide_count, self.chunk_size)]
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=configure_logging
+                )
+                logger.info(f"Started PDF chunk process pool with {self.max_workers} workers")
+            return self._executor
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def render(self, chunks: List[str], base_url: str, static_folder: Optional[str] = None,
+               static_url_path: str = '/static') -> bytes:
+        """Render print-mode HTML chunks (as split by ``chunk_bounds``) into one PDF."""
+        if len(chunks) == 1:
+            self._count('single_renders')
+            return render_pdf(chunks[0], base_url, static_folder, static_url_path)
+
+        start_time = time.time()
+        executor = self._get_executor()
+        futures = [
+            executor.submit(render_pdf, html, base_url, static_folder, static_url_path)
+            for html in chunks
+        ]
+        try:
+            parts = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            self._count('failures')
+            logger.error(f"PDF chunk pool broken: {str(e)}")
+            with self._lock:
+                self._executor = None
+            raise
+        except Exception:
+            self._count('failures')
+            for future in futures:
+                future.cancel()
+            raise
+
+        pdf = merge_pdfs(parts)
+        self._count('parallel_renders')
+        self._count('chunks_rendered', len(chunks))
+        logger.info(f"Rendered PDF from {len(chunks)} chunks in {time.time() - start_time:.2f}s")
+        return pdf
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+        stats['enabled'] = self.enabled
+        stats['workers'] = self.max_workers
+        stats['chunk_size'] = self.chunk_size
+        stats['min_slides'] = self.min_slides
+        return stats
+
+    def shutdown(self) -> None:
+        """Stop the chunk worker pool."""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            logger.info("PDF chunk process pool shut down")
+
+def render_pptx(presentation: Dict, tally: Optional[Dict] = None) -> bytes:
+    """Render presentation data to a styled PPTX, as bytes.
+
+    ``tally``, when given, receives this export's slide cache hits and misses.
+    """
+    return _get_pptx_generator().generate(Presentation.from_dict(presentation), tally)
+
+def pptx_slide_cache_stats() -> Dict:
+    """Slide cache counters of this process's PPTX generator; empty until the first PPTX export."""
+    if _pptx_generator is None:
+        return {}
+    return _pptx_generator.slide_cache.stats()
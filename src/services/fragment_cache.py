@@ -0,0 +1,64 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class FragmentCache:
+    """LRU cache of per-slide render output (HTML fragments or slide XML).
+
+    Keys hash a single slide's content together with the theme and anything
+    else that changes how that slide renders, so after an edit only the
+    slides that actually changed are rebuilt.
+    """
+
+    def __init__(self, name: str, max_entries: int = 2048):
+        self.name = name
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+        logger.info(f"FragmentCache '{name}' initialized (max_entries={max_entries})")
+
+    @staticmethod
+    def make_key(slide: Dict, theme: Optional[Dict], **extra) -> str:
+        """Hash the canonical form of a slide and everything that affects its rendering."""
+        canonical = json.dumps(
+            {'slide': slide, 'theme': theme or {}, 'extra': extra},
+            sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, tally: Optional[Dict] = None) -> Optional[Any]:
+        """Look up a fragment, counting the hit or miss globally and in ``tally`` if given."""
+        with self._lock:
+            value = self._entries.get(key)
+            outcome = 'misses' if value is None else 'hits'
+            self._counters[outcome] += 1
+            if value is not None:
+                self._entries.move_to_end(key)
+        if tally is not None:
+            tally[outcome] = tally.get(outcome, 0) + 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+            return stats
@@ -0,0 +1,296 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: budget scans are not serialized across processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + on-disk) cache for generated presentation content.
+
+    Entries are content-addressed: the key is a SHA-256 over every input that
+    influences the LLM output, so a change of model, prompt or sampling
+    parameters never serves a stale deck.
+
+    The disk tier is shared by every server worker using the same directory: a
+    lookup that misses the memory tier always checks for the file, and the byte
+    budget is enforced against a scan of the whole directory after each write.
+    """
+
+    def __init__(self, cache_dir: str = "cache/llm", ttl_seconds: float = 24 * 3600,
+                 max_memory_entries: int = 256, max_disk_bytes: int = 64 * 1024 * 1024,
+                 enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        # key -> (created_at, value), ordered from least to most recently used
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        # key -> (created_at, size_in_bytes), ordered from least to most recently used
+        self._disk_index: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._disk_bytes = 0
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'writes': 0,
+            'bypassed': 0,
+        }
+
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load_disk_index()
+        logger.info(f"LLMResponseCache initialized (enabled={self.enabled}, dir={self.cache_dir}, "
+                    f"ttl={self.ttl_seconds}s, memory_entries={self.max_memory_entries}, "
+                    f"disk_bytes={self.max_disk_bytes})")
+
+    @staticmethod
+    def normalize_topic(topic: str) -> str:
+        """Normalize a topic so trivial differences in case and spacing share an entry."""
+        return ' '.join(topic.split()).lower()
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """Build a content-addressed key from the given request parameters."""
+        canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def _scan_disk(self) -> List[Tuple[float, str, int]]:
+        """List (mtime, key, size) for every cache file in the directory, oldest access first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        return sorted(entries)
+
+    def _reset_disk_index(self, entries: List[Tuple[float, str, int]]) -> None:
+        self._disk_index = OrderedDict((key, (mtime, size)) for mtime, key, size in entries)
+        self._disk_bytes = sum(size for _, _, size in entries)
+
+    def _load_disk_index(self) -> None:
+        """Index existing cache files at startup, oldest access first."""
+        try:
+            self._reset_disk_index(self._scan_disk())
+            logger.info(f"Loaded {len(self._disk_index)} cached responses from disk ({self._disk_bytes} bytes)")
+        except Exception as e:
+            logger.error(f"Error loading LLM cache index: {str(e)}")
+            logger.error(f"Stack trace: {traceback.format_exc()}")
+
+    @contextmanager
+    def _directory_lock(self):
+        """Hold an exclusive lock on the cache directory, shared by every worker process."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.cache_dir, '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _enforce_disk_budget(self) -> None:
+        """Evict the least recently used files until the directory fits max_disk_bytes.
+
+        Other workers write to the same directory, so the budget is checked against
+        a fresh scan of it, not against this process's own writes. The scan runs
+        under the directory lock so that two workers never evict for the same write.
+        """
+        try:
+            with self._directory_lock():
+                entries = self._scan_disk()
+                total = sum(size for _, _, size in entries)
+                evicted = 0
+                while total > self.max_disk_bytes and evicted < len(entries):
+                    _, key, size = entries[evicted]
+                    self._remove_file(self._path_for(key))
+                    total -= size
+                    evicted += 1
+        except Exception as e:
+            logger.error(f"Error enforcing LLM cache disk budget: {str(e)}")
+            return
+
+        with self._lock:
+            self._reset_disk_index(entries[evicted:])
+            self._counters['evictions'] += evicted
+
+    def _drop_disk_entry(self, key: str) -> str:
+        """Forget key's file in the index and return its path for removal outside the lock."""
+        entry = self._disk_index.pop(key, None)
+        if entry:
+            self._disk_bytes -= entry[1]
+        return self._path_for(key)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error removing cache file {path}: {str(e)}")
+
+    def _remember(self, key: str, created_at: float, value: Dict) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    @classmethod
+    def _read_disk(cls, path: str) -> Optional[Tuple[float, Dict, int]]:
+        """Read a cache file; returns None when it does not exist and removes it when unreadable."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                size = os.fstat(f.fileno()).st_size
+                record = json.load(f)
+            return record['created_at'], record['value'], size
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache file {path}: {str(e)}")
+            cls._remove_file(path)
+            return None
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached value for key, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if not self._is_expired(created_at):
+                    self._memory.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return copy.deepcopy(value)
+                del self._memory[key]
+
+        # Files are read, touched and removed outside the lock so that memory hits
+        # never wait behind another thread's disk I/O. The file is checked even when
+        # the index does not know it, since another worker may have written it.
+        path = self._path_for(key)
+        record = self._read_disk(path) if entry is None else None
+        with self._lock:
+            if record is not None and not self._is_expired(record[0]):
+                created_at, value, size = record
+                previous = self._disk_index.pop(key, None)
+                if previous:
+                    self._disk_bytes -= previous[1]
+                self._disk_index[key] = (created_at, size)
+                self._disk_bytes += size
+                self._remember(key, created_at, value)
+                self._counters['disk_hits'] += 1
+            else:
+                self._drop_disk_entry(key)
+                expired = entry is not None or record is not None
+                if expired:
+                    self._counters['expired'] += 1
+                self._counters['misses'] += 1
+                value = None
+
+        if value is None:
+            # A file that was simply missing is left alone: another worker may be writing it now
+            if expired:
+                self._remove_file(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Dict) -> None:
+        """Store a value in both tiers, evicting least recently used entries as needed."""
+        if not self.enabled:
+            return
+
+        created_at = time.time()
+        stored = copy.deepcopy(value)
+        payload = json.dumps({'key': key, 'created_at': created_at, 'value': stored}, ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+
+        with self._lock:
+            self._remember(key, created_at, stored)
+            self._counters['writes'] += 1
+
+        if size > self.max_disk_bytes:
+            logger.warning(f"Cache entry {key} ({size} bytes) exceeds disk budget; kept in memory only")
+            return
+
+        path = self._path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error writing cache file {path}: {str(e)}")
+            self._remove_file(tmp_path)
+            return
+
+        self._enforce_disk_budget()
+
+    def record_bypass(self) -> None:
+        """Count a request that explicitly skipped the cache."""
+        with self._lock:
+            self._counters['bypassed'] += 1
+
+    def invalidate(self, key: str) -> None:
+        """Drop a single entry from both tiers."""
+        with self._lock:
+            self._memory.pop(key, None)
+            path = self._drop_disk_entry(key)
+        self._remove_file(path)
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers, including files written by other workers."""
+        with self._lock:
+            self._memory.clear()
+        with self._directory_lock():
+            for _, key, _ in self._scan_disk():
+                self._remove_file(self._path_for(key))
+        with self._lock:
+            self._reset_disk_index([])
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['hits'] = stats['memory_hits'] + stats['disk_hits']
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+            stats['memory_entries'] = len(self._memory)
+            stats['disk_entries'] = len(self._disk_index)
+            stats['disk_bytes'] = self._disk_bytes
+            stats['enabled'] = self.enabled
+            return stats
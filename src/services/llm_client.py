@@ -0,0 +1,344 @@
+import asyncio
+import logging
+import os
+import threading
+import traceback
+from typing import Dict, Optional
+
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+class _TrackedByteStream(httpx.SyncByteStream):
+    """Response body wrapper that reports back to the transport once the body is released."""
+
+    def __init__(self, stream: httpx.SyncByteStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    def __iter__(self):
+        for chunk in self._stream:
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+class _TrackedAsyncByteStream(httpx.AsyncByteStream):
+    """Async counterpart of _TrackedByteStream."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+class _RequestCounters:
+    """Request counters shared by the sync and async transports."""
+
+    def _init_counters(self) -> None:
+        self._lock = threading.Lock()
+        self.requests_total = 0
+        self.requests_failed = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _start(self) -> None:
+        with self._lock:
+            self.requests_total += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _fail(self) -> None:
+        with self._lock:
+            self.requests_failed += 1
+        self._release()
+
+    def _release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def connection_stats(self) -> Dict:
+        """Summarize the connections currently held by the underlying pool."""
+        stats = {'connections': 0, 'idle_connections': 0, 'active_connections': 0}
+        try:
+            connections = list(self._pool.connections)
+        except Exception:
+            return stats
+
+        for connection in connections:
+            if connection.is_closed():
+                continue
+            stats['connections'] += 1
+            if connection.is_idle():
+                stats['idle_connections'] += 1
+            else:
+                stats['active_connections'] += 1
+        return stats
+
+class _CountingTransport(_RequestCounters, httpx.HTTPTransport):
+    """HTTP transport that keeps request counters next to the connection pool."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._init_counters()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._start()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self._fail()
+            raise
+
+        response.stream = _TrackedByteStream(response.stream, self._release)
+        return response
+
+class _CountingAsyncTransport(_RequestCounters, httpx.AsyncHTTPTransport):
+    """Async counterpart of _CountingTransport."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._init_counters()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._start()
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            # Includes cancellation, which async callers use to abandon a request
+            self._fail()
+            raise
+
+        response.stream = _TrackedAsyncByteStream(response.stream, self._release)
+        return response
+
+class PooledLLMClient:
+    """Long-lived OpenAI client backed by a pooled keep-alive httpx.Client.
+
+    A single instance is shared by every request thread of a process: the OpenAI
+    and httpx clients are thread-safe, so connections (and their TCP/TLS
+    handshakes) are reused instead of being rebuilt per request. The client is
+    created lazily and recreated after a fork, because pooled sockets must not be
+    shared between processes.
+    """
+
+    def __init__(self, api_key: str, base_url: str,
+                 max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0, connect_timeout: float = 5.0,
+                 read_timeout: float = 60.0, write_timeout: float = 10.0,
+                 pool_timeout: float = 10.0):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout
+        )
+
+        self._lock = threading.Lock()
+        self._client: Optional[openai.OpenAI] = None
+        self._http_client: Optional[httpx.Client] = None
+        self._transport: Optional[_CountingTransport] = None
+        self._pid: Optional[int] = None
+        self._clients_created = 0
+
+    @classmethod
+    def from_env(cls, api_key: str, base_url: str) -> 'PooledLLMClient':
+        """Build a client using the LLM_POOL_* / LLM_*_TIMEOUT environment settings."""
+        return cls(
+            api_key=api_key,
+            base_url=base_url,
+            max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "30")),
+            connect_timeout=float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("LLM_READ_TIMEOUT", "60")),
+            write_timeout=float(os.getenv("LLM_WRITE_TIMEOUT", "10")),
+            pool_timeout=float(os.getenv("LLM_POOL_TIMEOUT", "10"))
+        )
+
+    @property
+    def client(self) -> openai.OpenAI:
+        """Return the shared OpenAI client, creating it on first use in this process."""
+        client = self._client
+        if client is not None and self._is_current():
+            return client
+
+        with self._lock:
+            if self._client is not None and self._is_current():
+                return self._client
+
+            if self._client is not None:
+                # Inherited from a parent process; drop it without closing the parent's sockets
+                logger.info("Discarding LLM client inherited across fork")
+                self._client = None
+                self._http_client = None
+                self._transport = None
+
+            try:
+                self._create()
+                self._pid = os.getpid()
+                self._clients_created += 1
+                logger.info(f"Created pooled LLM client for {self.base_url} "
+                            f"(max_connections={self.limits.max_connections}, "
+                            f"max_keepalive={self.limits.max_keepalive_connections})")
+                return self._client
+            except Exception as e:
+                logger.error(f"Error creating OpenAI client: {str(e)}")
+                logger.error(f"Stack trace: {traceback.format_exc()}")
+                raise
+
+    def _is_current(self) -> bool:
+        return self._pid == os.getpid()
+
+    def _create(self) -> None:
+        self._transport = _CountingTransport(limits=self.limits)
+        self._http_client = httpx.Client(
+            transport=self._transport,
+            timeout=self.timeout
+        )
+        self._client = openai.OpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=self._http_client
+        )
+
+    def stats(self) -> Dict:
+        """Return pool configuration and usage counters."""
+        stats = {
+            'base_url': self.base_url,
+            'max_connections': self.limits.max_connections,
+            'max_keepalive_connections': self.limits.max_keepalive_connections,
+            'keepalive_expiry': self.limits.keepalive_expiry,
+            'connect_timeout': self.timeout.connect,
+            'read_timeout': self.timeout.read,
+            'clients_created': self._clients_created,
+            'requests_total': 0,
+            'requests_failed': 0,
+            'in_flight': 0,
+            'peak_in_flight': 0,
+        }
+        transport = self._transport
+        if transport is not None and self._pid == os.getpid():
+            stats.update({
+                'requests_total': transport.requests_total,
+                'requests_failed': transport.requests_failed,
+                'in_flight': transport.in_flight,
+                'peak_in_flight': transport.peak_in_flight,
+            })
+            stats.update(transport.connection_stats())
+        return stats
+
+    def close(self) -> None:
+        """Close pooled connections. A later request transparently opens a new pool."""
+        with self._lock:
+            http_client = self._http_client
+            owned = self._pid == os.getpid()
+            self._client = None
+            self._http_client = None
+            self._transport = None
+            if http_client is not None and owned:
+                try:
+                    http_client.close()
+                    logger.info(f"Closed pooled LLM client for {self.base_url}")
+                except Exception as e:
+                    logger.error(f"Error closing LLM client: {str(e)}")
+
+class AsyncPooledLLMClient(PooledLLMClient):
+    """AsyncOpenAI counterpart of PooledLLMClient, used by the ASGI request path.
+
+    Requests waiting on the model hold a pooled connection but no thread, so
+    the pool is sized separately (LLM_ASYNC_MAX_CONNECTIONS) and is usually
+    much larger than the thread-based one. httpx.AsyncClient connections
+    belong to the event loop that opened them, so the client is recreated if
+    it is used from a different loop as well as after a fork.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(cls, api_key: str, base_url: str) -> 'AsyncPooledLLMClient':
+        """Build a client using the LLM_ASYNC_* / LLM_POOL_* / LLM_*_TIMEOUT environment settings."""
+        client = super().from_env(api_key, base_url)
+        max_connections = int(os.getenv("LLM_ASYNC_MAX_CONNECTIONS", "256"))
+        client.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(max_connections, int(os.getenv("LLM_ASYNC_MAX_KEEPALIVE", "64"))),
+            keepalive_expiry=client.limits.keepalive_expiry
+        )
+        return client
+
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        """Return the AsyncOpenAI client for the running event loop."""
+        return super().client
+
+    def _is_current(self) -> bool:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        return self._pid == os.getpid() and self._loop is loop
+
+    def _create(self) -> None:
+        self._transport = _CountingAsyncTransport(limits=self.limits)
+        self._http_client = httpx.AsyncClient(
+            transport=self._transport,
+            timeout=self.timeout
+        )
+        self._client = openai.AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=self._http_client
+        )
+        self._loop = asyncio.get_running_loop()
+
+    def close(self) -> None:
+        """Forget the client; its connections can only be closed from its event loop (see ``aclose``)."""
+        with self._lock:
+            self._client = None
+            self._http_client = None
+            self._transport = None
+            self._loop = None
+
+    async def aclose(self) -> None:
+        """Close pooled connections from the event loop that owns them."""
+        with self._lock:
+            http_client = self._http_client
+            owned = self._pid == os.getpid() and self._loop is asyncio.get_running_loop()
+            self._client = None
+            self._http_client = None
+            self._transport = None
+            self._loop = None
+        if http_client is not None and owned:
+            try:
+                await http_client.aclose()
+                logger.info(f"Closed async pooled LLM client for {self.base_url}")
+            except Exception as e:
+                logger.error(f"Error closing async LLM client: {str(e)}")
@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+class HedgeAttempt:
+    """One of the requests racing for a hedged call.
+
+    The request function records the backends it used in ``tried`` and, once
+    it holds something that can be torn down (a streaming response), hands
+    an abort callback to ``bind``. ``cancel`` runs that callback from the
+    caller's thread so the loser stops reading and the server stops
+    generating. Async attempts are cancelled through their task instead.
+    """
+
+    def __init__(self, exclude: List = ()):
+        self.exclude = list(exclude)
+        self.tried: List = []
+        self.started = time.perf_counter()
+        self.cancelled = False
+        # Set when the attempt lost because it stalled; the request function reports it as a failure
+        self.failure: Optional[Exception] = None
+        self._abort: Optional[Callable[[], None]] = None
+        self._lock = threading.Lock()
+
+    def bind(self, abort: Callable[[], None]) -> None:
+        """Register how to abort the request; runs it at once if the attempt is already cancelled."""
+        with self._lock:
+            if not self.cancelled:
+                self._abort = abort
+                return
+        abort()
+
+    def cancel(self, failure: Optional[Exception] = None) -> None:
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            self.failure = failure
+            abort, self._abort = self._abort, None
+        if abort is not None:
+            try:
+                abort()
+            except Exception as e:
+                logger.debug(f"Error aborting hedged request: {str(e)}")
+
+def abort_stream(stream) -> None:
+    """Tear down a streaming response from another thread.
+
+    Closing an httpx response does not wake a thread blocked reading it, so
+    the socket is shut down first; the reader then fails at once.
+    """
+    response = getattr(stream, 'response', None)
+    if response is None:
+        return
+    network_stream = response.extensions.get('network_stream')
+    sock = network_stream.get_extra_info('socket') if network_stream is not None else None
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    response.close()
+
+class RequestHedger:
+    """Send a duplicate request when the first one has not produced a token in time.
+
+    The deadline is the configured percentile of recent time-to-first-token
+    samples (``initial_delay`` until ``min_samples`` have been seen), clamped
+    to ``[min_delay, max_delay]``. When it passes, a second attempt is started
+    on another backend if one is available, and whichever produces a first
+    token first wins; the other is cancelled. At most ``max_ratio`` of recent
+    calls may be hedged, so a backend that is slow across the board does not
+    double the load on it. Attempts run on a dedicated thread pool so the
+    caller can wait on both.
+    """
+
+    def __init__(self, enabled: bool = False, percentile: float = 95.0,
+                 initial_delay: float = 3.0, min_delay: float = 0.25, max_delay: float = 10.0,
+                 min_samples: int = 20, window: int = 200, max_ratio: float = 0.1,
+                 workers: int = 32):
+        if not 0 < percentile <= 100:
+            raise ValueError("Hedge percentile must be between 0 and 100")
+        self.enabled = enabled
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.workers = workers
+
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self._recent_hedges = deque(maxlen=window)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._counters = {
+            'calls': 0,
+            'fired': 0,
+            'won': 0,
+            'lost': 0,
+            'skipped': 0,
+            'failed': 0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the attempt pool, creating it on first use and again in a forked child."""
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='llm-hedge')
+                self._pid = os.getpid()
+            return self._executor
+
+    def deadline(self) -> float:
+        """Seconds to wait for a first token before hedging."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            delay = self.initial_delay
+        else:
+            delay = samples[max(0, math.ceil(self.percentile / 100 * len(samples)) - 1)]
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def _take_budget(self, hedge: bool) -> bool:
+        """Record whether this call hedges; a wanted hedge is refused once the budget is used up."""
+        with self._lock:
+            # Counting this call, the hedged share of the window may not pass max_ratio;
+            # one hedge per window is always allowed so the first stall can be hedged
+            recent = self._recent_hedges
+            if hedge and sum(recent) + 1 > max(1.0, self.max_ratio * (len(recent) + 1)):
+                self._counters['skipped'] += 1
+                hedge = False
+            self._recent_hedges.append(1 if hedge else 0)
+            if hedge:
+                self._counters['fired'] += 1
+            return hedge
+
+    def run(self, request: Callable[[HedgeAttempt], T], discard: Callable[[T], None]) -> T:
+        """Run ``request`` with a hedge if it is slow to start.
+
+        ``request(attempt)`` runs on a worker thread and returns once the
+        first token has arrived. ``discard(result)`` releases the result of an
+        attempt that finished after another one had already won. The error of
+        the first attempt is raised if every attempt fails.
+        """
+        executor = self._get_executor()
+        deadline = self.deadline()
+        primary = HedgeAttempt()
+        attempts: Dict[Future, HedgeAttempt] = {executor.submit(request, primary): primary}
+        with self._lock:
+            self._counters['calls'] += 1
+
+        done, _ = wait(attempts, timeout=deadline)
+        hedged = self._take_budget(hedge=not done)
+        if hedged:
+            logger.warning(f"No first token from the LLM after {deadline:.2f}s; sending a hedged request")
+            hedge = HedgeAttempt(exclude=primary.tried)
+            attempts[executor.submit(request, hedge)] = hedge
+
+        winner: Optional[Future] = None
+        errors: Dict[HedgeAttempt, BaseException] = {}
+        pending = set(attempts)
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    errors[attempts[future]] = future.exception()
+                elif winner is None:
+                    winner = future
+                else:
+                    # Both produced a token in the same instant; keep one
+                    discard(future.result())
+
+        for future in pending:
+            attempt = attempts[future]
+            # A primary still silent when the hedge won has stalled; that counts against its backend
+            attempt.cancel(TimeoutError("No first token before the hedged request") if attempt is primary else None)
+            if not future.cancel():
+                future.add_done_callback(lambda f: self._discard_late(f, discard))
+
+        if winner is None:
+            with self._lock:
+                self._counters['failed'] += 1
+            raise errors.get(primary) or next(iter(errors.values()))
+
+        self._record_win(attempts[winner], primary, hedged)
+        return winner.result()
+
+    async def arun(self, request: Callable[[HedgeAttempt], Awaitable[T]],
+                   discard: Callable[[T], Awaitable[None]]) -> T:
+        """Async version of ``run``: attempts are tasks on the running loop.
+
+        A losing task is cancelled, so ``request`` must release what it holds
+        when it receives CancelledError. ``discard`` is only needed for an
+        attempt that finished in the same loop iteration as the winner.
+        """
+        deadline = self.deadline()
+        primary = HedgeAttempt()
+        attempts: Dict[asyncio.Task, HedgeAttempt] = {asyncio.ensure_future(request(primary)): primary}
+        with self._lock:
+            self._counters['calls'] += 1
+
+        pending = set(attempts)
+        try:
+            done, _ = await asyncio.wait(pending, timeout=deadline)
+            hedged = self._take_budget(hedge=not done)
+            if hedged:
+                logger.warning(f"No first token from the LLM after {deadline:.2f}s; sending a hedged request")
+                hedge = HedgeAttempt(exclude=primary.tried)
+                attempts[asyncio.ensure_future(request(hedge))] = hedge
+                pending = set(attempts)
+
+            winner: Optional[asyncio.Task] = None
+            errors: Dict[HedgeAttempt, BaseException] = {}
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        errors[attempts[task]] = task.exception()
+                    elif winner is None:
+                        winner = task
+                    else:
+                        await discard(task.result())
+        finally:
+            for task in pending:
+                attempt = attempts[task]
+                attempt.cancel(TimeoutError("No first token before the hedged request") if attempt is primary else None)
+                task.cancel()
+
+        if winner is None:
+            with self._lock:
+                self._counters['failed'] += 1
+            raise errors.get(primary) or next(iter(errors.values()))
+
+        self._record_win(attempts[winner], primary, hedged)
+        return winner.result()
+
+    def _record_win(self, won: HedgeAttempt, primary: HedgeAttempt, hedged: bool) -> None:
+        with self._lock:
+            self._samples.append(time.perf_counter() - won.started)
+            if hedged:
+                self._counters['won' if won is not primary else 'lost'] += 1
+        if won is not primary:
+            logger.info("Hedged LLM request won the race")
+
+    @staticmethod
+    def _discard_late(future: Future, discard: Callable) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            discard(future.result())
+        except Exception as e:
+            logger.debug(f"Error discarding hedged request: {str(e)}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            samples = len(self._samples)
+        stats.update({
+            'enabled': self.enabled,
+            'percentile': self.percentile,
+            'deadline_ms': round(self.deadline() * 1000, 1),
+            'samples': samples,
+            'max_ratio': self.max_ratio,
+        })
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._pid == os.getpid():
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,397 @@
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import httpx
+import openai
+
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .llm_client import AsyncPooledLLMClient, PooledLLMClient
+
+logger = logging.getLogger(__name__)
+
+class Backend:
+    """One OpenAI-compatible model server, with its own connection pools and health state."""
+
+    def __init__(self, name: str, base_url: str, model: str, api_key: str, weight: float = 1.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        if weight <= 0:
+            raise ValueError(f"Backend '{name}' must have a positive weight")
+        self.name = name
+        self.base_url = base_url
+        self.model = model
+        self.api_key = api_key
+        self.weight = weight
+        self.pool = PooledLLMClient.from_env(api_key, base_url)
+        self.async_pool = AsyncPooledLLMClient.from_env(api_key, base_url)
+        self.breaker = breaker
+
+        # Guarded by the router's lock
+        self.healthy = True
+        self.draining = False
+        self.drained_at: Optional[float] = None
+        self.outstanding = 0
+        self.dispatched = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.probe_latency_ms: Optional[float] = None
+
+    @property
+    def client(self) -> openai.OpenAI:
+        return self.pool.client
+
+    @property
+    def async_client(self) -> openai.AsyncOpenAI:
+        return self.async_pool.client
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and not self.draining
+
+    def admits_requests(self) -> bool:
+        return self.breaker is None or self.breaker.allows_request()
+
+    def state(self) -> str:
+        if self.breaker is not None and self.breaker.state != CircuitBreaker.CLOSED:
+            return f"circuit_{self.breaker.state}"
+        if self.draining:
+            return 'draining'
+        return 'healthy' if self.healthy else 'unhealthy'
+
+class _RoutedStream:
+    """A streaming completion that releases its backend once the stream is closed."""
+
+    def __init__(self, stream, router: 'LLMRouter', backend: Backend):
+        self._stream = stream
+        self._router = router
+        self._backend = backend
+        self._error: Optional[Exception] = None
+        self._released = False
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                yield chunk
+        except Exception as e:
+            self._error = e
+            raise
+
+    def close(self) -> None:
+        try:
+            close = getattr(self._stream, 'close', None)
+            if close is None and getattr(self._stream, 'response', None) is not None:
+                close = self._stream.response.close
+            if close is not None:
+                close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._router.release(self._backend, self._error)
+
+class LLMRouter:
+    """Spread completions over several OpenAI-compatible backends.
+
+    Each request goes to the available backend with the fewest outstanding
+    requests relative to its weight. A background thread probes every
+    backend's ``/models`` endpoint. A backend is drained after
+    ``failure_threshold`` consecutive failed requests or probes: it gets no
+    new requests, and the ones in flight finish normally. It rejoins after a
+    successful probe, once it has been out for at least ``min_drain_seconds``.
+    If no backend is available the least-loaded one is used anyway, so a
+    single flaky backend degrades to the old direct behaviour rather than an
+    outage. A request whose connection could not be opened is retried on
+    another backend up to ``retries`` times.
+
+    Each backend may also have a CircuitBreaker. Unlike draining, an open
+    circuit is never fallen back to: when every backend's circuit is open,
+    ``acquire`` raises CircuitOpenError at once instead of letting callers
+    wait out connection and read timeouts.
+    """
+
+    def __init__(self, backends: List[Backend], health_interval: float = 10.0,
+                 probe_timeout: float = 2.0, failure_threshold: int = 3,
+                 min_drain_seconds: float = 15.0, retries: int = 1):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        names = [backend.name for backend in backends]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Backend names must be unique: {names}")
+        self.backends = backends
+        self.health_interval = health_interval
+        self.probe_timeout = probe_timeout
+        self.failure_threshold = failure_threshold
+        self.min_drain_seconds = min_drain_seconds
+        self.retries = retries
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._counters = {
+            'dispatched': 0,
+            'fallbacks': 0,
+            'drains': 0,
+            'recoveries': 0,
+            'probes': 0,
+            'retries': 0,
+            'rejected': 0,
+            'circuit_opens': 0,
+        }
+        logger.info(f"LLMRouter initialized with backends: "
+                    f"{', '.join(f'{b.name} ({b.base_url}, {b.model}, weight={b.weight})' for b in backends)}")
+
+    @classmethod
+    def from_env(cls, api_key: str, base_url: str, model: str) -> 'LLMRouter':
+        """Build a router from LLM_BACKENDS, or a single backend from LLM_BASE_URL/LLM_MODEL_NAME.
+
+        LLM_BACKENDS is a JSON list such as
+        ``[{"base_url": "http://10.0.0.5:1234/v1", "model": "qwen2.5-7b-instruct-1m", "weight": 2}]``;
+        ``name``, ``model``, ``weight`` and ``api_key`` are optional per entry.
+        Every backend gets a circuit breaker unless LLM_BREAKER_ENABLED is false.
+        """
+        raw = os.getenv("LLM_BACKENDS", "").strip()
+        if raw:
+            try:
+                entries = json.loads(raw)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"LLM_BACKENDS is not valid JSON: {str(e)}")
+            if not isinstance(entries, list) or not all(isinstance(e, dict) and e.get('base_url') for e in entries):
+                raise ValueError("LLM_BACKENDS must be a JSON list of objects with a base_url")
+        else:
+            entries = [{'base_url': base_url}]
+
+        breakers = os.getenv("LLM_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+        backends = [
+            Backend(
+                name=entry.get('name') or urlparse(entry['base_url']).netloc or entry['base_url'],
+                base_url=entry['base_url'],
+                model=entry.get('model') or model,
+                api_key=entry.get('api_key') or api_key,
+                weight=float(entry.get('weight', 1)),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5")),
+                    reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+                    half_open_max_calls=int(os.getenv("LLM_BREAKER_HALF_OPEN_CALLS", "1"))
+                ) if breakers else None
+            )
+            for entry in entries
+        ]
+        return cls(
+            backends,
+            health_interval=float(os.getenv("LLM_HEALTH_INTERVAL", "10")),
+            probe_timeout=float(os.getenv("LLM_HEALTH_TIMEOUT", "2")),
+            failure_threshold=int(os.getenv("LLM_BACKEND_FAILURE_THRESHOLD", "3")),
+            min_drain_seconds=float(os.getenv("LLM_BACKEND_DRAIN_SECONDS", "15")),
+            retries=int(os.getenv("LLM_BACKEND_RETRIES", "1"))
+        )
+
+    # -- dispatch -----------------------------------------------------------
+
+    def acquire(self, exclude: Sequence[Backend] = ()) -> Backend:
+        """Pick a backend for one request; the caller must ``release`` it afterwards.
+
+        Backends in ``exclude`` (already tried for this request) are skipped
+        unless nothing else is left. Raises CircuitOpenError if every
+        backend's circuit is open.
+        """
+        self._ensure_health_thread()
+        with self._lock:
+            admitted = [backend for backend in self.backends if backend.admits_requests()]
+            if not admitted:
+                self._counters['rejected'] += 1
+                for backend in self.backends:
+                    backend.breaker.on_reject()
+                retry_after = min(backend.breaker.retry_after() for backend in self.backends)
+                raise CircuitOpenError(
+                    f"Every LLM backend's circuit is open; retry in {retry_after:.0f}s", retry_after
+                )
+            untried = [backend for backend in admitted if backend not in exclude] or admitted
+            candidates = [backend for backend in untried if backend.available]
+            if not candidates:
+                self._counters['fallbacks'] += 1
+                candidates = untried
+            backend = min(candidates, key=lambda b: ((b.outstanding + 1) / b.weight, b.dispatched / b.weight))
+            if backend.breaker is not None:
+                backend.breaker.on_dispatch()
+            backend.outstanding += 1
+            backend.dispatched += 1
+            self._counters['dispatched'] += 1
+        if not backend.available:
+            logger.warning(f"No healthy LLM backend; trying {backend.name} anyway")
+        return backend
+
+    def release(self, backend: Backend, error: Optional[Exception] = None, cancelled: bool = False) -> None:
+        """Finish a request, recording whether the backend failed it.
+
+        A ``cancelled`` request was abandoned by the caller (a hedge that lost)
+        and counts neither for nor against the backend.
+        """
+        with self._lock:
+            backend.outstanding -= 1
+            breaker = backend.breaker
+            if cancelled:
+                if breaker is not None:
+                    breaker.record_cancel()
+            elif error is not None and self._is_backend_failure(error):
+                backend.failures += 1
+                message = f"{type(error).__name__}: {str(error)}"
+                self._record_failure(backend, message)
+                if breaker is not None and breaker.record_failure():
+                    self._counters['circuit_opens'] += 1
+                    logger.warning(f"Circuit for LLM backend {backend.name} opened: {message}")
+            else:
+                if error is None:
+                    backend.consecutive_failures = 0
+                # A rejected request still shows the backend is up
+                if breaker is not None:
+                    if breaker.state == CircuitBreaker.HALF_OPEN:
+                        logger.info(f"Circuit for LLM backend {backend.name} closed")
+                    breaker.record_success()
+
+    def should_retry(self, error: Exception, tried: Sequence[Backend]) -> bool:
+        """Whether a failed request can move to another backend.
+
+        Only connections that could not be opened are retried: nothing reached
+        the model, so a retry cannot duplicate work. Timeouts are not retried.
+        """
+        if not isinstance(error, openai.APIConnectionError) or isinstance(error, openai.APITimeoutError):
+            return False
+        with self._lock:
+            if len(tried) > self.retries or not any(
+                b.available and b.admits_requests() and b not in tried for b in self.backends
+            ):
+                return False
+            self._counters['retries'] += 1
+            return True
+
+    def track_stream(self, backend: Backend, stream) -> _RoutedStream:
+        """Keep ``backend`` busy until a streaming response is closed."""
+        return _RoutedStream(stream, self, backend)
+
+    @staticmethod
+    def _is_backend_failure(error: Exception) -> bool:
+        """Transport errors, timeouts and 5xx count against a backend; a rejected request does not."""
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code >= 500
+        return True
+
+    def _record_failure(self, backend: Backend, message: str) -> None:
+        """Count a failed request or probe and drain the backend past the threshold. Caller holds the lock."""
+        backend.consecutive_failures += 1
+        backend.last_error = message
+        if not backend.draining and backend.consecutive_failures >= self.failure_threshold:
+            backend.draining = True
+            backend.drained_at = time.monotonic()
+            self._counters['drains'] += 1
+            logger.warning(f"Draining LLM backend {backend.name} after {backend.consecutive_failures} "
+                           f"consecutive failures: {message}")
+
+    # -- health -------------------------------------------------------------
+
+    def check_health(self) -> None:
+        """Probe every backend once. Called by the health thread; also usable directly."""
+        for backend in self.backends:
+            self._probe(backend)
+
+    def _probe(self, backend: Backend) -> None:
+        started = time.perf_counter()
+        error = None
+        try:
+            response = httpx.get(
+                backend.base_url.rstrip('/') + '/models',
+                headers={'Authorization': f"Bearer {backend.api_key}"},
+                timeout=self.probe_timeout
+            )
+            response.raise_for_status()
+            served = [m.get('id') for m in response.json().get('data', []) if isinstance(m, dict)]
+            if served and backend.model not in served:
+                error = f"model {backend.model} is not served (available: {', '.join(served)})"
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        with self._lock:
+            self._counters['probes'] += 1
+            backend.probe_latency_ms = latency_ms
+            if error is not None:
+                if backend.healthy:
+                    logger.warning(f"LLM backend {backend.name} failed its health check: {error}")
+                backend.healthy = False
+                self._record_failure(backend, error)
+                return
+
+            if not backend.healthy:
+                logger.info(f"LLM backend {backend.name} passed its health check again")
+            backend.healthy = True
+            if backend.draining and time.monotonic() - backend.drained_at >= self.min_drain_seconds:
+                backend.draining = False
+                backend.drained_at = None
+                backend.consecutive_failures = 0
+                self._counters['recoveries'] += 1
+                logger.info(f"LLM backend {backend.name} returned to service")
+
+    def _ensure_health_thread(self) -> None:
+        """Start the health thread on first use, and again in a forked child."""
+        if self.health_interval <= 0:
+            return
+        if self._health_thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._health_thread is not None and self._pid == os.getpid():
+                return
+            self._stop = threading.Event()
+            self._health_thread = threading.Thread(target=self._health_loop, name='llm-health', daemon=True)
+            self._pid = os.getpid()
+            self._health_thread.start()
+
+    def _health_loop(self) -> None:
+        stop = self._stop
+        while not stop.is_set():
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.error(f"Error during LLM health check: {str(e)}")
+                logger.error(f"Stack trace: {traceback.format_exc()}")
+            stop.wait(self.health_interval)
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['backends'] = [{
+                'name': backend.name,
+                'base_url': backend.base_url,
+                'model': backend.model,
+                'weight': backend.weight,
+                'state': backend.state(),
+                'outstanding': backend.outstanding,
+                'dispatched': backend.dispatched,
+                'failures': backend.failures,
+                'consecutive_failures': backend.consecutive_failures,
+                'last_error': backend.last_error,
+                'probe_latency_ms': backend.probe_latency_ms,
+                'breaker': backend.breaker.stats() if backend.breaker is not None else None,
+            } for backend in self.backends]
+        for entry, backend in zip(stats['backends'], self.backends):
+            entry['http_pool'] = backend.pool.stats()
+            entry['async_http_pool'] = backend.async_pool.stats()
+        return stats
+
+    def close(self) -> None:
+        """Stop health checks and close every backend's connections."""
+        self._stop.set()
+        for backend in self.backends:
+            backend.pool.close()
+            backend.async_pool.close()
+
+    async def aclose(self) -> None:
+        """Close the async connection pools; call from the event loop that used them."""
+        for backend in self.backends:
+            await backend.async_pool.aclose()
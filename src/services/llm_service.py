@@ -1,189 +1,31 @@
-import openai
-import json
-from typing import Optional, Dict, List, Union
+import asyncio
+import atexit
+import copy
+from typing import Optional, Dict, Iterator, List, Tuple
 import logging
-import re
-from html import unescape
 import os
+import re
+import threading
 import traceback
-import httpx
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import chain
+from types import SimpleNamespace
 from dotenv import load_dotenv
+from .admission import AdmissionController
+from .circuit_breaker import CircuitOpenError
+from .llm_cache import LLMResponseCache
+from .llm_hedging import HedgeAttempt, RequestHedger, abort_stream
+from .llm_router import Backend, LLMRouter
+from .single_flight import SingleFlight
+from .slide_stream_parser import SlideStreamParser
+from .presentation_schema import PRESENTATION_SCHEMA, SchemaError
+from .token_usage import TokenUsageRecorder
+from ..utils.json_repair import JsonRepairError, extract_json
 
-# Configure logging
-log_dir = "logs"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(log_dir, 'llm_service.log')),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-class LLMService:
-    def __init__(self):
-        load_dotenv()
-        self.api_key = os.getenv("OPENAI_API_KEY", "NO_NEED_IF_USING_LMSTUDIO")
-        self.base_url = os.getenv("LLM_BASE_URL", "http://127.0.0.1:1234/v1")
-        self.model_name = os.getenv("LLM_MODEL_NAME", "qwen2.5-7b-instruct-1m") # Default model name
-        logger.info(f"LLMService initialized with base_url: {self.base_url}, model_name: {self.model_name}")
-
-    def _get_client(self):
-        """Create a fresh client for each request to avoid state retention."""
-        try:
-            client = openai.OpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url,
-                http_client=httpx.Client(timeout=60.0)
-            )
-            logger.debug("OpenAI client created successfully")
-            return client
-        except Exception as e:
-            logger.error(f"Error creating OpenAI client: {str(e)}")
-            logger.error(f"Stack trace: {traceback.format_exc()}")
-            raise
-
-    def _clean_text(self, text: str) -> str:
-        """Clean text by removing HTML and special characters."""
-        try:
-            # Remove HTML tags
-            text = re.sub(r'<[^>]+>', '', text)
-            # Convert HTML entities
-            text = unescape(text)
-            # Remove asterisks
-            text = text.replace('*', '')
-            # Remove multiple spaces
-            text = ' '.join(text.split())
-            # Remove leading/trailing whitespace
-            text = text.strip()
-            return text
-        except Exception as e:
-            logger.error(f"Error cleaning text: {str(e)}")
-            logger.error(f"Original text: {text}")
-            logger.error(f"Stack trace: {traceback.format_exc()}")
-            return text
-
-    def _clean_content(self, content: Union[str, List, Dict]) -> Union[str, List, Dict]:
-        """Recursively clean content in all text fields."""
-        try:
-            if isinstance(content, str):
-                return self._clean_text(content)
-            elif isinstance(content, list):
-                return [self._clean_content(item) for item in content]
-            elif isinstance(content, dict):
-                return {k: self._clean_content(v) for k, v in content.items()}
-            return content
-        except Exception as e:
-            logger.error(f"Error cleaning content: {str(e)}")
-            logger.error(f"Content type: {type(content)}")
-            logger.error(f"Stack trace: {traceback.format_exc()}")
-            return content
-
-    def _extract_json_from_text(self, text: str) -> Optional[Dict]:
-        """Safely extract JSON from text response."""
-        logger.debug("Starting JSON extraction from text")
-        logger.debug(f"Raw text input:\n{text}")
-        
-        try:
-            # Try direct JSON parsing first
-            logger.debug("Attempting direct JSON parsing")
-            data = json.loads(text)
-            if self._validate_presentation_data(data):
-                logger.info("Successfully parsed JSON directly")
-                return data
-        except json.JSONDecodeError as e:
-            logger.debug(f"Direct JSON parsing failed: {str(e)}")
-        
-        try:
-            # Find JSON between curly braces
-            matches = re.findall(r'\{(?:[^{}]|\{[^{}]*\})*\}', text)
-            logger.debug(f"Found {len(matches)} potential JSON matches")
-            
-            for i, match in enumerate(matches):
-                try:
-                    json_str = self._clean_json_string(match)
-                    logger.debug(f"Attempting to parse match {i + 1}:\n{json_str}")
-                    
-                    data = json.loads(json_str)
-                    if self._validate_presentation_data(data):
-                        logger.info("Successfully extracted valid JSON from match")
-                        return data
-                except json.JSONDecodeError as e:
-                    logger.debug(f"Failed to parse match {i + 1}: {str(e)}")
-                    continue
-            
-            logger.error("No valid JSON structure found in any matches")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error during JSON extraction: {str(e)}")
-            logger.error(f"Stack trace: {traceback.format_exc()}")
-            return None
-
-    def _clean_json_string(self, json_str: str) -> str:
-        """Clean and prepare JSON string for parsing."""
-        try:
-            # Remove any markdown code block markers
-            json_str = re.sub(r'```json\s*|\s*```', '', json_str)
-            # Clean up the JSON string
-            json_str = json_str.strip()
-            # Remove any trailing commas before closing braces or brackets
-            json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-            return json_str
-        except Exception as e:
-            logger.error(f"Error cleaning JSON string: {str(e)}")
-            logger.error(f"Original string: {json_str}")
-            return json_str
-
-    def _validate_presentation_data(self, data: Dict) -> bool:
-        """Validate that the presentation data has all required fields."""
-        try:
-            required_fields = ['title', 'subtitle', 'slides']
-            missing_fields = [field for field in required_fields if field not in data]
-            
-            if missing_fields:
-                logger.error(f"Missing required fields: {missing_fields}")
-                logger.error(f"Found keys: {list(data.keys())}")
-                return False
-            
-            # Validate title and subtitle are non-empty strings
-            if not isinstance(data['title'], str) or not data['title'].strip():
-                logger.error("Title must be a non-empty string")
-                return False
-                
-            if not isinstance(data['subtitle'], str) or not data['subtitle'].strip():
-                logger.error("Subtitle must be a non-empty string")
-                return False
-            
-            # Validate slides array
-            if not isinstance(data['slides'], list) or not data['slides']:
-                logger.error("Slides must be a non-empty array")
-                return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error during validation: {str(e)}")
-            return False
-
-    def generate_presentation_content(self, topic: str) -> Optional[Dict]:
-        """Generate presentation content using the LLM."""
-        logger.info(f"Starting presentation generation for topic: {topic}")
-        
-        try:
-            # Get a fresh client
-            client = self._get_client()
-            
-            # Check if topic is too vague
-            if len(topic.split()) < 2:
-                logger.error(f"Topic '{topic}' is too vague")
-                raise ValueError("Please provide a more specific topic with at least 2-3 words for better results")
-            
-            system_prompt = """You are a presentation designer. Create a presentation outline about the given topic.
+SYSTEM_PROMPT = """You are a presentation designer. Create a presentation outline about the given topic.
             Return ONLY a JSON object with this structure, no other text. The JSON MUST contain ALL of these fields:
             {
                 "title": "Main presentation title (REQUIRED)",
@@ -233,71 +75,940 @@ class LLMService:
             }
             """
 
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Create a detailed presentation about: {topic}. Focus on providing comprehensive and specific content. Return only the JSON."}
-            ]
-            
-            logger.debug("Sending request to LLM")
+OUTLINE_SYSTEM_PROMPT = """You are a presentation designer. Plan the outline of a presentation about the given topic.
+            Return ONLY a JSON object with this structure, no other text:
+            {
+                "title": "Main presentation title (REQUIRED)",
+                "subtitle": "A descriptive subtitle that complements the title (REQUIRED - DO NOT OMIT)",
+                "theme": {
+                    "primary_color": "#0072C6",
+                    "secondary_color": "#404040",
+                    "accent_color": "#00B294",
+                    "background_color": "#FFFFFF"
+                },
+                "slides": [
+                    {
+                        "title": "Single string title only",
+                        "type": "title|content|table"
+                    }
+                ]
+            }
+
+            Rules:
+            1. First slide MUST be a title slide with the main presentation title
+            2. Use "table" only for slides that compare items or present structured data
+            3. Do not write any slide content yet, only titles and types
+            """
+
+SLIDE_SYSTEM_PROMPT = """You are a presentation designer writing the content of ONE slide of a larger presentation.
+            Return ONLY a JSON object with this structure, no other text:
+            {
+                "title": "The slide title you were given",
+                "content": ["Point 1", "Point 2"] or [["Header 1", "Header 2"], ["Row 1 Col 1", "Row 1 Col 2"]]
+            }
+
+            Rules:
+            1. For table slides, content must be a 2D array where first row is headers
+            2. For content slides, content must be an array of 3-6 specific strings
+            3. Only cover this slide's title; other slides in the outline cover the rest
+            """
+
+GENERATION_MODES = ('single', 'outline')
+
+# Layout used for each slide type when the layout is decided by the outline
+DEFAULT_LAYOUTS = {
+    'title': 'centered',
+    'content': 'split',
+    'table': 'table'
+}
+
+# Outline entries are only a title and a type, a small fraction of a written slide
+OUTLINE_TOKENS_PER_SLIDE = 40
+
+# Sent together with a reply that stopped at the token limit
+CONTINUE_PROMPT = ("Your previous reply was cut off by the length limit. Continue it exactly where it stopped, "
+                   "starting with the next character. Do not repeat anything, do not restart the JSON and "
+                   "do not add explanations or code fences.")
+
+# A continuation may open with a code fence or repeat the end of the previous part.
+# Shorter overlaps than STITCH_MIN_OVERLAP are too likely to be coincidental, and a
+# streamed continuation is held back until STITCH_WINDOW characters can be compared.
+_LEADING_FENCE = re.compile(r'\s*```(?:json)?[ \t]*\n?')
+STITCH_MIN_OVERLAP = 8
+STITCH_WINDOW = 200
+
+# Streamed replies only end with a usage chunk when asked to; openai 1.3 has no
+# stream_options argument, so the option goes in the request body
+STREAM_USAGE_BODY = {'stream_options': {'include_usage': True}}
+
+# Error logs keep only this many characters from each end of a reply that could not be parsed
+RAW_EXCERPT_CHARS = 200
+
+def _excerpt(text: str, edge: int = RAW_EXCERPT_CHARS) -> str:
+    """Return the first and last ``edge`` characters of text, or all of it when short."""
+    if len(text) <= 2 * edge:
+        return text
+    return f"{text[:edge]} ... {text[-edge:]}"
+
+class _PrefetchedStream:
+    """A streaming completion whose first chunks were already read while waiting for the first token."""
+
+    def __init__(self, first: List, stream):
+        self._chunks = chain(first, stream)
+        self.response = getattr(stream, 'response', None)
+
+    def __iter__(self):
+        return self._chunks
+
+class _CompletionCollector:
+    """Accumulates streamed chunks into a reply shaped like a non-streamed completion."""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.finish_reason = None
+        self.usage = None
+
+    def add(self, chunk) -> None:
+        self.usage = getattr(chunk, 'usage', None) or self.usage
+        if not chunk.choices:
+            return
+        choice = chunk.choices[0]
+        self.finish_reason = choice.finish_reason or self.finish_reason
+        if choice.delta.content:
+            self.parts.append(choice.delta.content)
+
+    def response(self) -> SimpleNamespace:
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=''.join(self.parts)),
+                                     finish_reason=self.finish_reason)],
+            usage=self.usage
+        )
+
+class LLMService:
+    def __init__(self):
+        load_dotenv()
+        self.api_key = os.getenv("OPENAI_API_KEY", "NO_NEED_IF_USING_LMSTUDIO")
+        self.base_url = os.getenv("LLM_BASE_URL", "http://127.0.0.1:1234/v1")
+        self.model_name = os.getenv("LLM_MODEL_NAME", "qwen2.5-7b-instruct-1m") # Default model name
+        self.system_prompt = SYSTEM_PROMPT
+        self.schema = PRESENTATION_SCHEMA
+        self.temperature = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+        self.max_tokens = int(os.getenv("LLM_MAX_TOKENS", "2000"))
+
+        # When a slide count is requested the token budget scales with it instead of
+        # using LLM_MAX_TOKENS, and replies cut off at the limit are continued
+        self.deck_base_tokens = int(os.getenv("LLM_DECK_BASE_TOKENS", "300"))
+        self.tokens_per_slide = int(os.getenv("LLM_TOKENS_PER_SLIDE", "220"))
+        self.max_token_budget = int(os.getenv("LLM_MAX_TOKEN_BUDGET", "8000"))
+        self.max_continuations = int(os.getenv("LLM_MAX_CONTINUATIONS", "2"))
+        self.usage = TokenUsageRecorder(max_recent=int(os.getenv("LLM_USAGE_RECENT", "50")))
+
+        # Response cache in front of generate_presentation_content
+        self.cache = LLMResponseCache(
+            cache_dir=os.getenv("LLM_CACHE_DIR", os.path.join("cache", "llm")),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", str(24 * 3600))),
+            max_memory_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256")),
+            max_disk_bytes=int(float(os.getenv("LLM_CACHE_MAX_DISK_MB", "64")) * 1024 * 1024),
+            enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        )
+
+        # Generation mode: 'single' asks for the whole deck in one call, 'outline' plans the
+        # deck first and then writes every slide concurrently on a bounded worker pool
+        self.generation_mode = os.getenv("LLM_GENERATION_MODE", "single").lower()
+        self.outline_max_tokens = int(os.getenv("LLM_OUTLINE_MAX_TOKENS", "600"))
+        self.slide_max_tokens = int(os.getenv("LLM_SLIDE_MAX_TOKENS", "600"))
+        self.slide_retries = int(os.getenv("LLM_SLIDE_RETRIES", "2"))
+        self.max_outline_slides = int(os.getenv("LLM_MAX_OUTLINE_SLIDES", "30"))
+        self.fanout_workers = int(os.getenv("LLM_FANOUT_WORKERS", "8"))
+        self._fanout_executor = ThreadPoolExecutor(
+            max_workers=self.fanout_workers,
+            thread_name_prefix='slide-worker'
+        )
+        self._fanout_lock = threading.Lock()
+        self._fanout_counters = {
+            'outlines': 0,
+            'slide_calls': 0,
+            'slide_retries': 0,
+            'slide_failures': 0,
+        }
+
+        # How often model output needed repairing before it would parse
+        self._json_lock = threading.Lock()
+        self._json_counters = {
+            'parsed': 0,
+            'repaired': 0,
+            'unrecoverable': 0,
+        }
+        self._json_repairs: Dict[str, int] = {}
+
+        # Concurrent identical requests share one LLM call
+        self.single_flight = SingleFlight()
+
+        # One or more backends (LLM_BACKENDS), each with a long-lived pooled client;
+        # every call goes to the healthy backend with the fewest outstanding requests
+        self.router = LLMRouter.from_env(self.api_key, self.base_url, self.model_name)
+
+        # Optional hedging: a call with no first token by the LLM_HEDGE_PERCENTILE deadline
+        # is duplicated on another backend and the slower of the two is cancelled
+        self.hedger = RequestHedger(
+            enabled=os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes"),
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+            initial_delay=float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "3")),
+            min_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.25")),
+            max_delay=float(os.getenv("LLM_HEDGE_MAX_DELAY", "10")),
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+            max_ratio=float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.1")),
+            workers=int(os.getenv("LLM_HEDGE_WORKERS", "32"))
+        )
+
+        # Bounded admission queue: at most ADMISSION_MAX_IN_FLIGHT generations reach the
+        # model at once, the rest wait their turn (round-robin per client) or get a 429
+        self.admission = AdmissionController.from_env()
+        atexit.register(self.close)
+        logger.info(f"LLMService initialized with base_url: {self.base_url}, model_name: {self.model_name}")
+
+    def close(self) -> None:
+        """Release pooled connections and worker threads held by the service."""
+        self._fanout_executor.shutdown(wait=False, cancel_futures=True)
+        self.hedger.close()
+        self.router.close()
+
+    def _parse_json(self, content: str, source: str) -> Tuple[Dict, List[str]]:
+        """Parse the JSON object in a model response, repairing common defects.
+
+        Prose, code fences, trailing commas, truncation and stray quotes are
+        fixed in one pass instead of failing the request and forcing a full
+        regeneration. Returns the object and the repairs applied; raises
+        ValueError when nothing can be recovered.
+        """
+        try:
+            data, repairs = extract_json(content)
+        except JsonRepairError as e:
+            self._count_json('unrecoverable')
+            logger.error(f"Failed to parse {source} as JSON: {str(e)}")
+            logger.error(f"Raw content ({len(content)} chars): {_excerpt(content)}")
+            logger.debug("Unparseable %s in full:\n%s", source, content)
+            raise ValueError("The AI service returned an invalid response format. Please try again.")
+
+        if repairs:
+            logger.warning(f"Repaired {source} JSON: {', '.join(repairs)}")
+            self._count_json('repaired', repairs)
+        else:
+            self._count_json('parsed')
+        return data, repairs
+
+    def _drop_partial_slide(self, data: Dict) -> Dict:
+        """Drop the last slide of a truncated deck if it was cut off part-way."""
+        slides = data.get('slides')
+        if isinstance(slides, list) and len(slides) > 1:
+            try:
+                self.schema.normalize_slide(len(slides) - 1, slides[-1])
+            except SchemaError as e:
+                logger.warning(f"Dropping slide {len(slides)} cut off by truncation: {e.describe()}")
+                data['slides'] = slides[:-1]
+        return data
+
+    def _count_json(self, outcome: str, repairs: List[str] = ()) -> None:
+        with self._json_lock:
+            self._json_counters[outcome] += 1
+            for repair in repairs:
+                self._json_repairs[repair] = self._json_repairs.get(repair, 0) + 1
+
+    def _json_stats(self) -> Dict:
+        with self._json_lock:
+            stats = dict(self._json_counters)
+            stats['repairs'] = dict(self._json_repairs)
+        return stats
+
+    def _header_valid(self, data: Dict) -> bool:
+        """Check the deck-level fields, logging the exact problems."""
+        errors = self.schema.validate_header(data)
+        if errors:
+            logger.error(f"Presentation failed validation: {SchemaError('', errors).describe()}")
+        return not errors
+
+    def _normalize_slide(self, index: int, slide: Dict) -> Dict:
+        """Validate and clean one slide, raising ValueError with a user-facing message."""
+        try:
+            return self.schema.normalize_slide(index, slide)
+        except SchemaError as e:
+            logger.error(f"Invalid slide {index+1}: {e.describe()}")
+            raise
+
+    @staticmethod
+    def _slide_count_instruction(slide_count: Optional[int]) -> str:
+        return f" Use exactly {slide_count} slides, including the title slide." if slide_count else ""
+
+    def _build_messages(self, topic: str, slide_count: Optional[int] = None) -> List[Dict]:
+        """Build the chat messages for a presentation request."""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": (
+                f"Create a detailed presentation about: {topic}. Focus on providing comprehensive and specific content."
+                f"{self._slide_count_instruction(slide_count)} Return only the JSON."
+            )}
+        ]
+
+    def _token_budget(self, slide_count: Optional[int]) -> int:
+        """Max tokens for a whole deck in one call, scaled to the requested slide count."""
+        if not slide_count:
+            return self.max_tokens
+        return min(self.max_token_budget, self.deck_base_tokens + self.tokens_per_slide * slide_count)
+
+    def _outline_budget(self, slide_count: Optional[int]) -> int:
+        """Max tokens for an outline call, raised for long decks."""
+        if not slide_count:
+            return self.outline_max_tokens
+        return min(self.max_token_budget,
+                   max(self.outline_max_tokens, self.deck_base_tokens + OUTLINE_TOKENS_PER_SLIDE * slide_count))
+
+    def _resolve_slide_count(self, slide_count) -> Optional[int]:
+        """Validate a requested slide count; None lets the model choose."""
+        if slide_count is None:
+            return None
+        if isinstance(slide_count, bool) or not isinstance(slide_count, int) \
+                or not 1 <= slide_count <= self.max_outline_slides:
+            logger.error(f"Invalid slide count: {slide_count!r}")
+            raise ValueError(f"slide_count must be a whole number between 1 and {self.max_outline_slides}.")
+        return slide_count
+
+    def _cache_key(self, topic: str, mode: str = 'single', slide_count: Optional[int] = None) -> str:
+        """Build the cache key for a topic under the current model and sampling settings."""
+        parts = {
+            'topic': LLMResponseCache.normalize_topic(topic),
+            'model': self.model_name,
+            'base_url': self.base_url,
+            'system_prompt': self.system_prompt,
+            'temperature': self.temperature,
+            'max_tokens': self.max_tokens
+        }
+        if slide_count:
+            parts.update({
+                'slide_count': slide_count,
+                'token_budget': self._token_budget(slide_count)
+            })
+        if mode == 'outline':
+            parts.update({
+                'mode': mode,
+                'outline_prompt': OUTLINE_SYSTEM_PROMPT,
+                'slide_prompt': SLIDE_SYSTEM_PROMPT,
+                'outline_max_tokens': self.outline_max_tokens,
+                'slide_max_tokens': self.slide_max_tokens
+            })
+        return LLMResponseCache.make_key(**parts)
+
+    def _resolve_mode(self, mode: Optional[str]) -> str:
+        """Return the generation mode for a request, falling back to the configured default."""
+        mode = (mode or self.generation_mode).lower()
+        if mode not in GENERATION_MODES:
+            logger.error(f"Unknown generation mode: {mode}")
+            raise ValueError(f"Unknown generation mode '{mode}'. Use one of: {', '.join(GENERATION_MODES)}.")
+        return mode
+
+    def get_stats(self) -> Dict:
+        """Return runtime counters for the service."""
+        return {
+            'cache': self.cache.stats(),
+            'admission': self.admission.stats(),
+            'router': self.router.stats(),
+            'hedging': self.hedger.stats(),
+            'single_flight': self.single_flight.stats(),
+            'fanout': self._fanout_stats(),
+            'json': self._json_stats(),
+            'usage': self.usage.stats()
+        }
+
+    def _fanout_stats(self) -> Dict:
+        with self._fanout_lock:
+            stats = dict(self._fanout_counters)
+        stats['workers'] = self.fanout_workers
+        return stats
+
+    def _count(self, counter: str) -> None:
+        with self._fanout_lock:
+            self._fanout_counters[counter] += 1
+
+    def _check_topic(self, topic: str) -> None:
+        """Reject topics that are too vague to produce a useful deck."""
+        if len(topic.split()) < 2:
+            logger.error(f"Topic '{topic}' is too vague")
+            raise ValueError("Please provide a more specific topic with at least 2-3 words for better results")
+
+    def generate_presentation_content(self, topic: str, use_cache: bool = True,
+                                      mode: Optional[str] = None,
+                                      slide_count: Optional[int] = None,
+                                      client: str = 'local') -> Optional[Dict]:
+        """Generate presentation content, serving repeated topics from the response cache.
+
+        Cache hits and callers coalesced onto an in-flight generation return at
+        once; a new generation first takes an admission slot for ``client`` and
+        raises AdmissionRejectedError if it cannot get one.
+        """
+        self._check_topic(topic)
+        mode = self._resolve_mode(mode)
+        slide_count = self._resolve_slide_count(slide_count)
+
+        key = self._cache_key(topic, mode, slide_count)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Serving cached presentation for topic: {topic}")
+                return cached
+        else:
+            self.cache.record_bypass()
+            logger.info(f"Cache bypass requested for topic: {topic}")
+
+        # Identical generations already in flight are shared instead of repeated
+        presentation_data, shared = self.single_flight.do(
+            key, lambda: self._generate_admitted(topic, key, mode, slide_count, client)
+        )
+        if shared:
+            logger.info(f"Coalesced with in-flight generation for topic: {topic}")
+        # Every caller gets its own copy; callers are free to mutate the result
+        return copy.deepcopy(presentation_data)
+
+    def _generate_admitted(self, topic: str, key: str, mode: str, slide_count: Optional[int],
+                           client: str) -> Optional[Dict]:
+        with self.admission.admit(client):
+            return self._generate_and_cache(topic, key, mode, slide_count)
+
+    def _generate_and_cache(self, topic: str, key: str, mode: str = 'single',
+                            slide_count: Optional[int] = None) -> Optional[Dict]:
+        """Generate a presentation and store it in the response cache."""
+        usage = self._start_usage(mode, slide_count)
+        try:
+            if mode == 'outline':
+                presentation_data = self._generate_outlined(topic, slide_count, usage)
+            else:
+                presentation_data = self._generate_uncached(topic, slide_count, usage)
+        except Exception:
+            self.usage.finish(usage, status='error')
+            raise
+        self.usage.finish(usage, slides=len(presentation_data['slides']))
+        self.cache.set(key, presentation_data)
+        return presentation_data
+
+    def _start_usage(self, mode: str, slide_count: Optional[int], streamed: bool = False) -> Dict:
+        """Start a token usage tally labelled with the budget of the request's first call."""
+        budget = self._outline_budget(slide_count) if mode == 'outline' else self._token_budget(slide_count)
+        return self.usage.start(mode=mode, slide_count=slide_count, max_tokens=budget, streamed=streamed)
+
+    def stream_presentation_content(self, topic: str, use_cache: bool = True,
+                                    mode: Optional[str] = None,
+                                    slide_count: Optional[int] = None,
+                                    client: str = 'local') -> Iterator[Tuple[str, Dict]]:
+        """Generate presentation content slide by slide.
+
+        The topic is checked eagerly so callers can reject a bad request before they
+        start streaming. The returned iterator yields ``(event, payload)`` pairs:
+        ``meta`` for deck-level fields, ``slide`` for each validated slide and a final
+        ``done``. Errors are raised from the iterator as ValueError/ConnectionError,
+        exactly as ``generate_presentation_content`` raises them. Admission is also
+        decided eagerly: AdmissionRejectedError is raised from this call.
+        """
+        self._check_topic(topic)
+        mode = self._resolve_mode(mode)
+        slide_count = self._resolve_slide_count(slide_count)
+        key = self._cache_key(topic, mode, slide_count)
+
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Streaming cached presentation for topic: {topic}")
+                return self._replay_presentation(cached)
+        else:
+            self.cache.record_bypass()
+            logger.info(f"Cache bypass requested for topic: {topic}")
+
+        if mode == 'outline':
+            events = self._stream_outlined(topic, key, slide_count)
+        else:
+            events = self._stream_uncached(topic, key, slide_count)
+        stream = self._admitted_stream(events, client)
+        # Runs up to the first yield, so the slot is held (or refused) before streaming starts
+        next(stream)
+        return stream
+
+    def _admitted_stream(self, events: Iterator[Tuple[str, Dict]], client: str) -> Iterator[Tuple[str, Dict]]:
+        """Hold an admission slot while ``events`` is consumed; the first yield is a priming step."""
+        with self.admission.admit(client):
+            try:
+                yield
+                yield from events
+            finally:
+                events.close()
+
+    def _replay_presentation(self, presentation_data: Dict) -> Iterator[Tuple[str, Dict]]:
+        """Replay a complete presentation as stream events."""
+        meta = {field: presentation_data[field] for field in ('title', 'subtitle', 'theme') if field in presentation_data}
+        yield 'meta', meta
+        for i, slide in enumerate(presentation_data['slides']):
+            yield 'slide', {'index': i, 'slide': slide}
+        yield 'done', {'slide_count': len(presentation_data['slides']), 'cached': True}
+
+    def _stream_uncached(self, topic: str, key: str, slide_count: Optional[int] = None) -> Iterator[Tuple[str, Dict]]:
+        """Stream the model output and emit each slide as soon as it is complete and valid.
+
+        If the model stops at the token limit before the deck is closed, the reply
+        is continued with a follow-up request and parsing carries on where it stopped.
+        """
+        logger.info(f"Starting streamed presentation generation for topic: {topic}")
+        messages = self._build_messages(topic, slide_count)
+        budget = self._token_budget(slide_count)
+        usage = self._start_usage('single', slide_count, streamed=True)
+
+        parser = SlideStreamParser()
+        presentation_data: Dict = {'slides': []}
+        status = 'error'
+        try:
+            for attempt in range(1 + self.max_continuations):
+                request = self._continuation_messages(messages, parser.text) if attempt else messages
+                finish_reason = yield from self._stream_round(request, budget, parser, presentation_data,
+                                                              usage, continuation=bool(attempt))
+                if parser.complete or finish_reason != 'length':
+                    break
+                if attempt < self.max_continuations:
+                    logger.warning(f"Streamed reply hit the {budget}-token limit after "
+                                   f"{len(presentation_data['slides'])} slides; continuing")
+
+            logger.debug("Received streamed response:\n%s", parser.text)
+            if not parser.text.strip():
+                logger.error("LLM returned empty response")
+                raise ValueError("The AI service returned an empty response. Please try again with a more specific topic.")
+
+            if not parser.complete or not self._header_valid(presentation_data):
+                logger.error("Streamed content failed validation")
+                raise ValueError("The generated presentation content was incomplete. Please try again with a more specific topic.")
+            status = 'ok'
+        finally:
+            self.usage.finish(usage, slides=len(presentation_data['slides']), status=status)
+
+        self.cache.set(key, presentation_data)
+        logger.info(f"Successfully streamed {len(presentation_data['slides'])} slides")
+        yield 'done', {'slide_count': len(presentation_data['slides']), 'cached': False}
+
+    def _stream_round(self, messages: List[Dict], max_tokens: int, parser: SlideStreamParser,
+                      presentation_data: Dict, usage: Dict, continuation: bool = False):
+        """Stream one completion into the parser, yielding slide events. Returns the finish reason."""
+        stream = self._create_completion(messages, max_tokens, stream=True)
+        finish_reason = None
+        reported_usage = None
+        # The start of a continuation is held back until it can be stitched onto the text so far
+        pending = '' if continuation else None
+        try:
             try:
-                response = client.chat.completions.create(
-                    model=self.model_name,
+                for chunk in stream:
+                    reported_usage = getattr(chunk, 'usage', None) or reported_usage
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    finish_reason = choice.finish_reason or finish_reason
+                    delta = choice.delta.content
+                    if not delta:
+                        continue
+
+                    if pending is not None:
+                        pending += delta
+                        if len(pending) < STITCH_WINDOW:
+                            continue
+                        delta, pending = self._stitch(parser.text, pending), None
+
+                    yield from self._feed_parser(parser, delta, presentation_data)
+                    if parser.complete:
+                        break
+
+                if pending:
+                    yield from self._feed_parser(parser, self._stitch(parser.text, pending), presentation_data)
+            except (ValueError, ConnectionError):
+                raise
+            except Exception as e:
+                logger.error(f"LLM streaming error: {str(e)}")
+                raise ConnectionError("The connection to the LLM service was interrupted. Please try again.")
+        finally:
+            self._close_stream(stream)
+            self.usage.add_call(usage, reported_usage, finish_reason, continuation)
+        return finish_reason
+
+    def _feed_parser(self, parser: SlideStreamParser, text: str, presentation_data: Dict) -> Iterator[Tuple[str, Dict]]:
+        """Feed streamed text to the parser and turn its events into validated stream events."""
+        for event, name, value in parser.feed(text):
+            if event == 'meta':
+                value = self.schema.clean(value)
+                presentation_data[name] = value
+                yield 'meta', {name: value}
+            elif event == 'slide':
+                slide = self._normalize_slide(name, value)
+                presentation_data['slides'].append(slide)
+                yield 'slide', {'index': name, 'slide': slide}
+            else:
+                raise ValueError(f"Invalid content in slide {name+1}. Please try again.")
+
+    def _generate_outline(self, topic: str, slide_count: Optional[int] = None,
+                          usage: Optional[Dict] = None) -> Dict:
+        """Ask the model for the deck title, subtitle, theme and slide titles/types only."""
+        self._count('outlines')
+        content = self._complete(self._outline_messages(topic, slide_count),
+                                 self._outline_budget(slide_count), usage, 'outline')
+        return self._parse_outline(content, slide_count)
+
+    def _outline_messages(self, topic: str, slide_count: Optional[int] = None) -> List[Dict]:
+        return [
+            {"role": "system", "content": OUTLINE_SYSTEM_PROMPT},
+            {"role": "user", "content": (
+                f"Create an outline for a detailed presentation about: {topic}."
+                f"{self._slide_count_instruction(slide_count)} Return only the JSON."
+            )}
+        ]
+
+    def _parse_outline(self, content: str, slide_count: Optional[int] = None) -> Dict:
+        """Parse and validate an outline response, keeping only titles and known slide types."""
+        logger.debug("Received outline:\n%s", content)
+
+        if not content:
+            logger.error("LLM returned empty outline")
+            raise ValueError("The AI service returned an empty response. Please try again with a more specific topic.")
+
+        outline, _ = self._parse_json(content, 'outline')
+        if not self._header_valid(outline):
+            logger.error("Generated outline failed validation")
+            raise ValueError("The generated presentation content was incomplete. Please try again with a more specific topic.")
+
+        slides = []
+        for i, entry in enumerate(outline['slides'][:slide_count or self.max_outline_slides]):
+            if not isinstance(entry, dict) or not isinstance(entry.get('title'), str) or not entry['title'].strip():
+                logger.error(f"Invalid outline entry {i+1}: {entry}")
+                raise ValueError(f"Invalid title in slide {i+1}. Please try again.")
+            slide_type = entry.get('type') if entry.get('type') in DEFAULT_LAYOUTS else 'content'
+            slides.append({'title': entry['title'], 'type': slide_type})
+        outline['slides'] = slides
+        return outline
+
+    def _generate_slide(self, topic: str, outline: Dict, index: int, usage: Optional[Dict] = None) -> Dict:
+        """Write one slide of an outline, retrying just this slide when its output is invalid."""
+        if outline['slides'][index]['type'] == 'title':
+            return self._title_slide(outline, index)
+        messages = self._slide_messages(topic, outline, index)
+
+        last_error: Optional[Exception] = None
+        for attempt in range(1 + self.slide_retries):
+            if attempt:
+                self._count('slide_retries')
+            self._count('slide_calls')
+            try:
+                content = self._complete(messages, self.slide_max_tokens, usage, f"slide {index+1}")
+                return self._slide_from_content(outline, index, content)
+            except (ValueError, ConnectionError) as e:
+                last_error = e
+                logger.warning(f"Slide {index+1} attempt {attempt+1} failed: {str(e)}")
+        raise self._slide_failure(index, last_error)
+
+    def _title_slide(self, outline: Dict, index: int) -> Dict:
+        """The title slide is fully determined by the outline."""
+        return self._normalize_slide(index, {
+            'title': outline['slides'][index]['title'],
+            'type': 'title',
+            'layout': DEFAULT_LAYOUTS['title'],
+            'content': [outline['subtitle']]
+        })
+
+    @staticmethod
+    def _slide_messages(topic: str, outline: Dict, index: int) -> List[Dict]:
+        entry = outline['slides'][index]
+        plan = "\n".join(f"{i+1}. {s['title']} ({s['type']})" for i, s in enumerate(outline['slides']))
+        return [
+            {"role": "system", "content": SLIDE_SYSTEM_PROMPT},
+            {"role": "user", "content": (
+                f"Presentation: {outline['title']} - {outline['subtitle']}\n"
+                f"Topic: {topic}\n"
+                f"Outline:\n{plan}\n\n"
+                f"Write slide {index+1}: \"{entry['title']}\" (type: {entry['type']}). Return only the JSON."
+            )}
+        ]
+
+    def _slide_from_content(self, outline: Dict, index: int, content: str) -> Dict:
+        entry = outline['slides'][index]
+        data, _ = self._parse_json(content, f"slide {index+1}")
+
+        # Title, type and layout come from the outline so the deck stays in order
+        slide = {
+            'title': entry['title'],
+            'type': entry['type'],
+            'layout': DEFAULT_LAYOUTS[entry['type']],
+            'content': data.get('content', [])
+        }
+        return self._normalize_slide(index, slide)
+
+    def _slide_failure(self, index: int, last_error: Optional[Exception]) -> Exception:
+        self._count('slide_failures')
+        if isinstance(last_error, ConnectionError):
+            return last_error
+        return ValueError(f"Could not generate valid content for slide {index+1}. Please try again.")
+
+    def _submit_slides(self, topic: str, outline: Dict, usage: Optional[Dict] = None) -> List[Future]:
+        """Schedule every slide of an outline on the shared worker pool."""
+        return [
+            self._fanout_executor.submit(self._generate_slide, topic, outline, i, usage)
+            for i in range(len(outline['slides']))
+        ]
+
+    @staticmethod
+    def _outline_meta(outline: Dict) -> Dict:
+        meta = {'title': outline['title'], 'subtitle': outline['subtitle']}
+        if isinstance(outline.get('theme'), dict):
+            meta['theme'] = outline['theme']
+        return meta
+
+    def _generate_outlined(self, topic: str, slide_count: Optional[int] = None,
+                           usage: Optional[Dict] = None) -> Optional[Dict]:
+        """Generate a deck as an outline call followed by concurrent per-slide calls."""
+        logger.info(f"Starting outlined presentation generation for topic: {topic}")
+
+        with self._generation_errors():
+            outline = self._generate_outline(topic, slide_count, usage)
+            logger.info(f"Outline ready with {len(outline['slides'])} slides; generating slide content")
+
+            futures = self._submit_slides(topic, outline, usage)
+            try:
+                slides = [future.result() for future in futures]
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+            return self._outlined_deck(outline, slides)
+
+    def _outlined_deck(self, outline: Dict, slides: List[Dict]) -> Dict:
+        presentation_data = self.schema.clean(self._outline_meta(outline))
+        presentation_data['slides'] = slides
+        logger.info("Successfully generated and validated outlined presentation content")
+        return presentation_data
+
+    def _stream_outlined(self, topic: str, key: str, slide_count: Optional[int] = None) -> Iterator[Tuple[str, Dict]]:
+        """Stream an outlined deck, emitting slides in order as their workers finish."""
+        logger.info(f"Starting streamed outlined generation for topic: {topic}")
+        usage = self._start_usage('outline', slide_count, streamed=True)
+        slides = []
+        status = 'error'
+        try:
+            outline = self._generate_outline(topic, slide_count, usage)
+
+            meta = self.schema.clean(self._outline_meta(outline))
+            yield 'meta', meta
+
+            futures = self._submit_slides(topic, outline, usage)
+            try:
+                for i, future in enumerate(futures):
+                    slide = future.result()
+                    slides.append(slide)
+                    yield 'slide', {'index': i, 'slide': slide}
+            finally:
+                for future in futures:
+                    future.cancel()
+            status = 'ok'
+        finally:
+            self.usage.finish(usage, slides=len(slides), status=status)
+
+        presentation_data = dict(meta)
+        presentation_data['slides'] = slides
+        self.cache.set(key, presentation_data)
+        yield 'done', {'slide_count': len(slides), 'cached': False}
+
+    def _complete(self, messages: List[Dict], max_tokens: int, usage: Optional[Dict], source: str) -> str:
+        """Run a completion and return its text, continuing it while it stops at the token limit."""
+        text = ''
+        for attempt in range(1 + self.max_continuations):
+            request = self._continuation_messages(messages, text) if attempt else messages
+            response = self._create_completion(request, max_tokens)
+            choice = response.choices[0]
+            self.usage.add_call(usage, getattr(response, 'usage', None), choice.finish_reason, bool(attempt))
+
+            part = choice.message.content or ''
+            text = text + self._stitch(text, part) if attempt else part
+            if choice.finish_reason != 'length':
+                break
+            if attempt < self.max_continuations:
+                logger.warning(f"{source} hit the {max_tokens}-token limit; requesting continuation {attempt+1}")
+        else:
+            logger.warning(f"{source} was still cut off after {self.max_continuations} continuations")
+        return text.strip()
+
+    @staticmethod
+    def _continuation_messages(messages: List[Dict], partial: str) -> List[Dict]:
+        """Messages asking the model to carry on from a reply that was cut off."""
+        return messages + [
+            {"role": "assistant", "content": partial},
+            {"role": "user", "content": CONTINUE_PROMPT}
+        ]
+
+    @staticmethod
+    def _stitch(previous: str, continuation: str) -> str:
+        """Return the part of a continuation to append, without a code fence or repeated text."""
+        if not previous:
+            return continuation
+        fence = _LEADING_FENCE.match(continuation)
+        if fence:
+            continuation = continuation[fence.end():]
+        # Models sometimes restart a little before the cut; drop the repeated overlap
+        for size in range(min(len(previous), len(continuation), STITCH_WINDOW), STITCH_MIN_OVERLAP - 1, -1):
+            if previous.endswith(continuation[:size]):
+                return continuation[size:]
+        return continuation
+
+    def _create_completion(self, messages: List[Dict], max_tokens: int, **kwargs):
+        """Call the chat completion API on a routed backend, mapping failures to ConnectionError."""
+        if self.hedger.enabled:
+            return self._hedged_completion(messages, max_tokens, **kwargs)
+
+        backend, response = self._open_completion(messages, max_tokens, [], **kwargs)
+        if kwargs.get('stream'):
+            # The backend stays busy until the stream is closed
+            return self.router.track_stream(backend, response)
+        self.router.release(backend)
+        return response
+
+    def _open_completion(self, messages: List[Dict], max_tokens: int, tried: List[Backend],
+                         exclude: List[Backend] = (), **kwargs) -> Tuple[Backend, object]:
+        """Send one completion request, moving to another backend if the connection cannot be opened.
+
+        Returns the backend, which the caller must release, and the response.
+        Backends used are appended to ``tried``.
+        """
+        if kwargs.get('stream'):
+            kwargs.setdefault('extra_body', STREAM_USAGE_BODY)
+        while True:
+            try:
+                backend = self.router.acquire(exclude=list(exclude) + tried)
+            except CircuitOpenError as e:
+                logger.error(f"LLM request rejected without sending: {str(e)}")
+                raise ConnectionError("The LLM service is temporarily unavailable. Please try again shortly.")
+            tried.append(backend)
+            try:
+                return backend, backend.client.chat.completions.create(
+                    model=backend.model,
                     messages=messages,
-                    temperature=0.7,
-                    max_tokens=2000
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    **kwargs
                 )
             except Exception as e:
-                logger.error(f"LLM API error: {str(e)}")
+                self.router.release(backend, e)
+                if self.router.should_retry(e, tried):
+                    logger.warning(f"LLM backend {backend.name} is unreachable ({str(e)}); trying another backend")
+                    continue
+                logger.error(f"LLM API error from backend {backend.name}: {str(e)}")
                 raise ConnectionError("Failed to connect to the LLM service. Please ensure the service is running and try again.")
+
+    def _hedged_completion(self, messages: List[Dict], max_tokens: int, stream: bool = False, **kwargs):
+        """Run a completion through the hedger.
+
+        Hedged calls are always streamed, since a stall can only be seen as a
+        missing first token; a non-streaming caller gets the collected reply
+        in the shape of a regular completion.
+        """
+        backend, response, first = self.hedger.run(
+            lambda attempt: self._first_token(messages, max_tokens, attempt, **kwargs),
+            self._discard_attempt
+        )
+        routed = self.router.track_stream(backend, _PrefetchedStream(first, response))
+        if stream:
+            return routed
+        return self._collect_stream(routed)
+
+    def _first_token(self, messages: List[Dict], max_tokens: int, attempt: HedgeAttempt, **kwargs):
+        """Start a streaming completion and read up to its first token. Runs on a hedge worker."""
+        if attempt.cancelled:
+            raise ConnectionError("Hedged request cancelled before it was sent")
+        backend, response = self._open_completion(messages, max_tokens, attempt.tried,
+                                                  attempt.exclude, stream=True, **kwargs)
+        attempt.bind(lambda: abort_stream(response))
+        first = []
+        try:
+            for chunk in response:
+                first.append(chunk)
+                if chunk.choices and (chunk.choices[0].delta.content or chunk.choices[0].finish_reason):
+                    break
+        except Exception as e:
+            self._close_stream(response)
+            if attempt.cancelled:
+                # Abandoned by the hedger; only a stalled primary counts against its backend
+                self.router.release(backend, attempt.failure, cancelled=attempt.failure is None)
+                raise ConnectionError("Hedged request cancelled")
+            self.router.release(backend, e)
+            logger.error(f"LLM streaming error from backend {backend.name}: {str(e)}")
+            raise ConnectionError("The connection to the LLM service was interrupted. Please try again.")
+        return backend, response, first
+
+    def _discard_attempt(self, result) -> None:
+        """Close an attempt that produced a token after another attempt had already won."""
+        backend, response, _ = result
+        self._close_stream(response)
+        self.router.release(backend, cancelled=True)
+
+    def _collect_stream(self, stream):
+        """Read a streamed completion to the end and return it shaped like a non-streamed one."""
+        collector = _CompletionCollector()
+        try:
+            for chunk in stream:
+                collector.add(chunk)
+        except Exception as e:
+            logger.error(f"LLM streaming error: {str(e)}")
+            raise ConnectionError("The connection to the LLM service was interrupted. Please try again.")
+        finally:
+            self._close_stream(stream)
+        return collector.response()
+
+    @staticmethod
+    def _close_stream(stream) -> None:
+        """Release the HTTP response behind a streaming completion."""
+        try:
+            close = getattr(stream, 'close', None)
+            if close is None and getattr(stream, 'response', None) is not None:
+                close = stream.response.close
+            if close is not None:
+                close()
+        except Exception as e:
+            logger.debug(f"Error closing LLM stream: {str(e)}")
+
+    def _generate_uncached(self, topic: str, slide_count: Optional[int] = None,
+                           usage: Optional[Dict] = None) -> Optional[Dict]:
+        """Generate presentation content using the LLM."""
+        logger.info(f"Starting presentation generation for topic: {topic}")
+        
+        with self._generation_errors():
+            messages = self._build_messages(topic, slide_count)
             
-            content = response.choices[0].message.content.strip()
-            logger.debug(f"Received raw response:\n{content}")
-            
-            if not content:
-                logger.error("LLM returned empty response")
-                raise ValueError("The AI service returned an empty response. Please try again with a more specific topic.")
-            
-            # Clean and parse the response
-            content = self._clean_json_string(content)
-            
-            try:
-                presentation_data = json.loads(content)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse LLM response as JSON: {str(e)}")
-                logger.error(f"Raw content: {content}")
-                raise ValueError("The AI service returned an invalid response format. Please try again.")
-            
-            if not self._validate_presentation_data(presentation_data):
-                logger.error("Generated content failed validation")
-                raise ValueError("The generated presentation content was incomplete. Please try again with a more specific topic.")
-            
-            # Additional validation for slide structure
-            for i, slide in enumerate(presentation_data.get('slides', [])):
-                if not isinstance(slide.get('title'), str):
-                    logger.error(f"Invalid slide {i+1} title: {slide.get('title')}")
-                    raise ValueError(f"Invalid title in slide {i+1}. Please try again.")
-                
-                if slide.get('type') not in ['title', 'content', 'table']:
-                    logger.error(f"Invalid slide {i+1} type: {slide.get('type')}")
-                    raise ValueError(f"Invalid type in slide {i+1}. Please try again.")
-                
-                if slide.get('layout') not in ['centered', 'split', 'table']:
-                    logger.error(f"Invalid slide {i+1} layout: {slide.get('layout')}")
-                    raise ValueError(f"Invalid layout in slide {i+1}. Please try again.")
-                
-                content = slide.get('content', [])
-                if slide.get('type') == 'table':
-                    if not isinstance(content, list) or not all(isinstance(row, list) for row in content):
-                        logger.error(f"Invalid table content structure in slide {i+1}: {content}")
-                        raise ValueError(f"Invalid table content in slide {i+1}. Please try again.")
-                else:
-                    if not isinstance(content, list) or not all(isinstance(item, str) for item in content):
-                        logger.error(f"Invalid content structure in slide {i+1}: {content}")
-                        raise ValueError(f"Invalid content in slide {i+1}. Please try again.")
-            
-            logger.info("Successfully generated and validated presentation content")
-            return self._clean_content(presentation_data)
-            
+            logger.debug("Sending request to LLM")
+            content = self._complete(messages, self._token_budget(slide_count), usage, 'LLM response')
+            return self._deck_from_content(content)
+
+    def _deck_from_content(self, content: str) -> Dict:
+        """Parse, repair and validate a whole-deck model response."""
+        logger.debug("Received raw response:\n%s", content)
+        
+        if not content:
+            logger.error("LLM returned empty response")
+            raise ValueError("The AI service returned an empty response. Please try again with a more specific topic.")
+        
+        # Parse the response, salvaging it if it is fenced, truncated or malformed
+        presentation_data, repairs = self._parse_json(content, 'LLM response')
+        if 'truncated' in repairs:
+            presentation_data = self._drop_partial_slide(presentation_data)
+        
+        # Validate and clean the whole deck in one pass
+        try:
+            presentation_data = self.schema.normalize(presentation_data)
+        except SchemaError as e:
+            logger.error(f"Generated content failed validation: {e.describe()}")
+            raise
+        
+        logger.info("Successfully generated and validated presentation content")
+        return presentation_data
+
+    @staticmethod
+    @contextmanager
+    def _generation_errors():
+        """Log generation failures, turning unexpected ones into a user-facing ValueError."""
+        try:
+            yield
         except ValueError as e:
             logger.error(f"Validation error: {str(e)}")
             raise
@@ -307,4 +1018,225 @@ class LLMService:
         except Exception as e:
             logger.error(f"Unexpected error: {str(e)}")
             logger.error(f"Stack trace: {traceback.format_exc()}")
-            raise ValueError("An unexpected error occurred. Please try again with a different topic.") 
\ No newline at end of file
+            raise ValueError("An unexpected error occurred. Please try again with a different topic.")
+
+    async def agenerate_presentation_content(self, topic: str, use_cache: bool = True,
+                                             mode: Optional[str] = None,
+                                             slide_count: Optional[int] = None,
+                                             client: str = 'local') -> Optional[Dict]:
+        """Async version of generate_presentation_content, used by the ASGI app.
+
+        Model calls go through each backend's AsyncOpenAI client, so a request
+        waiting on the model holds no thread. Cache, single-flight coalescing,
+        routing, hedging, admission and token accounting are shared with the sync path.
+        """
+        self._check_topic(topic)
+        mode = self._resolve_mode(mode)
+        slide_count = self._resolve_slide_count(slide_count)
+
+        key = self._cache_key(topic, mode, slide_count)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Serving cached presentation for topic: {topic}")
+                return cached
+        else:
+            self.cache.record_bypass()
+            logger.info(f"Cache bypass requested for topic: {topic}")
+
+        presentation_data, shared = await self.single_flight.ado(
+            key, lambda: self._agenerate_admitted(topic, key, mode, slide_count, client)
+        )
+        if shared:
+            logger.info(f"Coalesced with in-flight generation for topic: {topic}")
+        return copy.deepcopy(presentation_data)
+
+    async def _agenerate_admitted(self, topic: str, key: str, mode: str, slide_count: Optional[int],
+                                  client: str) -> Optional[Dict]:
+        async with self.admission.aadmit(client):
+            return await self._agenerate_and_cache(topic, key, mode, slide_count)
+
+    async def _agenerate_and_cache(self, topic: str, key: str, mode: str = 'single',
+                                   slide_count: Optional[int] = None) -> Optional[Dict]:
+        usage = self._start_usage(mode, slide_count)
+        try:
+            if mode == 'outline':
+                presentation_data = await self._agenerate_outlined(topic, slide_count, usage)
+            else:
+                presentation_data = await self._agenerate_uncached(topic, slide_count, usage)
+        except BaseException:
+            self.usage.finish(usage, status='error')
+            raise
+        self.usage.finish(usage, slides=len(presentation_data['slides']))
+        self.cache.set(key, presentation_data)
+        return presentation_data
+
+    async def _agenerate_uncached(self, topic: str, slide_count: Optional[int] = None,
+                                  usage: Optional[Dict] = None) -> Optional[Dict]:
+        logger.info(f"Starting async presentation generation for topic: {topic}")
+        with self._generation_errors():
+            messages = self._build_messages(topic, slide_count)
+            content = await self._acomplete(messages, self._token_budget(slide_count), usage, 'LLM response')
+            return self._deck_from_content(content)
+
+    async def _agenerate_outlined(self, topic: str, slide_count: Optional[int] = None,
+                                  usage: Optional[Dict] = None) -> Optional[Dict]:
+        logger.info(f"Starting async outlined presentation generation for topic: {topic}")
+        with self._generation_errors():
+            self._count('outlines')
+            content = await self._acomplete(self._outline_messages(topic, slide_count),
+                                            self._outline_budget(slide_count), usage, 'outline')
+            outline = self._parse_outline(content, slide_count)
+            logger.info(f"Outline ready with {len(outline['slides'])} slides; generating slide content")
+
+            # Same per-deck concurrency as the worker pool, without holding threads
+            limit = asyncio.Semaphore(self.fanout_workers)
+            tasks = [
+                asyncio.ensure_future(self._agenerate_slide(topic, outline, i, usage, limit))
+                for i in range(len(outline['slides']))
+            ]
+            try:
+                slides = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+            return self._outlined_deck(outline, slides)
+
+    async def _agenerate_slide(self, topic: str, outline: Dict, index: int, usage: Optional[Dict],
+                               limit: asyncio.Semaphore) -> Dict:
+        if outline['slides'][index]['type'] == 'title':
+            return self._title_slide(outline, index)
+        messages = self._slide_messages(topic, outline, index)
+
+        last_error: Optional[Exception] = None
+        async with limit:
+            for attempt in range(1 + self.slide_retries):
+                if attempt:
+                    self._count('slide_retries')
+                self._count('slide_calls')
+                try:
+                    content = await self._acomplete(messages, self.slide_max_tokens, usage, f"slide {index+1}")
+                    return self._slide_from_content(outline, index, content)
+                except (ValueError, ConnectionError) as e:
+                    last_error = e
+                    logger.warning(f"Slide {index+1} attempt {attempt+1} failed: {str(e)}")
+        raise self._slide_failure(index, last_error)
+
+    async def _acomplete(self, messages: List[Dict], max_tokens: int, usage: Optional[Dict], source: str) -> str:
+        """Async version of _complete, including continuation of replies cut off at the token limit."""
+        text = ''
+        for attempt in range(1 + self.max_continuations):
+            request = self._continuation_messages(messages, text) if attempt else messages
+            response = await self._acreate_completion(request, max_tokens)
+            choice = response.choices[0]
+            self.usage.add_call(usage, getattr(response, 'usage', None), choice.finish_reason, bool(attempt))
+
+            part = choice.message.content or ''
+            text = text + self._stitch(text, part) if attempt else part
+            if choice.finish_reason != 'length':
+                break
+            if attempt < self.max_continuations:
+                logger.warning(f"{source} hit the {max_tokens}-token limit; requesting continuation {attempt+1}")
+        else:
+            logger.warning(f"{source} was still cut off after {self.max_continuations} continuations")
+        return text.strip()
+
+    async def _acreate_completion(self, messages: List[Dict], max_tokens: int):
+        """Async, non-streaming version of _create_completion."""
+        if self.hedger.enabled:
+            backend, response, first = await self.hedger.arun(
+                lambda attempt: self._afirst_token(messages, max_tokens, attempt),
+                self._adiscard_attempt
+            )
+            return await self._acollect_stream(backend, response, first)
+
+        backend, response = await self._aopen_completion(messages, max_tokens, [])
+        self.router.release(backend)
+        return response
+
+    async def _aopen_completion(self, messages: List[Dict], max_tokens: int, tried: List[Backend],
+                                exclude: List[Backend] = (), attempt: Optional[HedgeAttempt] = None,
+                                **kwargs) -> Tuple[Backend, object]:
+        """Async version of _open_completion. A cancelled request releases its backend."""
+        if kwargs.get('stream'):
+            kwargs.setdefault('extra_body', STREAM_USAGE_BODY)
+        while True:
+            try:
+                backend = self.router.acquire(exclude=list(exclude) + tried)
+            except CircuitOpenError as e:
+                logger.error(f"LLM request rejected without sending: {str(e)}")
+                raise ConnectionError("The LLM service is temporarily unavailable. Please try again shortly.")
+            tried.append(backend)
+            try:
+                return backend, await backend.async_client.chat.completions.create(
+                    model=backend.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    **kwargs
+                )
+            except asyncio.CancelledError:
+                failure = attempt.failure if attempt is not None else None
+                self.router.release(backend, failure, cancelled=failure is None)
+                raise
+            except Exception as e:
+                self.router.release(backend, e)
+                if self.router.should_retry(e, tried):
+                    logger.warning(f"LLM backend {backend.name} is unreachable ({str(e)}); trying another backend")
+                    continue
+                logger.error(f"LLM API error from backend {backend.name}: {str(e)}")
+                raise ConnectionError("Failed to connect to the LLM service. Please ensure the service is running and try again.")
+
+    async def _afirst_token(self, messages: List[Dict], max_tokens: int, attempt: HedgeAttempt):
+        """Async version of _first_token; the hedger cancels the task of a losing attempt."""
+        backend, response = await self._aopen_completion(messages, max_tokens, attempt.tried,
+                                                         attempt.exclude, attempt, stream=True)
+        first = []
+        try:
+            async for chunk in response:
+                first.append(chunk)
+                if chunk.choices and (chunk.choices[0].delta.content or chunk.choices[0].finish_reason):
+                    break
+        except asyncio.CancelledError:
+            await response.response.aclose()
+            # Only a stalled primary counts against its backend
+            self.router.release(backend, attempt.failure, cancelled=attempt.failure is None)
+            raise
+        except Exception as e:
+            await response.response.aclose()
+            self.router.release(backend, e)
+            logger.error(f"LLM streaming error from backend {backend.name}: {str(e)}")
+            raise ConnectionError("The connection to the LLM service was interrupted. Please try again.")
+        return backend, response, first
+
+    async def _adiscard_attempt(self, result) -> None:
+        backend, response, _ = result
+        await response.response.aclose()
+        self.router.release(backend, cancelled=True)
+
+    async def _acollect_stream(self, backend: Backend, response, first: List):
+        """Read the rest of a hedged stream and release its backend."""
+        collector = _CompletionCollector()
+        error = None
+        cancelled = False
+        try:
+            for chunk in first:
+                collector.add(chunk)
+            async for chunk in response:
+                collector.add(chunk)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        except Exception as e:
+            error = e
+            logger.error(f"LLM streaming error: {str(e)}")
+            raise ConnectionError("The connection to the LLM service was interrupted. Please try again.")
+        finally:
+            await response.response.aclose()
+            self.router.release(backend, error, cancelled=cancelled)
+        return collector.response()
+
+    async def aclose(self) -> None:
+        """Close the async connection pools; call from the event loop that served requests."""
+        await self.router.aclose()
@@ -0,0 +1,95 @@
+import re
+from typing import Dict, List, Sequence
+from xml.sax.saxutils import escape
+
+from pptx.dml.color import RGBColor
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.util import Inches
+
+# Styling applied to every table cell. These match what the per-cell
+# python-pptx property calls used to produce, so output looks the same.
+FONT_NAME = 'Segoe UI'
+FONT_SIZE = 1800  # hundredths of a point
+MARGIN_X = Inches(0.1)
+MARGIN_Y = Inches(0.05)
+TABLE_STYLE_ID = '{5C22544A-7EE6-4342-B048-85BDC9FD1C3A}'
+
+# Characters that are not allowed in XML 1.0 text
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+class _CellStyle:
+    """Pre-rendered XML fragments for one cell style; only the text varies per cell."""
+
+    def __init__(self, align: str, bold: bool, fill: RGBColor, text_color: RGBColor):
+        bold_attr = ' b="1"' if bold else ''
+        self.paragraph_open = (
+            f'<a:p><a:pPr algn="{align}"><a:defRPr sz="{FONT_SIZE}"{bold_attr}>'
+            f'<a:solidFill><a:srgbClr val="{text_color}"/></a:solidFill>'
+            f'<a:latin typeface="{FONT_NAME}"/></a:defRPr></a:pPr>'
+        )
+        self.cell_open = '<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>'
+        self.cell_close = (
+            f'</a:txBody><a:tcPr anchor="ctr" marL="{MARGIN_X}" marR="{MARGIN_X}" '
+            f'marT="{MARGIN_Y}" marB="{MARGIN_Y}"><a:solidFill><a:srgbClr val="{fill}"/>'
+            f'</a:solidFill></a:tcPr></a:tc>'
+        )
+
+    def render(self, value) -> str:
+        parts = [self.cell_open]
+        for line in str(value).split('\n'):
+            parts.append(self.paragraph_open)
+            if line:
+                parts.append(f'<a:r><a:t>{escape(_INVALID_XML_CHARS.sub("", line))}</a:t></a:r>')
+            parts.append('</a:p>')
+        parts.append(self.cell_close)
+        return ''.join(parts)
+
+def table_xml(rows: Sequence[Sequence], num_cols: int, col_width: int, row_height: int,
+              colors: Dict[str, RGBColor]) -> str:
+    """Build the ``a:tbl`` XML for a styled table in a single pass.
+
+    The first row is the header; body rows alternate between the secondary and
+    background colors. Short rows are padded and long rows truncated to
+    ``num_cols`` cells.
+    """
+    header = _CellStyle('ctr', True, colors['primary'], colors['text'])
+    bands = (
+        _CellStyle('l', False, colors['background'], colors['text']),
+        _CellStyle('l', False, colors['secondary'], colors['text']),
+    )
+
+    parts = [
+        f'<a:tbl {nsdecls("a")}><a:tblPr firstRow="1" bandRow="1">',
+        f'<a:tableStyleId>{TABLE_STYLE_ID}</a:tableStyleId></a:tblPr><a:tblGrid>',
+        f'<a:gridCol w="{col_width}"/>' * num_cols,
+        '</a:tblGrid>'
+    ]
+    for row_idx, row in enumerate(rows):
+        style = header if row_idx == 0 else bands[row_idx % 2]
+        cells = list(row[:num_cols]) + [''] * (num_cols - len(row))
+        parts.append(f'<a:tr h="{row_height}">')
+        parts.extend(style.render(cell) for cell in cells)
+        parts.append('</a:tr>')
+    parts.append('</a:tbl>')
+    return ''.join(parts)
+
+def add_table(shapes, rows: Sequence[Sequence], left: int, top: int, width: int, row_height: int,
+              colors: Dict[str, RGBColor]):
+    """Add a styled table to a slide, writing its XML in one pass instead of cell by cell."""
+    rows = [row if isinstance(row, (list, tuple)) else [row] for row in rows]
+    num_cols = max((len(row) for row in rows), default=0) or 2
+    graphic_frame = shapes.add_table(1, num_cols, left, top, width, row_height * max(len(rows), 1))
+    tbl = graphic_frame._element.find('.//' + qn('a:tbl'))
+    tbl.getparent().replace(
+        tbl, parse_xml(table_xml(rows, num_cols, int(width / num_cols), row_height, colors))
+    )
+    return graphic_frame
+
+def paginate_rows(rows: List[Sequence], rows_per_slide: int) -> List[List[Sequence]]:
+    """Split table rows into pages of at most rows_per_slide, repeating the header row on each."""
+    if len(rows) <= rows_per_slide:
+        return [rows]
+    header, body = rows[0], rows[1:]
+    per_page = max(1, rows_per_slide - 1)
+    return [[header] + body[start:start + per_page] for start in range(0, len(body), per_page)]
@@ -1,141 +1,171 @@
-from pptx import Presentation as PPTXPresentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
-from datetime import datetime
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+from pptx.presentation import Presentation as PPTXDocument
+from pptx.slide import SlideLayout
+from lxml import etree
+import io
 import logging
 import os
-import glob
 import traceback
-from typing import Optional, List
-from ..models import Presentation, Slide
-
-# Configure logging
-log_dir = "logs"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(log_dir, 'presentation_generator.log')),
-        logging.StreamHandler()
-    ]
-)
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+from ..models import Presentation, Slide, Theme
+from . import pptx_table_writer
+from .fragment_cache import FragmentCache
+from .template_library import DEFAULT_TEMPLATE, TemplateLibrary
+
 logger = logging.getLogger(__name__)
 
+@dataclass
+class _Deck:
+    """The deck being built by one ``generate`` call."""
+    prs: PPTXDocument
+    colors: Dict[str, RGBColor]
+    layouts: Dict[str, SlideLayout]
+    template: str
+
 class PresentationGenerator:
-    def __init__(self):
-        try:
-            self.prs = PPTXPresentation()
-            # Set 16:9 aspect ratio
-            self.prs.slide_width = Inches(13.333)
-            self.prs.slide_height = Inches(7.5)
-            
-            self.colors = {
-                'primary': RGBColor(0x00, 0x72, 0xC6),    # Microsoft Blue
-                'secondary': RGBColor(0x40, 0x40, 0x40),   # Dark Gray
-                'accent': RGBColor(0x00, 0xB2, 0x94),     # Teal
-                'background': RGBColor(0x01, 0x16, 0x40),  # Dark Navy
-                'text': RGBColor(0xFF, 0xFF, 0xFF)        # White
-            }
-            
-            # Create presentations directory if it doesn't exist
-            self.output_dir = "presentations"
-            os.makedirs(self.output_dir, exist_ok=True)
-            logger.info("PresentationGenerator initialized successfully")
-            
-            # Clean up old presentations
-            self._cleanup_old_presentations()
-        except Exception as e:
-            logger.error(f"Error initializing PresentationGenerator: {str(e)}")
-            logger.error(f"Stack trace: {traceback.format_exc()}")
-            raise
+    """Builds styled PowerPoint decks in memory.
+
+    The generator holds no per-deck state: every call to ``generate`` builds a
+    fresh deck and threads it through the slide builders, so one instance can
+    be shared by concurrent requests.
+    """
+
+    # Table geometry; rows that do not fit above the bottom margin continue on a new slide
+    TABLE_LEFT = Inches(1.5)
+    TABLE_TOP = Inches(2.0)
+    TABLE_WIDTH = Inches(10.333)
+    TABLE_ROW_HEIGHT = Inches(0.6)
+    TABLE_ROWS_PER_SLIDE = int((Inches(7.5) - Inches(0.5) - TABLE_TOP) / TABLE_ROW_HEIGHT)
+
+    # Slide layouts used for each kind of slide, by name, with the index in
+    # python-pptx's default template as the fallback
+    LAYOUTS = {
+        'title': ('Title Slide', 0),
+        'content': ('Title and Content', 1),
+        'table': ('Title Only', 5),
+    }
+
+    def __init__(self, templates: Optional[TemplateLibrary] = None):
+        self.templates = templates or TemplateLibrary.from_env()
+        # Generated slide XML per source slide, reused when an unchanged slide is exported again
+        self.slide_cache = FragmentCache(
+            'pptx', max_entries=int(os.getenv("SLIDE_CACHE_MAX_ENTRIES", "2048"))
+        )
+        logger.info("PresentationGenerator initialized successfully")
+
+    @staticmethod
+    def _palette(theme: Theme) -> Dict[str, RGBColor]:
+        """Resolve a theme's hex colors to the RGB values used by the slide builders."""
+        return {
+            'primary': RGBColor.from_string(theme.primary_color.lstrip('#')),
+            'secondary': RGBColor.from_string(theme.secondary_color.lstrip('#')),
+            'accent': RGBColor.from_string(theme.accent_color.lstrip('#')),
+            'background': RGBColor.from_string(theme.background_color.lstrip('#')),
+            'text': RGBColor.from_string(theme.text_color.lstrip('#'))
+        }
+
+    def _open_deck(self, presentation: Presentation) -> _Deck:
+        """Open a fresh deck from the presentation's template.
+
+        The built-in template gets the background and decorations on its slide
+        master, built once per palette, so slides only reference them.
+        Corporate templates keep their own master design.
+        """
+        colors = self._palette(presentation.theme or Theme())
+        template = self.templates.resolve(presentation.template)
+        if template == DEFAULT_TEMPLATE:
+            prs = self.templates.open(
+                template,
+                theme_key=tuple(str(color) for color in colors.values()),
+                style_master=lambda slide: self._add_background_style(slide, colors)
+            )
+        else:
+            prs = self.templates.open(template)
+        prs.slide_width = Inches(13.333)
+        prs.slide_height = Inches(7.5)
+
+        layouts = {
+            kind: self.templates.layout(prs, template, name, fallback)
+            for kind, (name, fallback) in self.LAYOUTS.items()
+        }
+        return _Deck(prs=prs, colors=colors, layouts=layouts, template=template)
+
+    @staticmethod
+    def _capture_slides(deck: _Deck, first: int) -> List[Tuple[int, bytes]]:
+        """Serialize the slides added since index ``first`` as (layout index, cSld XML)."""
+        layouts = list(deck.prs.slide_layouts)
+        return [
+            (layouts.index(pptx_slide.slide_layout), etree.tostring(pptx_slide._element.cSld))
+            for pptx_slide in list(deck.prs.slides)[first:]
+        ]
+
+    @staticmethod
+    def _replay_slides(deck: _Deck, captured: List[Tuple[int, bytes]]) -> None:
+        """Append slides from captured XML instead of building them shape by shape."""
+        for layout_idx, xml in captured:
+            pptx_slide = deck.prs.slides.add_slide(deck.prs.slide_layouts[layout_idx])
+            sld = pptx_slide._element
+            sld.replace(sld.cSld, parse_xml(xml))
 
-    def generate(self, presentation: Presentation) -> Optional[str]:
-        """Generate a PowerPoint presentation."""
+    def generate(self, presentation: Presentation, tally: Optional[Dict] = None) -> bytes:
+        """Generate a PowerPoint presentation and return it as PPTX bytes.
+
+        Slides whose content, theme and template are unchanged since an earlier
+        export are copied from the slide cache; ``tally`` receives the hits and misses.
+        """
         try:
             logger.info(f"Starting presentation generation: {presentation.title}")
             
-            # Create a new presentation for each generation
-            self.prs = PPTXPresentation()
-            self.prs.slide_width = Inches(13.333)
-            self.prs.slide_height = Inches(7.5)
+            deck = self._open_deck(presentation)
+            theme = asdict(presentation.theme) if presentation.theme else None
             
             # Process each slide
             for i, slide in enumerate(presentation.slides):
+                key = FragmentCache.make_key(asdict(slide), theme, template=deck.template, is_title=i == 0)
+                captured = self.slide_cache.get(key, tally)
+                if captured is not None:
+                    self._replay_slides(deck, captured)
+                    continue
+
                 logger.debug(f"Processing slide {i+1}: {slide.title}")
+                first = len(deck.prs.slides)
                 try:
                     if i == 0 or slide.type == 'title':
-                        self._create_title_slide(slide)
+                        self._create_title_slide(deck, slide)
                     elif slide.type == 'table':
-                        self._create_table_slide(slide)
+                        self._create_table_slide(deck, slide)
                     else:
-                        self._create_content_slide(slide)
+                        self._create_content_slide(deck, slide)
+                    self.slide_cache.put(key, self._capture_slides(deck, first))
                 except Exception as e:
                     logger.error(f"Error creating slide {i+1}: {str(e)}")
                     logger.error(f"Stack trace: {traceback.format_exc()}")
                     # Continue with next slide instead of failing entire presentation
                     continue
             
-            # Generate unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"presentation_{timestamp}.pptx"
-            filepath = os.path.join(self.output_dir, filename)
-            
-            # Save the presentation
-            try:
-                self.prs.save(filepath)
-                logger.info(f"Presentation saved successfully: {filepath}")
-                return filename
-            except Exception as e:
-                logger.error(f"Error saving presentation: {str(e)}")
-                logger.error(f"Stack trace: {traceback.format_exc()}")
-                return None
+            # Write straight to memory; nothing touches the disk
+            pptx_stream = io.BytesIO()
+            deck.prs.save(pptx_stream)
+            logger.info(f"Presentation generated successfully: {presentation.title} ({len(presentation.slides)} slides)")
+            return pptx_stream.getvalue()
                 
         except Exception as e:
             logger.error(f"Error generating presentation: {str(e)}")
             logger.error(f"Stack trace: {traceback.format_exc()}")
-            return None
-
-    def _cleanup_old_presentations(self):
-        """Clean up old presentation files."""
-        try:
-            logger.info("Starting presentation cleanup")
-            # Clean up files in root directory
-            root_files = glob.glob("presentation_*.pptx")
-            for file in root_files:
-                try:
-                    os.remove(file)
-                    logger.info(f"Cleaned up old presentation: {file}")
-                except Exception as e:
-                    logger.error(f"Error cleaning up file {file}: {str(e)}")
-                    logger.error(f"Stack trace: {traceback.format_exc()}")
-            
-            # Clean up files in presentations directory
-            pres_files = glob.glob(os.path.join(self.output_dir, "presentation_*.pptx"))
-            # Keep only the 5 most recent files
-            if len(pres_files) > 5:
-                pres_files.sort(key=os.path.getctime)
-                for file in pres_files[:-5]:  # Keep only last 5 files
-                    try:
-                        os.remove(file)
-                        logger.info(f"Cleaned up old presentation: {file}")
-                    except Exception as e:
-                        logger.error(f"Error cleaning up file {file}: {str(e)}")
-                        logger.error(f"Stack trace: {traceback.format_exc()}")
-        except Exception as e:
-            logger.error(f"Error during presentation cleanup: {str(e)}")
-            logger.error(f"Stack trace: {traceback.format_exc()}")
+            raise
 
-    def _add_background_style(self, slide):
-        """Add modern background style to slide."""
+    def _add_background_style(self, slide, colors: Dict[str, RGBColor]):
+        """Add modern background style to slide (drawn once per palette onto the slide master)."""
         background = slide.background
         fill = background.fill
         fill.solid()
-        fill.fore_color.rgb = self.colors['background']
+        fill.fore_color.rgb = colors['background']
 
         # Add decorative shapes - positioned better for visual appeal
         shape_width = Inches(5)
@@ -158,14 +188,37 @@ class PresentationGenerator:
             )
             shape_fill = shape.fill
             shape_fill.solid()
-            shape_fill.fore_color.rgb = self.colors['primary']
+            shape_fill.fore_color.rgb = colors['primary']
             shape_fill.transparency = 0.85
             shape.rotation = rotation
 
-    def _create_title_slide(self, slide: Slide) -> None:
+    @staticmethod
+    def _add_bullet(paragraph, color: RGBColor) -> None:
+        """Give a text box paragraph an accent-colored bullet (python-pptx has no bullet API)."""
+        pPr = paragraph._p.get_or_add_pPr()
+        pPr.set('marL', str(Inches(0.35)))
+        pPr.set('indent', str(-Inches(0.35)))
+        # CT_TextParagraphProperties is a sequence: each bullet element goes
+        # before the ones that follow it in the schema (buChar before defRPr, ...)
+        bu_clr = pPr.insert_element_before(
+            pPr.makeelement(qn('a:buClr'), {}),
+            'a:buSzTx', 'a:buSzPct', 'a:buSzPts', 'a:buFontTx', 'a:buFont', 'a:buNone',
+            'a:buAutoNum', 'a:buChar', 'a:buBlip', 'a:tabLst', 'a:defRPr', 'a:extLst'
+        )
+        etree.SubElement(bu_clr, qn('a:srgbClr'), val=str(color))
+        pPr.insert_element_before(
+            pPr.makeelement(qn('a:buSzPts'), {'val': '1200'}),
+            'a:buFontTx', 'a:buFont', 'a:buNone', 'a:buAutoNum', 'a:buChar', 'a:buBlip',
+            'a:tabLst', 'a:defRPr', 'a:extLst'
+        )
+        pPr.insert_element_before(
+            pPr.makeelement(qn('a:buChar'), {'char': '\u2022'}),
+            'a:buBlip', 'a:tabLst', 'a:defRPr', 'a:extLst'
+        )
+
+    def _create_title_slide(self, deck: _Deck, slide: Slide) -> None:
         """Create a title slide with modern styling."""
-        pptx_slide = self.prs.slides.add_slide(self.prs.slide_layouts[0])
-        self._add_background_style(pptx_slide)
+        pptx_slide = deck.prs.slides.add_slide(deck.layouts['title'])
         
         try:
             # Center the title and subtitle in the middle of the slide
@@ -189,7 +242,7 @@ class PresentationGenerator:
             p.alignment = PP_ALIGN.CENTER
             p.font.size = Pt(44)
             p.font.bold = True
-            p.font.color.rgb = self.colors['text']
+            p.font.color.rgb = deck.colors['text']
             p.font.name = 'Segoe UI Light'
             
             # Calculate subtitle position based on title height
@@ -211,7 +264,7 @@ class PresentationGenerator:
                 p.text = content_text
                 p.alignment = PP_ALIGN.CENTER
                 p.font.size = Pt(32)
-                p.font.color.rgb = self.colors['accent']
+                p.font.color.rgb = deck.colors['accent']
                 p.font.name = 'Segoe UI'
                 p.space_after = Pt(32)
 
@@ -231,16 +284,15 @@ class PresentationGenerator:
             )
             line_fill = line.fill
             line_fill.solid()
-            line_fill.fore_color.rgb = self.colors['accent']
+            line_fill.fore_color.rgb = deck.colors['accent']
             line.line.fill.background()
 
         except Exception as e:
             logger.error(f"Error creating title slide: {e}")
 
-    def _create_content_slide(self, slide: Slide) -> None:
+    def _create_content_slide(self, deck: _Deck, slide: Slide) -> None:
         """Create a content slide with modern styling."""
-        pptx_slide = self.prs.slides.add_slide(self.prs.slide_layouts[1])
-        self._add_background_style(pptx_slide)
+        pptx_slide = deck.prs.slides.add_slide(deck.layouts['content'])
         
         try:
             # Define content area dimensions with better margins
@@ -262,7 +314,7 @@ class PresentationGenerator:
             p.alignment = PP_ALIGN.LEFT
             p.font.size = Pt(36)
             p.font.bold = True
-            p.font.color.rgb = self.colors['text']
+            p.font.color.rgb = deck.colors['text']
             p.font.name = 'Segoe UI'
             p.space_after = Pt(32)
 
@@ -282,14 +334,13 @@ class PresentationGenerator:
                     p = text_frame.add_paragraph()
                     p.text = str(point)
                     p.font.size = Pt(24)
-                    p.font.color.rgb = self.colors['text']
+                    p.font.color.rgb = deck.colors['text']
                     p.font.name = 'Segoe UI'
                     p.level = 0
                     p.space_after = Pt(16)  # Increased spacing between points
                     p.space_before = Pt(8)  # Added spacing before points
                     # Add bullet points
-                    p.bullet.size = Pt(12)
-                    p.bullet.font.color.rgb = self.colors['accent']
+                    self._add_bullet(p, deck.colors['accent'])
 
             # Add accent line
             accent = pptx_slide.shapes.add_shape(
@@ -301,17 +352,26 @@ class PresentationGenerator:
             )
             accent_fill = accent.fill
             accent_fill.solid()
-            accent_fill.fore_color.rgb = self.colors['accent']
+            accent_fill.fore_color.rgb = deck.colors['accent']
             accent.line.fill.background()
 
         except Exception as e:
             logger.error(f"Error creating content slide: {str(e)}")
             logger.error(f"Stack trace: {traceback.format_exc()}")
 
-    def _create_table_slide(self, slide: Slide) -> None:
-        """Create a slide with a table."""
-        pptx_slide = self.prs.slides.add_slide(self.prs.slide_layouts[5])  # Using blank layout
-        self._add_background_style(pptx_slide)
+    def _create_table_slide(self, deck: _Deck, slide: Slide) -> None:
+        """Create a table slide, continuing long tables onto extra slides."""
+        rows = slide.content if isinstance(slide.content, list) else []
+        pages = pptx_table_writer.paginate_rows(rows, self.TABLE_ROWS_PER_SLIDE)
+        for page_idx, page_rows in enumerate(pages):
+            title = slide.title if page_idx == 0 else f"{slide.title} (cont.)"
+            self._create_table_page(deck, title, page_rows)
+        if len(pages) > 1:
+            logger.debug(f"Split table '{slide.title}' ({len(rows)} rows) across {len(pages)} slides")
+
+    def _create_table_page(self, deck: _Deck, title: str, rows: List) -> None:
+        """Create a single slide holding (part of) a table."""
+        pptx_slide = deck.prs.slides.add_slide(deck.layouts['table'])
         
         try:
             # Add title with proper spacing
@@ -328,67 +388,22 @@ class PresentationGenerator:
             title_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
             
             p = title_frame.add_paragraph()
-            p.text = slide.title
+            p.text = title
             p.alignment = PP_ALIGN.LEFT
             p.font.size = Pt(44)
             p.font.bold = True
-            p.font.color.rgb = self.colors['text']
+            p.font.color.rgb = deck.colors['text']
             p.font.name = 'Segoe UI'
             p.space_after = Pt(24)
 
-            # Process table content
-            if isinstance(slide.content, list):
-                # Calculate table dimensions
-                rows = slide.content
-                num_rows = len(rows)
-                num_cols = len(rows[0]) if rows else 2
-                
-                # Create table with better positioning
-                table_left = Inches(1.5)
-                table_top = Inches(2.0)
-                table_width = Inches(10.333)
-                row_height = Inches(0.6)
-                
-                table = pptx_slide.shapes.add_table(
-                    num_rows, num_cols,
-                    table_left, table_top,
-                    table_width, row_height * num_rows
-                ).table
-
-                # Set column widths evenly
-                col_width = table_width / num_cols
-                for col in table.columns:
-                    col.width = col_width
-                
-                # Add data to table with improved formatting
-                for row_idx, row_data in enumerate(rows):
-                    for col_idx, cell_data in enumerate(row_data):
-                        cell = table.cell(row_idx, col_idx)
-                        cell.text = str(cell_data)
-                        
-                        # Apply cell formatting
-                        paragraph = cell.text_frame.paragraphs[0]
-                        paragraph.font.size = Pt(18)
-                        paragraph.font.color.rgb = self.colors['text']
-                        paragraph.font.name = 'Segoe UI'
-                        
-                        # Center align headers (first row)
-                        if row_idx == 0:
-                            paragraph.alignment = PP_ALIGN.CENTER
-                            paragraph.font.bold = True
-                            cell.fill.solid()
-                            cell.fill.fore_color.rgb = self.colors['primary']
-                        else:
-                            paragraph.alignment = PP_ALIGN.LEFT
-                            cell.fill.solid()
-                            cell.fill.fore_color.rgb = self.colors['background'] if row_idx % 2 == 0 else self.colors['secondary']
-                        
-                        # Adjust cell margins and vertical alignment
-                        cell.vertical_anchor = MSO_ANCHOR.MIDDLE
-                        cell.margin_left = Inches(0.1)
-                        cell.margin_right = Inches(0.1)
-                        cell.margin_top = Inches(0.05)
-                        cell.margin_bottom = Inches(0.05)
+            # Write the whole table in one pass from pre-rendered cell templates
+            if rows:
+                pptx_table_writer.add_table(
+                    pptx_slide.shapes, rows,
+                    self.TABLE_LEFT, self.TABLE_TOP,
+                    self.TABLE_WIDTH, self.TABLE_ROW_HEIGHT,
+                    deck.colors
+                )
 
             # Add accent line
             accent = pptx_slide.shapes.add_shape(
@@ -400,7 +415,7 @@ class PresentationGenerator:
             )
             accent_fill = accent.fill
             accent_fill.solid()
-            accent_fill.fore_color.rgb = self.colors['accent']
+            accent_fill.fore_color.rgb = deck.colors['accent']
             accent.line.fill.background()
 
         except Exception as e:
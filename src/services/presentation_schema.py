@@ -0,0 +1,190 @@
+import re
+from html import unescape
+from typing import Any, Callable, Dict, List, Tuple
+
+SLIDE_TYPES = ('title', 'content', 'table')
+SLIDE_LAYOUTS = ('centered', 'split', 'table')
+
+INCOMPLETE_MESSAGE = "The generated presentation content was incomplete. Please try again with a more specific topic."
+
+# (path, message) pairs, e.g. ('slides[2].content[1]', 'expected a string, got int')
+SchemaIssue = Tuple[str, str]
+
+class SchemaError(ValueError):
+    """Raised when presentation data does not match the schema.
+
+    ``str(error)`` is the user-facing message for the first problem found;
+    ``errors`` lists every problem with its exact path in the document.
+    """
+
+    def __init__(self, message: str, errors: List[SchemaIssue]):
+        super().__init__(message)
+        self.errors = errors
+
+    def describe(self) -> str:
+        return '; '.join(f"{path}: {message}" for path, message in self.errors)
+
+def _type_name(value: Any) -> str:
+    return 'null' if value is None else type(value).__name__
+
+class PresentationSchema:
+    """Validates and cleans LLM presentation output in a single walk.
+
+    The rules are compiled once into a per-field dispatch table, and every
+    string is cleaned the moment its field is validated, so a deck is
+    traversed exactly once. Output matches the old validate-then-clean chain.
+    """
+
+    _TAGS = re.compile(r'<[^>]+>')
+
+    def __init__(self, slide_types=SLIDE_TYPES, layouts=SLIDE_LAYOUTS):
+        self.slide_types = frozenset(slide_types)
+        self.layouts = frozenset(layouts)
+        self._slide_fields: Dict[str, Callable] = {
+            'title': self._slide_title,
+            'type': self._slide_enum('type', self.slide_types),
+            'layout': self._slide_enum('layout', self.layouts),
+            'content': self._slide_content,
+        }
+
+    # -- cleaning -----------------------------------------------------------
+
+    def clean_text(self, text: str) -> str:
+        """Strip HTML tags, decode entities, drop asterisks and collapse whitespace."""
+        # Each step only runs when its marker character is present; most text has none
+        if '<' in text:
+            text = self._TAGS.sub('', text)
+        if '&' in text:
+            text = unescape(text)
+        if '*' in text:
+            text = text.replace('*', '')
+        return ' '.join(text.split())
+
+    def clean(self, value: Any) -> Any:
+        """Clean every string in an arbitrary JSON value."""
+        if isinstance(value, str):
+            return self.clean_text(value)
+        if isinstance(value, list):
+            return [self.clean(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self.clean(item) for key, item in value.items()}
+        return value
+
+    # -- slide fields -------------------------------------------------------
+
+    def _slide_title(self, value: Any, path: str, slide: Dict, errors: List[SchemaIssue]) -> Any:
+        if not isinstance(value, str):
+            errors.append((f"{path}.title", f"expected a string, got {_type_name(value)}"))
+            return value
+        return self.clean_text(value)
+
+    @staticmethod
+    def _slide_enum(field: str, choices: frozenset) -> Callable:
+        allowed = ', '.join(sorted(choices))
+
+        def check(value: Any, path: str, slide: Dict, errors: List[SchemaIssue]) -> Any:
+            if value not in choices:
+                errors.append((f"{path}.{field}", f"expected one of {allowed}, got {value!r}"))
+            return value
+
+        return check
+
+    def _slide_content(self, value: Any, path: str, slide: Dict, errors: List[SchemaIssue]) -> Any:
+        path = f"{path}.content"
+        if not isinstance(value, list):
+            errors.append((path, f"expected an array, got {_type_name(value)}"))
+            return value
+
+        cleaned = []
+        if slide.get('type') == 'table':
+            for i, row in enumerate(value):
+                if not isinstance(row, list):
+                    errors.append((f"{path}[{i}]", f"expected a table row array, got {_type_name(row)}"))
+                    cleaned.append(row)
+                else:
+                    cleaned.append([self.clean_text(cell) if isinstance(cell, str) else self.clean(cell)
+                                    for cell in row])
+        else:
+            for i, item in enumerate(value):
+                if not isinstance(item, str):
+                    errors.append((f"{path}[{i}]", f"expected a string, got {_type_name(item)}"))
+                    cleaned.append(item)
+                else:
+                    cleaned.append(self.clean_text(item))
+        return cleaned
+
+    # -- documents ----------------------------------------------------------
+
+    def _walk_slide(self, index: int, slide: Any, errors: List[SchemaIssue]) -> Any:
+        path = f"slides[{index}]"
+        if not isinstance(slide, dict):
+            errors.append((path, f"expected an object, got {_type_name(slide)}"))
+            return slide
+
+        # 'content' is optional, every other checked field must be present
+        for field in ('title', 'type', 'layout'):
+            if field not in slide:
+                errors.append((f"{path}.{field}", "is required"))
+
+        cleaned = {}
+        for key, value in slide.items():
+            handler = self._slide_fields.get(key)
+            cleaned[key] = handler(value, path, slide, errors) if handler else self.clean(value)
+        return cleaned
+
+    def validate_header(self, data: Any) -> List[SchemaIssue]:
+        """Check the deck-level fields (title, subtitle, slides) without walking the slides."""
+        if not isinstance(data, dict):
+            return [('', f"expected an object, got {_type_name(data)}")]
+        errors = []
+        for field in ('title', 'subtitle'):
+            if field not in data:
+                errors.append((field, "is required"))
+            elif not isinstance(data[field], str) or not data[field].strip():
+                errors.append((field, "expected a non-empty string"))
+        if 'slides' not in data:
+            errors.append(('slides', "is required"))
+        elif not isinstance(data['slides'], list) or not data['slides']:
+            errors.append(('slides', "expected a non-empty array"))
+        return errors
+
+    def normalize_slide(self, index: int, slide: Any) -> Dict:
+        """Validate and clean one slide, raising SchemaError with its error paths."""
+        errors: List[SchemaIssue] = []
+        cleaned = self._walk_slide(index, slide, errors)
+        if errors:
+            raise SchemaError(self._slide_message(errors[0]), errors)
+        return cleaned
+
+    def normalize(self, data: Any) -> Dict:
+        """Validate and clean a whole deck in one pass.
+
+        Every problem is collected before raising, so the SchemaError lists all
+        error paths; its message describes the first one.
+        """
+        errors = self.validate_header(data)
+        if errors:
+            raise SchemaError(INCOMPLETE_MESSAGE, errors)
+
+        cleaned = {}
+        for key, value in data.items():
+            if key == 'slides':
+                cleaned[key] = [self._walk_slide(i, slide, errors) for i, slide in enumerate(value)]
+            else:
+                cleaned[key] = self.clean(value)
+        if errors:
+            raise SchemaError(self._slide_message(errors[0]), errors)
+        return cleaned
+
+    @staticmethod
+    def _slide_message(issue: SchemaIssue) -> str:
+        """User-facing message for a slide-level issue, matching the service's wording."""
+        path = issue[0]
+        index = int(path[len('slides['):path.index(']')])
+        rest = path[path.index(']') + 1:].lstrip('.')
+        field = rest.split('[', 1)[0].split('.', 1)[0]
+        if not field:
+            return f"Invalid slide {index + 1}. Please try again."
+        return f"Invalid {field} in slide {index + 1}. Please try again."
+
+PRESENTATION_SCHEMA = PresentationSchema()
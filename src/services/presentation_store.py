@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.json_patch import apply_patch
+
+logger = logging.getLogger(__name__)
+
+class VersionConflictError(Exception):
+    """Raised when an edit was made against an outdated version of a deck."""
+
+class PresentationStore:
+    """SQLite-backed store of generated decks, addressed by a stable id.
+
+    Each deck carries a version that increases with every edit, so
+    ``(id, version)`` identifies an exact deck and doubles as a cache key.
+    """
+
+    def __init__(self, db_path: str = os.path.join("data", "presentations.db"), max_age_days: float = 30.0):
+        self.db_path = db_path
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._counters = {
+            'saved': 0,
+            'patched': 0,
+            'conflicts': 0,
+            'purged': 0,
+        }
+        self.purge_expired()
+        logger.info(f"PresentationStore initialized (db={db_path}, max_age_days={max_age_days})")
+
+    @classmethod
+    def from_env(cls) -> 'PresentationStore':
+        """Build a store using the PRESENTATION_* environment settings."""
+        return cls(
+            db_path=os.getenv("PRESENTATION_DB", os.path.join("data", "presentations.db")),
+            max_age_days=float(os.getenv("PRESENTATION_MAX_AGE_DAYS", "30"))
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database lazily, and again after a fork. Caller holds the lock."""
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS presentations ('
+                ' id TEXT PRIMARY KEY,'
+                ' version INTEGER NOT NULL,'
+                ' data TEXT NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            self._conn.commit()
+            self._pid = os.getpid()
+        return self._conn
+
+    def save(self, presentation: Dict) -> Tuple[str, int]:
+        """Store a new deck and return its id and version."""
+        presentation_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                'INSERT INTO presentations (id, version, data, created_at, updated_at) VALUES (?, 1, ?, ?, ?)',
+                (presentation_id, json.dumps(presentation, ensure_ascii=False), now, now)
+            )
+            conn.commit()
+            self._counters['saved'] += 1
+        logger.info(f"Stored presentation {presentation_id}")
+        return presentation_id, 1
+
+    def get(self, presentation_id: str) -> Optional[Tuple[Dict, int]]:
+        """Return ``(deck, version)``, or None if the id is unknown."""
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT data, version FROM presentations WHERE id = ?', (presentation_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def patch(self, presentation_id: str, operations: List[Dict], expected_version: Optional[int] = None,
+              validate=None) -> Optional[Tuple[Dict, int]]:
+        """Apply a JSON Patch to a stored deck and return the new ``(deck, version)``.
+
+        Returns None if the id is unknown. Raises VersionConflictError when
+        ``expected_version`` is stale, and ValueError (from the patch or from
+        ``validate``) when the edit is invalid; the stored deck is then unchanged.
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                'SELECT data, version FROM presentations WHERE id = ?', (presentation_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            current, version = json.loads(row[0]), row[1]
+            if expected_version is not None and expected_version != version:
+                self._counters['conflicts'] += 1
+                raise VersionConflictError(
+                    f"Presentation {presentation_id} is at version {version}, not {expected_version}"
+                )
+
+            updated = apply_patch(current, operations)
+            if validate is not None:
+                validate(updated)
+
+            conn.execute(
+                'UPDATE presentations SET data = ?, version = ?, updated_at = ? WHERE id = ?',
+                (json.dumps(updated, ensure_ascii=False), version + 1, time.time(), presentation_id)
+            )
+            conn.commit()
+            self._counters['patched'] += 1
+        logger.info(f"Patched presentation {presentation_id} to version {version + 1} ({len(operations)} ops)")
+        return updated, version + 1
+
+    def delete(self, presentation_id: str) -> bool:
+        with self._lock:
+            conn = self._connection()
+            deleted = conn.execute('DELETE FROM presentations WHERE id = ?', (presentation_id,)).rowcount
+            conn.commit()
+        return deleted > 0
+
+    def purge_expired(self) -> int:
+        """Delete decks that have not been updated within max_age_days."""
+        if self.max_age_days <= 0:
+            return 0
+        cutoff = time.time() - self.max_age_days * 86400
+        try:
+            with self._lock:
+                conn = self._connection()
+                purged = conn.execute('DELETE FROM presentations WHERE updated_at < ?', (cutoff,)).rowcount
+                conn.commit()
+                self._counters['purged'] += purged
+            if purged:
+                logger.info(f"Purged {purged} expired presentations")
+            return purged
+        except Exception as e:
+            logger.error(f"Error purging expired presentations: {str(e)}")
+            return 0
+
+    def ping(self) -> None:
+        """Raise if the database cannot be read."""
+        with self._lock:
+            self._connection().execute('SELECT 1').fetchone()
+
+    def close(self) -> None:
+        """Close this process's connection; the next call opens a new one.
+
+        Call it before forking workers so they do not inherit an open connection.
+        """
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['stored'] = self._connection().execute('SELECT COUNT(*) FROM presentations').fetchone()[0]
+            return stats
@@ -0,0 +1,159 @@
+import asyncio
+import copy
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    """State shared between the leader of an in-flight call and its waiters."""
+
+    __slots__ = ('done', 'result', 'error', 'abandoned', 'waiters', 'async_waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        # The leader was interrupted (e.g. its task was cancelled) and produced nothing to share
+        self.abandoned = False
+        self.waiters = 0
+        # Async waiters await a future on their own loop; the leader may finish on any thread
+        self.async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that arrive
+    while it is still running wait until it finishes and receive the same result,
+    or the same error, instead of starting their own call. Sync (``do``) and async
+    (``ado``) callers share the same in-flight calls; an async waiter holds no
+    thread. If the leader is interrupted rather than failing (its task is
+    cancelled because its client went away, say), the waiters are not failed
+    with it: one of them takes over and runs its own function.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._counters = {
+            'executions': 0,
+            'coalesced': 0,
+            'shared_errors': 0,
+            'handoffs': 0,
+        }
+
+    def _join(self, key: str, loop: Optional[asyncio.AbstractEventLoop] = None
+              ) -> Tuple[_Call, bool, Optional[asyncio.Future]]:
+        """Return the call for a key, whether the caller leads it and, for an async waiter, the future to await."""
+        future = None
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._counters['coalesced'] += 1
+                leader = False
+                if loop is not None:
+                    future = loop.create_future()
+                    call.async_waiters.append((loop, future))
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._counters['executions'] += 1
+                leader = True
+        if not leader:
+            logger.info(f"Joining in-flight call for key {key[:12]}")
+        return call, leader, future
+
+    def _shared_result(self, call: _Call) -> Any:
+        if call.error is not None:
+            with self._lock:
+                self._counters['shared_errors'] += 1
+            raise self._clone_error(call.error)
+        return call.result
+
+    def _finish(self, key: str, call: _Call, abandoned: bool) -> None:
+        with self._lock:
+            del self._calls[key]
+            call.abandoned = abandoned
+            if abandoned and call.waiters:
+                self._counters['handoffs'] += 1
+        call.done.set()
+        for loop, future in call.async_waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                # The waiter's event loop has already closed
+                pass
+        if abandoned and call.waiters:
+            logger.info(f"In-flight call for key {key[:12]} was interrupted; handing it to a waiter")
+        elif call.waiters:
+            logger.info(f"In-flight call for key {key[:12]} served {call.waiters} coalesced waiter(s)")
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn once per concurrent key and return (result, shared).
+
+        ``shared`` is True when the result came from another caller's execution.
+        """
+        while True:
+            call, leader, _ = self._join(key)
+            if leader:
+                break
+            call.done.wait()
+            if not call.abandoned:
+                return self._shared_result(call), True
+
+        abandoned = True
+        try:
+            call.result = fn()
+            abandoned = False
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            abandoned = False
+            raise
+        finally:
+            self._finish(key, call, abandoned)
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async version of ``do``; ``fn`` returns a coroutine."""
+        loop = asyncio.get_running_loop()
+        while True:
+            call, leader, future = self._join(key, loop)
+            if leader:
+                break
+            await future
+            if not call.abandoned:
+                return self._shared_result(call), True
+
+        abandoned = True
+        try:
+            call.result = await fn()
+            abandoned = False
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            abandoned = False
+            raise
+        finally:
+            self._finish(key, call, abandoned)
+
+    @staticmethod
+    def _clone_error(error: BaseException) -> BaseException:
+        """Give each waiter its own exception object so tracebacks don't interleave."""
+        try:
+            return copy.copy(error)
+        except Exception:
+            return error
+
+    def stats(self) -> Dict:
+        """Return execution/coalescing counters."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['in_flight'] = len(self._calls)
+            stats['waiting'] = sum(call.waiters for call in self._calls.values())
+            return stats
@@ -0,0 +1,145 @@
+import json
+import logging
+import re
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Trailing commas are the most common defect in LLM-emitted JSON
+_TRAILING_COMMA_RE = re.compile(r',(\s*[}\]])')
+
+class SlideStreamParser:
+    """Incremental parser that pulls complete slides out of a streamed presentation JSON object.
+
+    Text is fed in arbitrary chunks as it arrives from the model. The parser keeps
+    a single scan position, so every character is inspected once no matter how the
+    stream is split. It reports:
+
+    * ``('meta', key, value)`` for top-level ``title``/``subtitle`` strings and the ``theme`` object
+    * ``('slide', index, slide_dict)`` as soon as a slide object inside ``slides`` is closed
+    * ``('invalid_slide', index, error_message)`` when a closed slide object is not valid JSON
+    """
+
+    META_STRING_KEYS = ('title', 'subtitle')
+
+    def __init__(self):
+        self._text = ''
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expecting_key = False
+        self._current_key: Optional[str] = None
+        self._in_slides = False
+        self._slide_start: Optional[int] = None
+        self._theme_start: Optional[int] = None
+        self._slide_count = 0
+        self.complete = False
+
+    @property
+    def text(self) -> str:
+        """Everything received so far."""
+        return self._text
+
+    @property
+    def slide_count(self) -> int:
+        return self._slide_count
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any, Any]]:
+        """Consume the next chunk of model output and return any newly completed events."""
+        events: List[Tuple[str, Any, Any]] = []
+        if not chunk or self.complete:
+            return events
+
+        self._text += chunk
+        text = self._text
+        pos = self._pos
+        end = len(text)
+
+        while pos < end:
+            ch = text[pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._on_top_level_string(text[self._string_start:pos + 1], events)
+                pos += 1
+                continue
+
+            if not self._stack:
+                # Skip prose or code fences before the opening brace
+                if ch == '{':
+                    self._stack.append('{')
+                    self._expecting_key = True
+                pos += 1
+                continue
+
+            depth = len(self._stack)
+            if ch == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif ch == '{':
+                if depth == 1 and self._current_key == 'theme':
+                    self._theme_start = pos
+                elif depth == 2 and self._in_slides:
+                    self._slide_start = pos
+                self._stack.append('{')
+            elif ch == '[':
+                if depth == 1 and self._current_key == 'slides':
+                    self._in_slides = True
+                self._stack.append('[')
+            elif ch in '}]':
+                self._stack.pop()
+                depth = len(self._stack)
+                if ch == '}' and depth == 2 and self._in_slides and self._slide_start is not None:
+                    self._on_slide(text[self._slide_start:pos + 1], events)
+                    self._slide_start = None
+                elif ch == '}' and depth == 1 and self._theme_start is not None:
+                    value = self._loads(text[self._theme_start:pos + 1])
+                    if isinstance(value, dict):
+                        events.append(('meta', 'theme', value))
+                    self._theme_start = None
+                elif ch == ']' and depth == 1 and self._in_slides:
+                    self._in_slides = False
+                elif depth == 0:
+                    self.complete = True
+                    pos += 1
+                    break
+            elif ch == ',' and depth == 1:
+                self._expecting_key = True
+            pos += 1
+
+        self._pos = pos
+        return events
+
+    def _on_top_level_string(self, token: str, events: List) -> None:
+        value = self._loads(token)
+        if self._expecting_key:
+            self._current_key = value if isinstance(value, str) else None
+            self._expecting_key = False
+        elif self._current_key in self.META_STRING_KEYS and isinstance(value, str):
+            events.append(('meta', self._current_key, value))
+
+    def _on_slide(self, raw: str, events: List) -> None:
+        index = self._slide_count
+        self._slide_count += 1
+        try:
+            slide = json.loads(_TRAILING_COMMA_RE.sub(r'\1', raw))
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse streamed slide {index + 1}: {str(e)}")
+            events.append(('invalid_slide', index, str(e)))
+            return
+        events.append(('slide', index, slide))
+
+    @staticmethod
+    def _loads(raw: str) -> Any:
+        try:
+            return json.loads(_TRAILING_COMMA_RE.sub(r'\1', raw))
+        except json.JSONDecodeError:
+            return None
@@ -0,0 +1,166 @@
+import copy
+import glob
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from pptx import Presentation as PPTXPresentation
+from pptx.oxml.ns import qn
+from pptx.util import Inches
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE = 'default'
+
+class TemplateLibrary:
+    """In-memory library of PowerPoint templates, loaded once per process.
+
+    Every ``.pptx`` in ``template_dir`` is read into memory at startup and its
+    slide layouts are indexed by name. The built-in ``default`` template is
+    python-pptx's own. Decks are opened from the in-memory bytes, so building a
+    deck never touches the disk.
+
+    Templates can also be *themed*: a styling callback draws the background and
+    decorations once on the slide master, the result is cached per theme, and
+    every slide simply inherits it from the master.
+    """
+
+    def __init__(self, template_dir: Optional[str] = None, max_themed: int = 32):
+        self.template_dir = template_dir
+        self.max_themed = max_themed
+        self._templates: Dict[str, bytes] = {}
+        self._layouts: Dict[str, Dict[str, int]] = {}
+        self._themed: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._add_template(DEFAULT_TEMPLATE, self._save(PPTXPresentation()))
+        if template_dir and os.path.isdir(template_dir):
+            for path in sorted(glob.glob(os.path.join(template_dir, '*.pptx'))):
+                name = os.path.splitext(os.path.basename(path))[0]
+                try:
+                    with open(path, 'rb') as f:
+                        self._add_template(name, f.read())
+                except Exception as e:
+                    logger.error(f"Error loading template {path}: {str(e)}")
+        logger.info(f"TemplateLibrary loaded {len(self._templates)} templates: {', '.join(self._templates)}")
+
+    @classmethod
+    def from_env(cls) -> 'TemplateLibrary':
+        """Build a library from PPTX_TEMPLATE_DIR."""
+        return cls(template_dir=os.getenv("PPTX_TEMPLATE_DIR", os.path.join("templates", "pptx")))
+
+    @staticmethod
+    def _save(prs) -> bytes:
+        stream = io.BytesIO()
+        prs.save(stream)
+        return stream.getvalue()
+
+    @staticmethod
+    def _remove_slide(prs, sld_id) -> None:
+        """Delete a slide from the deck, with its relationship, so it is not saved."""
+        prs.part.drop_rel(sld_id.rId)
+        prs.slides._sldIdLst.remove(sld_id)
+
+    def _add_template(self, name: str, data: bytes) -> None:
+        prs = PPTXPresentation(io.BytesIO(data))
+        if not len(prs.slide_layouts):
+            raise ValueError(f"Template '{name}' has no slide layouts")
+        # Corporate templates often ship sample slides; decks start empty
+        sample_slides = list(prs.slides._sldIdLst)
+        for sld_id in sample_slides:
+            self._remove_slide(prs, sld_id)
+        if sample_slides:
+            logger.info(f"Dropped {len(sample_slides)} sample slides from template '{name}'")
+            data = self._save(prs)
+        self._templates[name] = data
+        self._layouts[name] = {layout.name: idx for idx, layout in enumerate(prs.slide_layouts)}
+
+    def names(self):
+        return list(self._templates)
+
+    def resolve(self, name: Optional[str]) -> str:
+        """Return the template name to use, falling back to the default for unknown names."""
+        if name and name in self._templates:
+            return name
+        if name:
+            logger.warning(f"Unknown template '{name}', using '{DEFAULT_TEMPLATE}'")
+        return DEFAULT_TEMPLATE
+
+    def layout(self, prs, template: str, layout_name: str, fallback_index: int = 0):
+        """Look up a slide layout by name in an opened deck.
+
+        Templates without a layout of that name get ``fallback_index``, or their
+        last layout if they have fewer layouts than that.
+        """
+        idx = self._layouts[template].get(layout_name)
+        if idx is None:
+            idx = min(fallback_index, len(prs.slide_layouts) - 1)
+        return prs.slide_layouts[idx]
+
+    def open(self, name: Optional[str] = None, theme_key: Optional[Tuple] = None,
+             style_master: Optional[Callable] = None):
+        """Open a fresh, empty deck from a template.
+
+        When ``style_master`` is given, it is called once per ``(template,
+        theme_key)`` with a scratch slide to draw on. Whatever it draws becomes
+        part of the slide master, and the themed template is cached.
+        """
+        name = self.resolve(name)
+        if style_master is None:
+            return PPTXPresentation(io.BytesIO(self._templates[name]))
+
+        key = (name, theme_key)
+        with self._lock:
+            data = self._themed.get(key)
+            if data is not None:
+                self._themed.move_to_end(key)
+            else:
+                data = self._build_themed(name, style_master)
+                self._themed[key] = data
+                while len(self._themed) > self.max_themed:
+                    self._themed.popitem(last=False)
+                logger.info(f"Built themed template '{name}' for theme {theme_key}")
+        return PPTXPresentation(io.BytesIO(data))
+
+    def _build_themed(self, name: str, style_master: Callable) -> bytes:
+        """Render the styling onto a scratch slide and move it to the slide master."""
+        prs = PPTXPresentation(io.BytesIO(self._templates[name]))
+        prs.slide_width = Inches(13.333)
+        prs.slide_height = Inches(7.5)
+        master = prs.slide_master
+
+        scratch = prs.slides.add_slide(self.layout(prs, name, 'Blank', 6))
+        style_master(scratch)
+
+        # Background: move the scratch slide's fill to the master
+        scratch_bg = scratch._element.cSld.bg
+        if scratch_bg is not None:
+            master_cSld = master._element.cSld
+            if master_cSld.bg is not None:
+                master_cSld.remove(master_cSld.bg)
+            master_cSld.insert(0, copy.deepcopy(scratch_bg))
+
+        # Decorations: insert behind the master's placeholders, with ids unique on the master
+        master_tree = master._element.cSld.spTree
+        next_id = max(int(el.get('id')) for el in master_tree.iter(qn('p:cNvPr'))) + 1
+        insert_at = list(master_tree).index(master_tree.find(qn('p:grpSpPr'))) + 1
+        for shape in scratch.shapes:
+            element = copy.deepcopy(shape._element)
+            element.find('.//' + qn('p:cNvPr')).set('id', str(next_id))
+            next_id += 1
+            master_tree.insert(insert_at, element)
+            insert_at += 1
+
+        # Drop the scratch slide again
+        self._remove_slide(prs, prs.slides._sldIdLst[-1])
+        return self._save(prs)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'templates': self.names(),
+                'themed_cached': len(self._themed)
+            }
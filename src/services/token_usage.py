@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+def _usage_field(usage: Any, name: str) -> int:
+    # The usage chunk of a stream is not modelled by openai 1.3 and arrives as a dict
+    value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, 0)
+    return value or 0
+
+class TokenUsageRecorder:
+    """Records LLM token usage per generation request, for tuning token budgets.
+
+    A generation starts a tally with ``start``; every completion call made for
+    it (outline, slides, continuations) is added with ``add_call``, and
+    ``finish`` folds the tally into the running totals and the recent log.
+    Calls from slide workers may add to the same tally concurrently.
+    """
+
+    def __init__(self, max_recent: int = 50):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=max_recent)
+        self._totals = {
+            'requests': 0,
+            'failed_requests': 0,
+            'calls': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'slides': 0,
+            'reported_slides': 0,
+            'reported_completion_tokens': 0,
+            'truncated_calls': 0,
+            'continuations': 0,
+            'unreported_calls': 0,
+        }
+
+    @staticmethod
+    def start(**labels) -> Dict:
+        """Return a new tally for one generation request, labelled for the recent log."""
+        return {
+            **labels,
+            'calls': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'truncated_calls': 0,
+            'continuations': 0,
+            'unreported_calls': 0,
+            '_started': time.perf_counter(),
+        }
+
+    def add_call(self, tally: Optional[Dict], usage: Any, finish_reason: Optional[str],
+                 continuation: bool = False) -> None:
+        """Add one completion call; ``usage`` is the response's usage object, if the server sent one."""
+        if tally is None:
+            return
+        with self._lock:
+            tally['calls'] += 1
+            if usage is None:
+                tally['unreported_calls'] += 1
+            else:
+                tally['prompt_tokens'] += _usage_field(usage, 'prompt_tokens')
+                tally['completion_tokens'] += _usage_field(usage, 'completion_tokens')
+            if finish_reason == 'length':
+                tally['truncated_calls'] += 1
+            if continuation:
+                tally['continuations'] += 1
+
+    def finish(self, tally: Optional[Dict], slides: int = 0, status: str = 'ok') -> None:
+        """Close a tally and record it."""
+        if tally is None:
+            return
+        with self._lock:
+            record = {key: value for key, value in tally.items() if not key.startswith('_')}
+            # Per-slide cost is only meaningful when the server reported usage for every call
+            reported = slides and not record['unreported_calls']
+            record.update({
+                'status': status,
+                'slides': slides,
+                'elapsed_s': round(time.perf_counter() - tally['_started'], 3),
+                'completion_tokens_per_slide': round(record['completion_tokens'] / slides, 1) if reported else None,
+            })
+            self._recent.append(record)
+
+            totals = self._totals
+            totals['requests'] += 1
+            if status != 'ok':
+                totals['failed_requests'] += 1
+            totals['slides'] += slides
+            if reported:
+                totals['reported_slides'] += slides
+                totals['reported_completion_tokens'] += record['completion_tokens']
+            for key in ('calls', 'prompt_tokens', 'completion_tokens', 'truncated_calls',
+                        'continuations', 'unreported_calls'):
+                totals[key] += record[key]
+
+        logger.info(f"Token usage ({status}): {record['prompt_tokens']} prompt + {record['completion_tokens']} "
+                    f"completion tokens over {record['calls']} calls, {record['continuations']} continuations, "
+                    f"{slides} slides")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._totals)
+            reported_slides = stats.pop('reported_slides')
+            reported_tokens = stats.pop('reported_completion_tokens')
+            stats['completion_tokens_per_slide'] = (
+                round(reported_tokens / reported_slides, 1) if reported_slides else None
+            )
+            stats['recent'] = list(self._recent)
+            return stats
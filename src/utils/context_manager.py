@@ -3,7 +3,6 @@ import os
 import logging
 from typing import Any, Dict, Optional
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ContextManager:
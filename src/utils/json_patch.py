@@ -0,0 +1,120 @@
+import copy
+from typing import Any, Dict, List, Tuple
+
+class JsonPatchError(ValueError):
+    """Raised when a JSON Patch document is malformed or cannot be applied."""
+
+def _parse_pointer(pointer: str) -> List[str]:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens."""
+    if not isinstance(pointer, str):
+        raise JsonPatchError(f"Invalid JSON Pointer: {pointer!r}")
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise JsonPatchError(f"JSON Pointer must start with '/': {pointer}")
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+def _array_index(container: list, token: str, allow_end: bool) -> int:
+    if token == '-' and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith('0')):
+        raise JsonPatchError(f"Invalid array index: {token}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {token}")
+    return index
+
+def _resolve_parent(document: Any, pointer: str) -> Tuple[Any, str]:
+    """Return the container holding the pointer's target and the final token."""
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("Operation cannot target the document root")
+    node = document
+    for token in tokens[:-1]:
+        node = _get_child(node, token)
+    return node, tokens[-1]
+
+def _get_child(node: Any, token: str) -> Any:
+    if isinstance(node, dict):
+        if token not in node:
+            raise JsonPatchError(f"Path not found: {token}")
+        return node[token]
+    if isinstance(node, list):
+        return node[_array_index(node, token, allow_end=False)]
+    raise JsonPatchError(f"Cannot traverse into a {type(node).__name__} at '{token}'")
+
+def _get(document: Any, pointer: str) -> Any:
+    node = document
+    for token in _parse_pointer(pointer):
+        node = _get_child(node, token)
+    return node
+
+def _add(document: Any, pointer: str, value: Any) -> Any:
+    if pointer == '':
+        return value
+    parent, token = _resolve_parent(document, pointer)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to a {type(parent).__name__}")
+    return document
+
+def _remove(document: Any, pointer: str) -> Any:
+    parent, token = _resolve_parent(document, pointer)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: {pointer}")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_array_index(parent, token, allow_end=False))
+    raise JsonPatchError(f"Cannot remove from a {type(parent).__name__}")
+
+def apply_patch(document: Any, patch: List[Dict]) -> Any:
+    """Apply an RFC 6902 JSON Patch and return the patched copy.
+
+    The input document is never modified; if any operation fails the whole
+    patch is rejected with a JsonPatchError.
+    """
+    if not isinstance(patch, list):
+        raise JsonPatchError("A JSON Patch must be a list of operations")
+
+    result = copy.deepcopy(document)
+    for i, operation in enumerate(patch):
+        if not isinstance(operation, dict) or 'op' not in operation or 'path' not in operation:
+            raise JsonPatchError(f"Operation {i} must be an object with 'op' and 'path'")
+        op, path = operation['op'], operation['path']
+        try:
+            if op in ('add', 'replace', 'test') and 'value' not in operation:
+                raise JsonPatchError(f"'{op}' requires a 'value'")
+            if op in ('move', 'copy') and 'from' not in operation:
+                raise JsonPatchError(f"'{op}' requires a 'from'")
+
+            if op == 'add':
+                result = _add(result, path, copy.deepcopy(operation['value']))
+            elif op == 'remove':
+                _remove(result, path)
+            elif op == 'replace':
+                _get(result, path)  # target must exist
+                if path == '':
+                    result = copy.deepcopy(operation['value'])
+                else:
+                    _remove(result, path)
+                    result = _add(result, path, copy.deepcopy(operation['value']))
+            elif op == 'move':
+                source = operation['from']
+                if path != source and path.startswith(source + '/'):
+                    raise JsonPatchError("Cannot move a value into one of its children")
+                value = _remove(result, source)
+                result = _add(result, path, value)
+            elif op == 'copy':
+                result = _add(result, path, copy.deepcopy(_get(result, operation['from'])))
+            elif op == 'test':
+                if _get(result, path) != operation['value']:
+                    raise JsonPatchError(f"Test failed at {path}")
+            else:
+                raise JsonPatchError(f"Unknown operation: {op}")
+        except JsonPatchError as e:
+            raise JsonPatchError(f"Patch operation {i} ({op} {path}) failed: {str(e)}") from None
+    return result
@@ -0,0 +1,308 @@
+import json
+import re
+from typing import Dict, List, Tuple
+
+class JsonRepairError(ValueError):
+    """Raised when no JSON object can be recovered from a piece of text."""
+
+_CLOSERS = {'}': '{', ']': '['}
+_OPENERS = {'{': '}', '[': ']'}
+_SMART_QUOTES = '“”'
+_QUOTES = '"' + _SMART_QUOTES
+_LITERALS = {
+    'true': 'true', 'false': 'false', 'null': 'null',
+    'True': 'true', 'False': 'false', 'None': 'null'
+}
+_CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t', '\b': '\\b', '\f': '\\f'}
+_VALID_ESCAPES = frozenset('"\\/bfnrtu')
+
+# Inside a string only these characters need attention; the text between them is copied as one slice
+_STRING_SPECIAL = re.compile(r'["\\\x00-\x1f“”]')
+_WHITESPACE = re.compile(r'\s*')
+_BAREWORD = re.compile(r'[^\s{}\[\],:"“”]+')
+_BARE_KEY = re.compile(r'[A-Za-z_][\w-]*\s*:')
+_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+
+# A stray colon and a key left without a value together mean a string ran past
+# its closing quote ('{"a": "it's, "b": 2}') and the keys after it are shifted;
+# such a candidate is rejected rather than returned with the wrong keys
+_MISALIGNED = frozenset({'stray_colon', 'missing_values'})
+
+# The decoder recurses per nesting level, so runaway brackets ('[[[[...') raise
+# RecursionError rather than JSONDecodeError; both mean the text cannot be used
+_UNDECODABLE = (json.JSONDecodeError, RecursionError)
+
+class _Scanner:
+    """Single forward pass over one candidate object, rewriting it into valid JSON.
+
+    Whitespace outside strings is dropped and every token is copied to ``out``
+    exactly once, so the pass is linear in the length of the candidate. Each
+    object/array on the stack tracks what it expects next ('key', 'colon',
+    'value' or 'after'), which is enough to insert missing commas, drop
+    trailing ones and decide whether a quote ends a string. ``safe`` remembers
+    the last point at which everything emitted so far was complete, so
+    truncated output can be cut back to it and closed.
+    """
+
+    def __init__(self, text: str, start: int):
+        self.text = text
+        self.pos = start
+        self.out: List[str] = []
+        self.stack: List[str] = []
+        self.states: List[str] = []
+        self.safe: Tuple[int, int] = (0, 0)
+        self.repairs: Dict[str, None] = {}
+
+    def run(self) -> Tuple[str, int]:
+        """Return the repaired candidate and the index just past it in the text."""
+        text, n = self.text, len(self.text)
+        self._open('{')
+        self.pos += 1
+
+        while self.stack:
+            self.pos = _WHITESPACE.match(text, self.pos).end()
+            if self.pos >= n:
+                self._close_truncated()
+                break
+            ch = text[self.pos]
+
+            if ch in _CLOSERS:
+                self.pos += 1
+                self._close(ch)
+            elif ch == ',':
+                self.pos += 1
+                if self.states[-1] == 'after':
+                    self.out.append(',')
+                    self.states[-1] = 'key' if self.stack[-1] == '{' else 'value'
+                else:
+                    self.repairs['extra_comma'] = None
+            elif ch == ':':
+                self.pos += 1
+                if self.states[-1] == 'colon':
+                    self.out.append(':')
+                    self.states[-1] = 'value'
+                else:
+                    self.repairs['stray_colon'] = None
+            elif not self._value():
+                self._close_truncated()
+                break
+
+        return ''.join(self.out), self.pos
+
+    # -- values -------------------------------------------------------------
+
+    def _value(self) -> bool:
+        """Copy the value or key starting at ``pos``; False if the text ends inside it."""
+        ch = self.text[self.pos]
+        in_object = self.stack[-1] == '{'
+        state = self.states[-1]
+        if state == 'after':
+            self.repairs['missing_comma'] = None
+            self.out.append(',')
+            state = 'key' if in_object else 'value'
+        elif state == 'colon':
+            self.repairs['missing_colon'] = None
+            self.out.append(':')
+            state = 'value'
+        self.states[-1] = state
+        is_key = in_object and state == 'key'
+
+        if ch in _OPENERS:
+            if is_key:
+                # A key can't be an object or array; nothing sensible to salvage here
+                self.repairs['invalid_key'] = None
+                self.pos = len(self.text)
+                return False
+            self.pos += 1
+            self._open(ch)
+            return True
+        if ch in _QUOTES:
+            if not self._string(is_key):
+                return False
+        elif not self._bareword(is_key):
+            return False
+
+        if is_key:
+            self.states[-1] = 'colon'
+        else:
+            self._value_done()
+        return True
+
+    def _string(self, is_key: bool) -> bool:
+        text, n = self.text, len(self.text)
+        smart = text[self.pos] != '"'
+        if smart:
+            self.repairs['smart_quotes'] = None
+        self.pos += 1
+        self.out.append('"')
+
+        while True:
+            match = _STRING_SPECIAL.search(text, self.pos)
+            if match is None:
+                self.pos = n
+                return False
+            i = match.start()
+            self.out.append(text[self.pos:i])
+            c = text[i]
+            self.pos = i + 1
+
+            if c == '\\':
+                if i + 1 >= n:
+                    self.pos = n
+                    return False
+                if text[i + 1] in _VALID_ESCAPES:
+                    self.out.append(text[i:i + 2])
+                    self.pos = i + 2
+                else:
+                    self.repairs['invalid_escape'] = None
+                    self.out.append('\\\\')
+            elif c < ' ':
+                self.repairs['control_characters'] = None
+                self.out.append(_CONTROL_ESCAPES.get(c, ''))
+            elif c == '"' or smart:
+                if self._closes_string(i + 1):
+                    self.out.append('"')
+                    if c != '"':
+                        self.repairs['smart_quotes'] = None
+                    return True
+                self.repairs['unescaped_quotes'] = None
+                self.out.append('\\"')
+            else:
+                # A smart quote inside a normally quoted string is just text
+                self.out.append(c)
+
+    def _closes_string(self, j: int) -> bool:
+        """Decide whether a quote ends its string by looking at what follows it."""
+        text, n = self.text, len(self.text)
+        j = _WHITESPACE.match(text, j).end()
+        if j >= n or text[j] in ':}]' or text[j] in _QUOTES:
+            return True
+        if text[j] != ',':
+            return False
+        # '", ' ends the string only if something JSON-like follows the comma
+        j = _WHITESPACE.match(text, j + 1).end()
+        if j >= n or text[j] in '{[]}-' or text[j] in _QUOTES or text[j].isdigit():
+            return True
+        return text.startswith(('true', 'false', 'null'), j) or _BARE_KEY.match(text, j) is not None
+
+    def _bareword(self, is_key: bool) -> bool:
+        match = _BAREWORD.match(self.text, self.pos)
+        token = match.group()
+        self.pos = match.end()
+        if self.pos >= len(self.text):
+            return False
+
+        if is_key:
+            self.repairs['unquoted_keys'] = None
+            self.out.append(json.dumps(token))
+        elif token in _LITERALS:
+            if _LITERALS[token] != token:
+                self.repairs['python_literals'] = None
+            self.out.append(_LITERALS[token])
+        elif _NUMBER.fullmatch(token):
+            self.out.append(token)
+        else:
+            self.repairs['unquoted_strings'] = None
+            self.out.append(json.dumps(token))
+        return True
+
+    # -- containers ---------------------------------------------------------
+
+    def _open(self, bracket: str) -> None:
+        self.out.append(bracket)
+        self.stack.append(bracket)
+        self.states.append('key' if bracket == '{' else 'value')
+        self.safe = (len(self.out), len(self.stack))
+
+    def _close(self, closer: str) -> None:
+        # A wrong closer still ends the innermost container: '[1, 2}, "b": 3}' keeps "b".
+        # If a closer was really missing, truncation handling closes the rest at the end.
+        if self.stack[-1] != _CLOSERS[closer]:
+            self.repairs['mismatched_brackets'] = None
+        self._pop()
+
+    def _pop(self) -> None:
+        if self.out[-1] == ',':
+            self.repairs['trailing_commas'] = None
+            self.out.pop()
+        if self.states[-1] in ('colon', 'value') and self.stack[-1] == '{':
+            # A key with no value: keep the object valid by giving it one
+            self.repairs['missing_values'] = None
+            if self.states[-1] == 'colon':
+                self.out.append(':')
+            self.out.append('null')
+        self.out.append(_OPENERS[self.stack.pop()])
+        self.states.pop()
+        if self.stack:
+            self._value_done()
+
+    def _value_done(self) -> None:
+        self.states[-1] = 'after'
+        self.safe = (len(self.out), len(self.stack))
+
+    def _close_truncated(self) -> None:
+        """Cut back to the last complete value and close everything still open."""
+        self.repairs['truncated'] = None
+        length, depth = self.safe
+        del self.out[length:]
+        del self.stack[depth:]
+        while self.stack:
+            self.out.append(_OPENERS[self.stack.pop()])
+        self.states.clear()
+        self.pos = len(self.text)
+
+def extract_json(text: str) -> Tuple[Dict, List[str]]:
+    """Find the outermost JSON object in ``text``, repairing it if needed.
+
+    Handles prose and code fences around the object, trailing or missing
+    commas, output truncated mid-value, unescaped and smart quotes, raw
+    control characters and Python-style literals. Returns the object and
+    the names of the repairs that were applied (empty if it parsed as is).
+    Raises JsonRepairError when no object can be recovered, or only one whose
+    keys were shifted by a misread quote.
+    """
+    # Well-formed output is handled by the C decoder without scanning
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict):
+            return value, []
+    except _UNDECODABLE:
+        pass
+
+    start = text.find('{')
+    end = text.rfind('}')
+    if start != -1 and end > start:
+        # Prose or a code fence around an otherwise valid object
+        try:
+            value = json.loads(text[start:end + 1])
+            if isinstance(value, dict):
+                return value, ['surrounding_text']
+        except _UNDECODABLE:
+            pass
+
+    # Every candidate starts after the previous one ended, keeping the search linear.
+    # The widest recoverable candidate wins, so stray braces in prose are skipped.
+    best = None
+    while start != -1:
+        scanner = _Scanner(text, start)
+        candidate, end = scanner.run()
+        try:
+            value = json.loads(candidate)
+        except _UNDECODABLE:
+            value = None
+        if _MISALIGNED <= scanner.repairs.keys():
+            value = None
+        # An empty object only counts if it was written that way
+        if isinstance(value, dict) and (value or not scanner.repairs):
+            if best is None or end - start > best[0]:
+                repairs = list(scanner.repairs)
+                if text[:start].strip() or text[end:].strip():
+                    repairs.insert(0, 'surrounding_text')
+                best = (end - start, value, repairs)
+        if end >= len(text):
+            break
+        start = text.find('{', end)
+
+    if best is not None:
+        return best[1], best[2]
+    raise JsonRepairError("No JSON object could be recovered from the response")
@@ -0,0 +1,205 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed with ``extra=`` and
+# becomes a field of the JSON record
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, process, thread and any ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class _DebugSampler(logging.Filter):
+    """Thin out DEBUG records before they are queued.
+
+    A ``sample_rate`` fraction of DEBUG records is kept, and at most
+    ``per_second`` of them per logger each second (0 means no limit). INFO and
+    above always pass.
+    """
+
+    def __init__(self, sample_rate: float, per_second: int):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.per_second = per_second
+        self._lock = threading.Lock()
+        self._windows: Dict[str, list] = {}
+        self.sampled_out = 0
+        self.rate_limited = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.INFO:
+            return True
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            with self._lock:
+                self.sampled_out += 1
+            return False
+        if self.per_second <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(record.name)
+            if window is None or now - window[0] >= 1.0:
+                self._windows[record.name] = [now, 1]
+                return True
+            if window[1] >= self.per_second:
+                self.rate_limited += 1
+                return False
+            window[1] += 1
+        return True
+
+class _AsyncHandler(QueueHandler):
+    """Queue records for the background writer without blocking the caller.
+
+    Messages are rendered and truncated to ``max_message_chars`` here, so the
+    queue holds no references to request objects or large LLM responses. When
+    the queue is full the record is dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue, max_message_chars: int):
+        super().__init__(log_queue)
+        self.max_message_chars = max_message_chars
+        self.dropped = 0
+        self.truncated = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        message = record.getMessage()
+        if self.max_message_chars and len(message) > self.max_message_chars:
+            self.truncated += 1
+            message = f"{message[:self.max_message_chars]}... [{len(message) - self.max_message_chars} more chars]"
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            # Tracebacks are rendered now, since the frames may be gone by the time the writer runs
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _Writer(QueueListener):
+    """Background thread that writes queued records to the console and the log file."""
+
+    def enqueue_sentinel(self) -> None:
+        # Wait for room rather than fail when the queue is full; this thread is draining it
+        self.queue.put(self._sentinel)
+
+_lock = threading.Lock()
+_handler: Optional[_AsyncHandler] = None
+_sampler: Optional[_DebugSampler] = None
+_listener: Optional[_Writer] = None
+_outputs = []
+_queue_size = 10000
+
+def configure_logging() -> None:
+    """Set up application logging from the LOG_* environment settings.
+
+    The root logger gets a single non-blocking handler that puts records on a
+    bounded queue; a background thread writes them to the console and to
+    LOG_FILE. LOG_LEVEL sets the default level and LOG_LEVELS overrides it per
+    logger (``"src.services.llm_service=DEBUG,httpx=WARNING"``). Safe to call
+    more than once; later calls do nothing.
+    """
+    global _handler, _sampler, _outputs, _queue_size
+    with _lock:
+        if _handler is not None:
+            return
+
+        formatter = JsonFormatter() if os.getenv("LOG_FORMAT", "json").lower() == "json" else logging.Formatter(TEXT_FORMAT)
+        _outputs = [logging.StreamHandler()]
+        log_file = os.getenv("LOG_FILE", os.path.join("logs", "app.log"))
+        if log_file:
+            log_dir = os.path.dirname(log_file)
+            if log_dir and not os.path.exists(log_dir):
+                os.makedirs(log_dir, exist_ok=True)
+            _outputs.append(logging.FileHandler(log_file))
+        for output in _outputs:
+            output.setFormatter(formatter)
+
+        _queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+        _handler = _AsyncHandler(queue.Queue(_queue_size), int(os.getenv("LOG_MAX_MESSAGE_CHARS", "2000")))
+        _sampler = _DebugSampler(
+            sample_rate=float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0")),
+            per_second=int(os.getenv("LOG_DEBUG_PER_SECOND", "20"))
+        )
+        _handler.addFilter(_sampler)
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(_handler)
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        for item in os.getenv("LOG_LEVELS", "").split(','):
+            name, _, level = item.partition('=')
+            if name.strip() and level.strip():
+                logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+        _start_listener()
+        atexit.register(_stop_listener)
+        # A fork (gunicorn workers, fork-started pools) copies neither the writer
+        # thread nor, safely, a file it is halfway through writing; pause it
+        # around the fork and give the child its own queue and writer
+        os.register_at_fork(before=_stop_listener, after_in_parent=_start_listener,
+                            after_in_child=_restart_in_child)
+
+def _start_listener() -> None:
+    global _listener
+    _listener = _Writer(_handler.queue, *_outputs, respect_handler_level=True)
+    _listener.start()
+
+def _stop_listener() -> None:
+    """Write out everything queued so far and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def _restart_in_child() -> None:
+    # Records queued by the parent while it forked are written by the parent
+    _handler.queue = queue.Queue(_queue_size)
+    _start_listener()
+
+def stats() -> Dict:
+    if _handler is None:
+        return {'configured': False}
+    return {
+        'configured': True,
+        'queued_now': _handler.queue.qsize(),
+        'dropped_queue_full': _handler.dropped,
+        'truncated': _handler.truncated,
+        'debug_sampled_out': _sampler.sampled_out,
+        'debug_rate_limited': _sampler.rate_limited,
+    }
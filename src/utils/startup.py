@@ -0,0 +1,68 @@
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Loaded on the first export (or by the renderer warm-up), never at import time
+LAZY_MODULES = ('weasyprint', 'pptx', 'pypdf')
+
+class StartupProfile:
+    """Times the phases of application startup.
+
+    The clock starts when this module is first imported, so app.py imports it
+    before anything else. ``mark`` closes a phase; ``report`` logs the totals
+    and warns when the import phase exceeds STARTUP_IMPORT_BUDGET_MS or a
+    module that should load lazily was imported during startup.
+    """
+
+    def __init__(self, import_budget_ms: float):
+        self.import_budget_ms = import_budget_ms
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._last = self._started
+        self._phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        """End ``phase`` now; its duration runs from the previous mark (or process start)."""
+        with self._lock:
+            now = time.perf_counter()
+            self._phases[phase] = round((now - self._last) * 1000, 1)
+            self._last = now
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Record a phase that ran apart from the startup sequence, e.g. a background warm-up."""
+        with self._lock:
+            self._phases[phase] = round(seconds * 1000, 1)
+
+    def report(self) -> None:
+        with self._lock:
+            phases = dict(self._phases)
+            total_ms = (self._last - self._started) * 1000
+        import_ms = phases.get('imports', 0.0)
+        details = ', '.join(f"{phase} {ms:.0f} ms" for phase, ms in phases.items())
+        logger.info(f"Startup took {total_ms:.0f} ms ({details}); import budget {self.import_budget_ms:.0f} ms")
+        if import_ms > self.import_budget_ms:
+            logger.warning(f"Imports took {import_ms:.0f} ms, over the {self.import_budget_ms:.0f} ms budget")
+        eager = self.loaded_lazy_modules()
+        if eager:
+            logger.warning(f"Modules meant to load on first use were imported at startup: {', '.join(eager)}")
+
+    @staticmethod
+    def loaded_lazy_modules():
+        return [name for name in LAZY_MODULES if name in sys.modules]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            phases = dict(self._phases)
+        return {
+            'phases_ms': phases,
+            'import_budget_ms': self.import_budget_ms,
+            'within_budget': phases.get('imports', 0.0) <= self.import_budget_ms,
+            'loaded_renderers': self.loaded_lazy_modules(),
+        }
+
+startup_profile = StartupProfile(float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500")))
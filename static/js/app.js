@@ -11,6 +11,7 @@ const PresentationGenerator = {
         this.currentSlideIndex = 0;
         this.slides = [];
         this.previewData = null;
+        this.presentationId = null;
         
         // Hide first-next-button by default
         if (this.firstNextButton) {
@@ -55,13 +56,9 @@ const PresentationGenerator = {
 
         try {
             console.log('Submitting form with data:', { topic, style });
-            const response = await this.generatePreview(topic, style);
+            const response = await this.streamPreview(topic, style);
             this.form.reset();
-            this.previewData = response.preview;
-            this.slides = response.preview.slides;
-            this.currentSlideIndex = 0;
-            this.updatePreview(response.preview);
-            this.navigateToPreview();
+            this.updateNavigation();
             console.log('Preview generated successfully:', response.preview);
             // Show the first-next-button after successful generation
             const firstNextButton = document.getElementById('first-next-button');
@@ -81,6 +78,7 @@ const PresentationGenerator = {
         this.slides = [];
         this.currentSlideIndex = 0;
         this.previewData = null;
+        this.presentationId = null;
         
         console.log('Generating preview for:', { topic, style });
         try {
@@ -117,6 +115,7 @@ const PresentationGenerator = {
             }
 
             this.previewData = responseData.presentation;
+            this.presentationId = responseData.presentation_id || null;
             this.slides = responseData.presentation.slides;
             this.updatePreview(responseData.presentation);
             return { preview: responseData.presentation };
@@ -127,6 +126,98 @@ const PresentationGenerator = {
         }
     },
 
+    async streamPreview(topic, style) {
+        this.slides = [];
+        this.currentSlideIndex = 0;
+        this.previewData = null;
+        this.presentationId = null;
+
+        console.log('Streaming preview for:', { topic, style });
+        const response = await fetch('/api/generate/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
+            },
+            body: JSON.stringify({ topic, style })
+        });
+
+        if (!response.ok) {
+            const responseData = await response.json().catch(() => ({}));
+            const error = new Error(responseData.error || 'Failed to generate presentation preview');
+            error.status = response.status;
+            error.responseData = responseData;
+            throw error;
+        }
+
+        // Fall back to the blocking endpoint when the browser cannot read streams
+        if (!response.body || !response.body.getReader) {
+            return this.generatePreview(topic, style);
+        }
+
+        const preview = { title: '', subtitle: '', slides: [] };
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let shown = false;
+
+        const handleEvent = (event, payload) => {
+            if (event === 'meta') {
+                Object.assign(preview, payload);
+                if (shown && payload.theme) {
+                    this.updateSlideContent();
+                }
+            } else if (event === 'slide') {
+                preview.slides[payload.index] = payload.slide;
+                if (!shown) {
+                    // Show the deck as soon as the first slide is ready
+                    shown = true;
+                    this.previewData = preview;
+                    this.slides = preview.slides;
+                    this.updatePreview(preview);
+                    this.navigateToPreview();
+                    this.hideLoading();
+                } else {
+                    this.updateNavigation();
+                }
+            } else if (event === 'done') {
+                this.presentationId = payload.presentation_id || null;
+            } else if (event === 'error') {
+                const error = new Error(payload.error || 'Failed to generate presentation preview');
+                error.status = payload.status;
+                error.responseData = payload;
+                throw error;
+            }
+        };
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let separator;
+            while ((separator = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, separator);
+                buffer = buffer.slice(separator + 2);
+
+                let event = 'message';
+                let data = '';
+                frame.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                });
+                if (data) handleEvent(event, JSON.parse(data));
+            }
+        }
+
+        if (!preview.slides.length) {
+            throw new Error('Invalid presentation data received');
+        }
+        this.previewData = preview;
+        this.slides = preview.slides;
+        return { preview };
+    },
+
     async createAndDownloadPPT() {
         if (!this.previewData) {
             this.showError(new Error('No presentation data available'));
@@ -254,6 +345,10 @@ const PresentationGenerator = {
             this.updateSlideContent();
         }
         
+        this.updateNavigation();
+    },
+
+    updateNavigation() {
         // Update navigation buttons
         const prevButton = document.getElementById('prev-slide');
         const nextButton = document.getElementById('next-slide');
@@ -416,6 +511,41 @@ const PresentationGenerator = {
         }, 3000);
     },
 
+    async fetchExport(url, format) {
+        // Revalidate with the last ETag so unchanged decks are not downloaded again
+        this.exportCache = this.exportCache || {};
+        const cached = this.exportCache[format];
+        const headers = { 'Content-Type': 'application/json' };
+        if (cached) {
+            headers['If-None-Match'] = cached.etag;
+        }
+
+        // Stored decks are exported by id; the full deck is only sent as a fallback
+        const body = this.presentationId
+            ? { presentation_id: this.presentationId }
+            : { presentation: this.previewData };
+        const response = await fetch(url, {
+            method: 'POST',
+            headers,
+            body: JSON.stringify(body)
+        });
+
+        if (response.status === 304 && cached) {
+            return cached.blob;
+        }
+        if (!response.ok) {
+            throw new Error(format === 'pdf' ? 'Failed to generate PDF' : 'Failed to generate PowerPoint');
+        }
+
+        // Create a blob from the file stream
+        const blob = await response.blob();
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            this.exportCache[format] = { etag, blob };
+        }
+        return blob;
+    },
+
     async exportPDF() {
         if (!this.previewData) {
             this.showError(new Error('No presentation data available'));
@@ -424,22 +554,7 @@ const PresentationGenerator = {
 
         this.showLoading('Generating PDF...', false); // Don't clear preview during export
         try {
-            const response = await fetch('/api/export/pdf', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    presentation: this.previewData
-                })
-            });
-
-            if (!response.ok) {
-                throw new Error('Failed to generate PDF');
-            }
-
-            // Create a blob from the PDF stream
-            const blob = await response.blob();
+            const blob = await this.fetchExport('/api/export/pdf', 'pdf');
             const url = window.URL.createObjectURL(blob);
             
             // Create a temporary link and click it to download
@@ -467,22 +582,7 @@ const PresentationGenerator = {
 
         this.showLoading('Generating PowerPoint...', false); // Don't clear preview during export
         try {
-            const response = await fetch('/api/export/ppt', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    presentation: this.previewData
-                })
-            });
-
-            if (!response.ok) {
-                throw new Error('Failed to generate PowerPoint');
-            }
-
-            // Create a blob from the PPTX stream
-            const blob = await response.blob();
+            const blob = await this.fetchExport('/api/export/ppt', 'pptx');
             const url = window.URL.createObjectURL(blob);
             
             // Create a temporary link and click it to download
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+from openai.resources.chat.completions import AsyncCompletions, Completions
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+# The app is run from the repository root and imports ``src`` as a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DECK = {
+    'title': 'Quarterly Review',
+    'subtitle': 'Results and outlook',
+    'slides': [{'title': 'Highlights', 'type': 'content', 'layout': 'split', 'content': ['Revenue up']}]
+}
+USAGE = {'prompt_tokens': 120, 'completion_tokens': 45, 'total_tokens': 165}
+
+def _chunk(content=None, finish_reason=None, usage=None):
+    choices = [] if usage else [{'index': 0, 'delta': {'content': content}, 'finish_reason': finish_reason}]
+    data = {'id': 'chunk', 'choices': choices, 'created': 0, 'model': 'test', 'object': 'chat.completion.chunk'}
+    if usage:
+        data['usage'] = usage
+    return ChatCompletionChunk(**data)
+
+class _Response:
+    extensions = {}
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def close(self):
+        self.closed.set()
+
+    async def aclose(self):
+        self.closed.set()
+
+class _Stream:
+    """A streamed completion; a stalled one blocks until it is aborted."""
+
+    def __init__(self, chunks, stall=False):
+        # Like openai's Stream, iterating again continues where the last loop stopped
+        self.chunks = iter(chunks)
+        self.stall = stall
+        self.response = _Response()
+
+    def __iter__(self):
+        if self.stall:
+            self.response.closed.wait(5)
+            raise ConnectionError("stream aborted")
+        return self.chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+class FakeBackend:
+    """Answers chat completions like an OpenAI-compatible server and records the requests.
+
+    ``reply(request)`` returns the reply text, or ``(text, finish_reason)``.
+    A ``down`` backend refuses connections; a ``stall``ed one never sends a token.
+    """
+
+    def __init__(self, reply=None, delay=0.0, stall=False, down=False):
+        self.reply = reply or (lambda request: json.dumps(DECK))
+        self.delay = delay
+        self.stall = stall
+        self.down = down
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def _respond(self, kwargs):
+        with self._lock:
+            self.requests.append(kwargs)
+        if self.down:
+            raise openai.APIConnectionError(request=httpx.Request('POST', 'http://fake/v1/chat/completions'))
+        reply = self.reply(kwargs)
+        text, finish_reason = reply if isinstance(reply, tuple) else (reply, 'stop')
+        if not kwargs.get('stream'):
+            return ChatCompletion(
+                id='completion', created=0, model='test', object='chat.completion', usage=USAGE,
+                choices=[{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                          'finish_reason': finish_reason}]
+            )
+        chunks = [_chunk(text[i:i + 16]) for i in range(0, len(text), 16)]
+        chunks.append(_chunk(finish_reason=finish_reason))
+        if kwargs.get('extra_body', {}).get('stream_options', {}).get('include_usage'):
+            chunks.append(_chunk(usage=USAGE))
+        return _Stream(chunks, stall=self.stall)
+
+    def create(self, **kwargs):
+        time.sleep(self.delay)
+        return self._respond(kwargs)
+
+    async def acreate(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        return self._respond(kwargs)
+
+@pytest.fixture
+def make_llm_service(tmp_path, monkeypatch):
+    """Build LLMServices whose backends are FakeBackends; one backend unless LLM_BACKENDS is set."""
+    from src.services.llm_service import LLMService
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    monkeypatch.setenv("LLM_HEALTH_INTERVAL", "0")
+    monkeypatch.setenv("LOG_FILE", "")
+    services = []
+    fakes = {}
+
+    # Async clients are created per event loop, so requests are routed to the fakes by base URL
+    def create(completions, **kwargs):
+        return fakes[str(completions._client.base_url)].create(**kwargs)
+
+    async def acreate(completions, **kwargs):
+        return await fakes[str(completions._client.base_url)].acreate(**kwargs)
+
+    monkeypatch.setattr(Completions, 'create', create)
+    monkeypatch.setattr(AsyncCompletions, 'create', acreate)
+
+    def make(*backends, **env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        service = LLMService()
+        for backend, fake in zip(service.router.backends, backends):
+            fakes[backend.base_url.rstrip('/') + '/'] = fake
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.close()
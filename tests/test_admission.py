@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from conftest import FakeBackend
+from src.controllers.presentation_controller import PresentationController
+from src.services.admission import AdmissionController, AdmissionRejectedError
+
+def _wait_until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+class Waiter(threading.Thread):
+    """Waits in the admission queue for ``client`` and records when it got a slot."""
+
+    def __init__(self, admission, client, order):
+        super().__init__(daemon=True)
+        self.admission = admission
+        self.client = client
+        self.order = order
+        self.error = None
+
+    def run(self):
+        try:
+            with self.admission.admit(self.client):
+                self.order.append(self.client)
+        except AdmissionRejectedError as e:
+            self.error = e
+
+def _queue(admission, clients, order):
+    """Queue one waiter per entry of ``clients``, in that order."""
+    waiters = []
+    for client in clients:
+        queued = admission.stats()['queued_now']
+        waiter = Waiter(admission, client, order)
+        waiter.start()
+        _wait_until(lambda: admission.stats()['queued_now'] == queued + 1)
+        waiters.append(waiter)
+    return waiters
+
+def test_waiting_clients_are_admitted_round_robin():
+    admission = AdmissionController(max_in_flight=1)
+    order = []
+
+    with admission.admit('holder'):
+        waiters = _queue(admission, ['batch', 'batch', 'batch', 'user'], order)
+    for waiter in waiters:
+        waiter.join(5)
+
+    # The single request from 'user' does not wait behind the whole batch
+    assert order == ['batch', 'user', 'batch', 'batch']
+    stats = admission.stats()
+    assert (stats['admitted'], stats['queued'], stats['peak_queued'], stats['in_flight']) == (5, 4, 4, 0)
+
+def test_full_queues_reject_at_once_with_a_position_and_retry_after():
+    admission = AdmissionController(max_in_flight=1, max_queue=3, max_queue_per_client=2)
+    order = []
+
+    with admission.admit('holder'):
+        waiters = _queue(admission, ['a', 'a', 'b'], order)
+        with pytest.raises(AdmissionRejectedError, match='already have 2') as per_client:
+            with admission.admit('a'):
+                pass
+        with pytest.raises(AdmissionRejectedError, match='busy') as full:
+            with admission.admit('c'):
+                pass
+    for waiter in waiters:
+        waiter.join(5)
+
+    assert (per_client.value.queue_position, full.value.queue_position) == (4, 3)
+    # No generation has finished yet, so the default service time is assumed per slot
+    assert full.value.retry_after == 3 * AdmissionController.DEFAULT_SERVICE_SECONDS
+    stats = admission.stats()
+    assert (stats['rejected_client'], stats['rejected_full']) == (1, 1)
+    assert order == ['a', 'b', 'a']
+
+def test_requests_still_waiting_after_the_timeout_are_rejected():
+    admission = AdmissionController(max_in_flight=1, queue_timeout=0.1)
+
+    with admission.admit('holder'):
+        with pytest.raises(AdmissionRejectedError, match='still busy after 0.1 seconds'):
+            with admission.admit('late'):
+                pass
+
+        stats = admission.stats()
+    assert (stats['timed_out'], stats['queued_now'], stats['waiting_clients']) == (1, 0, 0)
+
+def test_async_waiters_share_the_slots_and_give_back_their_place_when_cancelled():
+    admission = AdmissionController(max_in_flight=1)
+    order = []
+
+    async def wait_for_slot(client):
+        async with admission.aadmit(client):
+            order.append(client)
+
+    async def main():
+        with admission.admit('sync holder'):
+            cancelled = asyncio.ensure_future(wait_for_slot('gone'))
+            kept = asyncio.ensure_future(wait_for_slot('kept'))
+            await asyncio.sleep(0.05)
+            assert admission.stats()['queued_now'] == 2
+            cancelled.cancel()
+            await asyncio.sleep(0.05)
+        await kept
+
+    asyncio.run(main())
+
+    assert order == ['kept']
+    stats = admission.stats()
+    assert (stats['abandoned'], stats['queued_now'], stats['in_flight']) == (1, 0, 0)
+
+def test_clients_are_identified_by_the_configured_header():
+    by_peer = AdmissionController(enabled=False)
+    by_header = AdmissionController(enabled=False, client_header='X-Forwarded-For')
+
+    assert by_peer.client_key('10.0.0.1', {'x-forwarded-for': '203.0.113.9'}) == '10.0.0.1'
+    assert by_header.client_key('10.0.0.1', {'x-forwarded-for': '203.0.113.9, 10.0.0.1'}) == '203.0.113.9'
+    assert by_header.client_key(None, {}) == 'unknown'
+
+def test_busy_generations_are_answered_with_429(make_llm_service):
+    service = make_llm_service(FakeBackend(delay=0.3), ADMISSION_MAX_IN_FLIGHT='1', ADMISSION_MAX_QUEUE='0')
+
+    running = threading.Thread(target=service.generate_presentation_content, args=('Renewable energy adoption',))
+    running.start()
+    _wait_until(lambda: service.admission.stats()['in_flight'] == 1)
+    with pytest.raises(AdmissionRejectedError) as raised:
+        service.generate_presentation_content('Urban cycling infrastructure')
+    running.join(5)
+
+    payload, status, headers = PresentationController._generation_error(raised.value)
+    assert (status, headers) == (429, {'Retry-After': '10'})
+    assert (payload['queue_position'], payload['retry_after']) == (1, 10)
@@ -0,0 +1,30 @@
+from src.services.artifact_cache import ArtifactCache
+
+DECK = {'title': 'Quarterly Review', 'slides': [{'title': 'Highlights', 'content': ['Revenue up']}]}
+
+def test_key_depends_on_content_format_and_options_only():
+    key = ArtifactCache.make_key(DECK, 'pdf')
+
+    assert key == ArtifactCache.make_key(dict(reversed(list(DECK.items()))), 'pdf', {})
+    assert key != ArtifactCache.make_key(DECK, 'pptx')
+    assert key != ArtifactCache.make_key(DECK, 'pdf', {'style': 'dark'})
+    assert key != ArtifactCache.make_key(dict(DECK, title='Annual Review'), 'pdf')
+
+def test_least_recently_used_artifacts_are_evicted_by_size():
+    cache = ArtifactCache(max_bytes=10)
+    cache.put('a', b'aaaa')
+    cache.put('b', b'bbbb')
+    cache.get('a')
+    cache.put('c', b'cccc')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'aaaa'
+    assert cache.stats()['bytes'] == 8
+    assert cache.stats()['evictions'] == 1
+
+def test_artifacts_over_the_budget_are_not_cached():
+    cache = ArtifactCache(max_bytes=4)
+    cache.put('a', b'too large')
+
+    assert cache.get('a') is None
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,72 @@
+import asyncio
+import importlib
+import threading
+import time
+
+import httpx
+import pytest
+
+from conftest import DECK, FakeBackend
+
+@pytest.fixture
+def serve(make_llm_service, monkeypatch):
+    """Serve the ASGI app with its controller generating through a FakeBackend."""
+    def make(backend):
+        service = make_llm_service(backend)
+        # Imported here so the app is built with the test environment make_llm_service set up
+        asgi = importlib.import_module('asgi')
+        monkeypatch.setattr(asgi.presentation_controller, 'llm_service', service)
+        app = asgi.GenerationASGIApp(asgi.presentation_controller, asgi.app, sync_threads=2)
+        return app, service
+    return make
+
+async def _post_all(app, bodies):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        return await asyncio.gather(*(client.post('/api/generate', json=body) for body in bodies))
+
+async def _threads_after(seconds):
+    await asyncio.sleep(seconds)
+    return threading.active_count()
+
+def test_one_worker_holds_many_generations_without_threads(serve):
+    app, service = serve(FakeBackend(delay=0.5))
+    bodies = [{'topic': f'Renewable energy adoption part {i}'} for i in range(40)]
+    threads = threading.active_count()
+
+    async def run():
+        # The thread count is taken while every generation is waiting on the model
+        return await asyncio.gather(_post_all(app, bodies), _threads_after(0.25))
+
+    started = time.perf_counter()
+    responses, threads_while_waiting = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+
+    assert [response.status_code for response in responses] == [200] * 40
+    assert all(response.json()['presentation']['title'] == DECK['title'] for response in responses)
+    assert len({response.json()['presentation_id'] for response in responses}) == 40
+    # Forty half-second calls overlap on the event loop instead of queueing for threads
+    assert elapsed < 5
+    assert threads_while_waiting == threads
+    assert service.get_stats()['admission']['admitted'] == 40
+
+def test_bad_requests_are_answered_like_the_flask_route(serve):
+    app, service = serve(FakeBackend())
+
+    responses = asyncio.run(_post_all(app, [{}, {'topic': 'vague'}]))
+
+    assert [(response.status_code, response.json()) for response in responses] == [
+        (400, {'error': 'No data provided'}),
+        (400, {'error': 'Please provide a more specific topic with at least 2-3 words for better results'}),
+    ]
+
+def test_other_routes_fall_through_to_flask(serve):
+    app, service = serve(FakeBackend())
+
+    async def get_stats():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+            return await client.get('/api/stats')
+
+    response = asyncio.run(get_stats())
+
+    assert response.status_code == 200
+    assert 'llm' in response.json()
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from src.services.admission import AdmissionRejectedError
+from src.services.batch_service import BatchGenerationService
+
+class CountingLLMService:
+    """Stands in for LLMService; records how many generations run at once."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_presentation_content(self, topic, use_cache=True, mode=None, slide_count=None, client='local'):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.delay)
+            if topic == 'vague':
+                raise ValueError("Please provide a more specific topic")
+            if topic == 'offline topic':
+                raise ConnectionError("The LLM service is temporarily unavailable")
+            if topic == 'busy topic':
+                raise AdmissionRejectedError("Too many generations in progress", retry_after=2)
+            return {'title': topic, 'slides': []}
+        finally:
+            with self._lock:
+                self.running -= 1
+
+@pytest.fixture
+def batch(monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_CONCURRENCY", "3")
+    monkeypatch.setenv("BATCH_MAX_TOPICS", "10")
+    return BatchGenerationService(CountingLLMService())
+
+def test_concurrency_is_clamped(batch):
+    assert batch.validate(['a', 'b'], 8) == 2
+    assert batch.validate(['a'] * 6, 8) == 3
+    assert batch.validate(['a'] * 6, None) == 2
+    assert batch.validate(['a'] * 6, '0') == 1
+
+@pytest.mark.parametrize('topics, concurrency', [([], 2), ('one topic', 2), (['a'] * 11, 2), (['a'], 'many')])
+def test_invalid_batches_are_rejected(batch, topics, concurrency):
+    with pytest.raises(ValueError):
+        batch.validate(topics, concurrency)
+
+def test_every_topic_gets_one_record_and_a_summary(batch):
+    topics = [f'topic {i}' for i in range(8)]
+
+    records = list(batch.run(topics, 3))
+
+    results, summary = records[:-1], records[-1]
+    assert sorted(record['index'] for record in results) == list(range(8))
+    assert all(record['presentation']['title'] == topics[record['index']] for record in results)
+    assert (summary['type'], summary['total'], summary['succeeded'], summary['failed']) == ('summary', 8, 8, 0)
+    assert batch.llm_service.peak == 3
+
+def test_failures_become_error_records(batch):
+    records = list(batch.run(['vague', 'offline topic', 'busy topic', '   ', 'good topic'], 2))
+
+    codes = {record['topic']: record.get('code') for record in records[:-1]}
+    assert codes == {'vague': 400, 'offline topic': 503, 'busy topic': 429, '   ': 400, 'good topic': None}
+    assert records[-1]['failed'] == 4
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from conftest import FakeBackend
+from src.services import circuit_breaker
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.services.llm_router import Backend, LLMRouter
+
+class Clock:
+    """Stands in for time.monotonic so tests can move time forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', clock)
+    return clock
+
+def test_consecutive_failures_open_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    opened = [breaker.record_failure(), breaker.record_failure()]
+    breaker.record_success()
+    opened += [breaker.record_failure() for _ in range(3)]
+
+    # The success in between resets the count
+    assert opened == [False, False, False, False, True]
+    assert (breaker.state, breaker.allows_request()) == ('open', False)
+    clock.now += 10
+    assert breaker.retry_after() == 20
+
+def test_a_half_open_trial_closes_or_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, half_open_max_calls=1)
+    breaker.record_failure()
+    clock.now += 30
+
+    assert (breaker.state, breaker.allows_request(), breaker.retry_after()) == ('half_open', True, 0.0)
+    breaker.on_dispatch()
+    assert breaker.allows_request() is False
+
+    assert breaker.record_failure() is True
+    assert breaker.state == 'open'
+
+    clock.now += 30
+    breaker.on_dispatch()
+    breaker.record_success()
+    assert (breaker.state, breaker.opens) == ('closed', 2)
+
+def test_a_cancelled_trial_gives_its_slot_back(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    breaker.on_dispatch()
+
+    breaker.record_cancel()
+
+    assert (breaker.state, breaker.allows_request()) == ('half_open', True)
+
+def test_the_router_fails_fast_when_every_circuit_is_open(clock):
+    backends = [Backend(f'b{i}', f'http://127.0.0.{i + 1}:9/v1', 'test', 'key',
+                        breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30 + 10 * i))
+                for i in range(2)]
+    router = LLMRouter(backends, health_interval=0)
+    for backend in backends:
+        backend.breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError) as raised:
+        router.acquire()
+    router.close()
+
+    assert raised.value.retry_after == 30
+    assert [backend.breaker.rejected for backend in backends] == [1, 1]
+    assert router.stats()['rejected'] == 1
+
+def test_open_circuits_reject_generations_without_sending(make_llm_service):
+    backend = FakeBackend(down=True)
+    service = make_llm_service(backend, LLM_BREAKER_FAILURE_THRESHOLD='2', LLM_BACKEND_RETRIES='0',
+                               LLM_BACKENDS=json.dumps([{'base_url': 'http://127.0.0.1:9/v1'}]))
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            service.generate_presentation_content('Renewable energy adoption', use_cache=False)
+
+    # The third generation was turned away before reaching the backend
+    assert len(backend.requests) == 2
+    assert service.router.stats()['backends'][0]['state'] == 'circuit_open'
@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import sqlite3
+import time
+
+import pytest
+
+from src.services.export_jobs import ExportJobQueue, QueueFullError
+
+def _render(data: bytes, delay: float = 0.0, marker: str = None) -> bytes:
+    if marker:
+        open(marker, 'w').close()
+    time.sleep(delay)
+    return data
+
+def _fail() -> bytes:
+    raise ValueError("template missing")
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    # Pool processes configure logging from the environment; keep them off the repo's logs/
+    monkeypatch.setenv("LOG_FILE", "")
+    return str(tmp_path / "presentations.db")
+
+@pytest.fixture
+def queues(db_path):
+    """Two queues on one database, standing in for two web worker processes."""
+    created = []
+
+    def make(**kwargs):
+        kwargs.setdefault('max_workers', 1)
+        queue = ExportJobQueue(start_method='fork', db_path=db_path, **kwargs)
+        created.append(queue)
+        return queue
+
+    yield make
+    for queue in created:
+        queue.shutdown()
+
+def _wait_for(queue, job_id, status, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job is not None and job.status == status:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not reach {status}: {queue.get(job_id)}")
+
+def test_job_submitted_on_one_worker_is_visible_on_another(queues):
+    first, second = queues(), queues()
+
+    job = first.submit('pptx', _render, b'deck-bytes')
+    finished = _wait_for(second, job.id, 'done')
+
+    assert finished.size == len(b'deck-bytes')
+    assert finished.result is None
+    assert second.get(job.id, with_result=True).result == b'deck-bytes'
+
+def test_failure_is_recorded_for_every_worker(queues):
+    first, second = queues(), queues()
+
+    job = first.submit('pdf', _fail)
+    failed = _wait_for(second, job.id, 'failed')
+
+    assert failed.error == "template missing"
+
+def test_cancel_from_another_worker_skips_the_queued_job(queues, tmp_path):
+    first, second = queues(max_workers=1), queues()
+    marker = str(tmp_path / 'ran')
+
+    running = first.submit('pdf', _render, b'slow', delay=1.0)
+    _wait_for(second, running.id, 'running')
+    waiting = first.submit('pdf', _render, b'never', marker=marker)
+
+    assert second.cancel(waiting.id).status == 'cancelled'
+    _wait_for(second, running.id, 'done')
+    time.sleep(0.3)
+    assert second.get(waiting.id).status == 'cancelled'
+    assert not os.path.exists(marker)
+
+def test_jobs_of_an_exited_worker_are_failed(queues, db_path):
+    queue = queues()
+    queue.stats()  # creates the table
+    exited = multiprocessing.get_context('fork').Process(target=time.sleep, args=(0,))
+    exited.start()
+    exited.join()
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO export_jobs (id, format, status, owner_pid, created_at) VALUES ('orphan', 'pdf', 'running', ?, ?)",
+        (exited.pid, time.time())
+    )
+    conn.commit()
+    conn.close()
+
+    job = queue.get('orphan')
+
+    assert job.status == 'failed'
+    assert 'stopped unexpectedly' in job.error
+    assert queue.stats()['orphaned'] == 1
+
+def test_depth_limit_counts_jobs_of_every_worker(queues):
+    first, second = queues(max_depth=1), queues(max_depth=1)
+
+    job = first.submit('pdf', _render, b'slow', delay=0.5)
+    with pytest.raises(QueueFullError):
+        second.submit('pdf', _render, b'rejected')
+
+    _wait_for(second, job.id, 'done')
+    second.submit('pdf', _render, b'accepted')
+
+def test_finished_jobs_expire_after_the_ttl(queues):
+    queue = queues(result_ttl=0.2)
+
+    job = queue.submit('pptx', _render, b'short-lived')
+    _wait_for(queue, job.id, 'done')
+    time.sleep(0.3)
+
+    assert queue.get(job.id) is None
+    assert queue.stats()['expired'] == 1
@@ -0,0 +1,141 @@
+import io
+import sys
+import threading
+import types
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+from src.services import export_renderer
+from src.services.export_renderer import ParallelPDFRenderer, merge_pdfs, render_pdf
+
+def _pdf(*widths):
+    writer = PdfWriter()
+    for width in widths:
+        writer.add_blank_page(width, 720)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+def _widths(data):
+    return [int(page.mediabox.width) for page in PdfReader(io.BytesIO(data)).pages]
+
+class _FakeHTML:
+    """Renders one blank page per ``<section>``, each as wide as its text says."""
+
+    barrier = None
+    font_configs = []
+
+    def __init__(self, string, base_url=None, url_fetcher=None):
+        self.string = string
+
+    def write_pdf(self, stylesheets, presentational_hints, font_config):
+        _FakeHTML.font_configs.append(font_config)
+        if _FakeHTML.barrier is not None:
+            _FakeHTML.barrier.wait()
+        widths = [int(part.split('</section>')[0]) for part in self.string.split('<section>')[1:]]
+        return _pdf(*widths)
+
+@pytest.fixture
+def weasyprint(monkeypatch):
+    """A stand-in for WeasyPrint, whose Pango libraries are not needed to test the renderer."""
+    module = types.ModuleType('weasyprint')
+    module.HTML = _FakeHTML
+    module.CSS = lambda string, font_config: ('css', font_config)
+    module.default_url_fetcher = lambda url, *args, **kwargs: {}
+    fonts = types.ModuleType('weasyprint.text.fonts')
+    fonts.FontConfiguration = object
+    monkeypatch.setitem(sys.modules, 'weasyprint', module)
+    monkeypatch.setitem(sys.modules, 'weasyprint.text', types.ModuleType('weasyprint.text'))
+    monkeypatch.setitem(sys.modules, 'weasyprint.text.fonts', fonts)
+    monkeypatch.setattr(export_renderer, '_pdf_states', threading.local())
+    monkeypatch.setattr(_FakeHTML, 'barrier', None)
+    monkeypatch.setattr(_FakeHTML, 'font_configs', [])
+    return module
+
+def _slides(*widths):
+    return ''.join(f'<section>{width}</section>' for width in widths)
+
+def test_chunk_bounds_split_only_large_decks():
+    renderer = ParallelPDFRenderer(max_workers=2, chunk_size=8, min_slides=16)
+
+    assert renderer.chunk_bounds(10) == [range(0, 10)]
+    assert renderer.chunk_bounds(20) == [range(0, 8), range(8, 16), range(16, 20)]
+    assert ParallelPDFRenderer(max_workers=1).chunk_bounds(40) == [range(0, 40)]
+
+def test_merge_keeps_page_order():
+    assert _widths(merge_pdfs([_pdf(100, 200), _pdf(300), _pdf(400, 500)])) == [100, 200, 300, 400, 500]
+
+def test_render_threads_do_not_wait_for_each_other(weasyprint):
+    # Both renders must be inside write_pdf at once to pass the barrier
+    _FakeHTML.barrier = threading.Barrier(2, timeout=5)
+    results = []
+
+    def render(width):
+        results.append(_widths(render_pdf(_slides(width), 'http://localhost/')))
+
+    threads = [threading.Thread(target=render, args=(width,)) for width in (100, 200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [[100], [200]]
+    first, second = _FakeHTML.font_configs
+    assert first is not second
+
+def test_renders_on_one_thread_reuse_its_font_configuration(weasyprint):
+    render_pdf(_slides(100), 'http://localhost/')
+    render_pdf(_slides(200), 'http://localhost/')
+
+    first, second = _FakeHTML.font_configs
+    assert first is second
+
+def test_parallel_render_merges_chunks_in_order(weasyprint, monkeypatch):
+    # Pool processes configure logging from the environment; keep them off the repo's logs/
+    monkeypatch.setenv("LOG_FILE", "")
+    renderer = ParallelPDFRenderer(max_workers=2, chunk_size=2, min_slides=4, start_method='fork')
+    try:
+        pdf = renderer.render([_slides(100, 200), _slides(300, 400), _slides(500)], 'http://localhost/')
+        single = renderer.render([_slides(600)], 'http://localhost/')
+    finally:
+        renderer.shutdown()
+
+    assert _widths(pdf) == [100, 200, 300, 400, 500]
+    assert _widths(single) == [600]
+    stats = renderer.stats()
+    assert (stats['parallel_renders'], stats['chunks_rendered'], stats['single_renders']) == (1, 3, 1)
+
+def test_static_assets_are_served_from_memory(weasyprint, tmp_path, monkeypatch):
+    static = tmp_path / 'static'
+    (static / 'css').mkdir(parents=True)
+    (static / 'css' / 'style.css').write_text('body { color: red; }')
+    (tmp_path / 'secret.txt').write_text('secret')
+    monkeypatch.setattr(export_renderer, '_static_files', {})
+    fallback = []
+    weasyprint.default_url_fetcher = lambda url, *args, **kwargs: fallback.append(url) or {}
+    fetch = export_renderer._make_url_fetcher('http://localhost/', str(static), '/static')
+
+    asset = fetch('http://localhost/static/css/style.css?v=2')
+    (static / 'css' / 'style.css').write_text('changed on disk')
+
+    assert asset == {'string': b'body { color: red; }', 'mime_type': 'text/css',
+                     'redirected_url': 'http://localhost/static/css/style.css?v=2'}
+    assert fetch('http://localhost/static/css/style.css')['string'] == b'body { color: red; }'
+    fetch('http://localhost/static/../secret.txt')
+    fetch('https://fonts.example.com/inter.woff2')
+    assert fallback == ['http://localhost/static/../secret.txt', 'https://fonts.example.com/inter.woff2']
+
+def test_warm_up_loads_the_renderers_once(weasyprint, monkeypatch):
+    monkeypatch.setattr(export_renderer, '_pptx_generator', None)
+    done = []
+
+    export_renderer.start_warm_up(on_done=done.append).join(5)
+    state = getattr(export_renderer._pdf_states, 'state', None)
+    generator = export_renderer._pptx_generator
+    export_renderer.warm_up()
+
+    assert len(done) == 1
+    assert generator is not None and export_renderer._pptx_generator is generator
+    # The warm-up thread's font configuration is its own; this thread builds one of its own
+    assert state is None and export_renderer._pdf_states.state is not None
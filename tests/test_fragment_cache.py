@@ -0,0 +1,35 @@
+from src.services.fragment_cache import FragmentCache
+
+SLIDE = {'title': 'Highlights', 'type': 'content', 'content': ['Revenue up']}
+THEME = {'primary_color': '#1a73e8'}
+
+def test_key_covers_the_slide_theme_and_extras():
+    key = FragmentCache.make_key(SLIDE, THEME)
+
+    assert key == FragmentCache.make_key(dict(reversed(list(SLIDE.items()))), dict(THEME))
+    assert key != FragmentCache.make_key(dict(SLIDE, content=['Revenue down']), THEME)
+    assert key != FragmentCache.make_key(SLIDE, {'primary_color': '#000000'})
+    assert key != FragmentCache.make_key(SLIDE, THEME, is_title=True)
+    assert FragmentCache.make_key(SLIDE, None) == FragmentCache.make_key(SLIDE, {})
+
+def test_lookups_are_tallied_per_export():
+    cache = FragmentCache('test', max_entries=2)
+    tally = {}
+    cache.put('a', '<div>a</div>')
+
+    cache.get('a', tally)
+    cache.get('b', tally)
+
+    assert tally == {'hits': 1, 'misses': 1}
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 1)
+
+def test_least_recently_used_fragments_are_evicted():
+    cache = FragmentCache('test', max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,77 @@
+import pytest
+
+from src.utils.json_patch import JsonPatchError, apply_patch
+
+DOC = {
+    'title': 'Quarterly Review',
+    'slides': [
+        {'title': 'Highlights', 'content': ['Revenue up']},
+        {'title': 'Risks', 'content': ['Supply']},
+    ],
+    'a/b': {'m~n': 1},
+}
+
+def test_operations_follow_rfc_6902():
+    patch = [
+        {'op': 'replace', 'path': '/title', 'value': 'Annual Review'},
+        {'op': 'add', 'path': '/slides/0/content/-', 'value': 'Costs down'},
+        {'op': 'add', 'path': '/slides/1', 'value': {'title': 'Outlook', 'content': []}},
+        {'op': 'move', 'from': '/slides/2', 'path': '/slides/0'},
+        {'op': 'copy', 'from': '/slides/1/title', 'path': '/subtitle'},
+        {'op': 'remove', 'path': '/a~1b/m~0n'},
+        {'op': 'test', 'path': '/slides/0/title', 'value': 'Risks'},
+    ]
+
+    result = apply_patch(DOC, patch)
+
+    assert result['title'] == 'Annual Review'
+    assert [slide['title'] for slide in result['slides']] == ['Risks', 'Highlights', 'Outlook']
+    assert result['slides'][1]['content'] == ['Revenue up', 'Costs down']
+    assert result['subtitle'] == 'Highlights'
+    assert result['a/b'] == {}
+
+def test_the_input_document_is_never_modified():
+    value = {'title': 'New', 'content': []}
+
+    result = apply_patch(DOC, [{'op': 'add', 'path': '/slides/0', 'value': value}])
+    value['content'].append('later')
+
+    assert len(DOC['slides']) == 2
+    assert result['slides'][0]['content'] == []
+
+def test_replacing_the_root_returns_the_new_value():
+    assert apply_patch(DOC, [{'op': 'replace', 'path': '', 'value': {'slides': []}}]) == {'slides': []}
+
+def test_a_failing_operation_rejects_the_whole_patch():
+    patch = [
+        {'op': 'replace', 'path': '/title', 'value': 'Changed'},
+        {'op': 'test', 'path': '/slides/0/title', 'value': 'Risks'},
+    ]
+
+    with pytest.raises(JsonPatchError, match=r'Patch operation 1 \(test /slides/0/title\)'):
+        apply_patch(DOC, patch)
+    assert DOC['title'] == 'Quarterly Review'
+
+@pytest.mark.parametrize('patch', [
+    {'op': 'add', 'path': '/x', 'value': 1},
+    [['add', '/x', 1]],
+    [{'op': 'add', 'path': '/x'}],
+    [{'op': 'move', 'path': '/x'}],
+    [{'op': 'frobnicate', 'path': '/title'}],
+    [{'op': 'add', 'path': 'title', 'value': 1}],
+    [{'op': 'remove', 'path': '/missing'}],
+    [{'op': 'remove', 'path': ''}],
+    [{'op': 'replace', 'path': '/slides/2', 'value': {}}],
+    [{'op': 'add', 'path': '/slides/3', 'value': {}}],
+    [{'op': 'add', 'path': '/slides/01', 'value': {}}],
+    [{'op': 'remove', 'path': '/slides/-'}],
+    [{'op': 'add', 'path': '/title/x', 'value': 1}],
+    [{'op': 'move', 'from': '/slides', 'path': '/slides/0'}],
+])
+def test_malformed_or_inapplicable_patches_are_rejected(patch):
+    with pytest.raises(JsonPatchError):
+        apply_patch(DOC, patch)
+
+def test_patch_errors_are_value_errors():
+    # Callers that already handle ValueError (e.g. as a 400) need no special case
+    assert issubclass(JsonPatchError, ValueError)
@@ -0,0 +1,75 @@
+import json
+import time
+
+import pytest
+
+from src.utils.json_repair import JsonRepairError, extract_json
+
+def test_valid_json_needs_no_repairs():
+    assert extract_json('{"title": "Deck", "slides": []}') == ({'title': 'Deck', 'slides': []}, [])
+
+def test_prose_and_code_fences_are_stripped():
+    text = 'Here is your deck:\n```json\n{"title": "Deck"}\n```\nEnjoy!'
+
+    assert extract_json(text) == ({'title': 'Deck'}, ['surrounding_text'])
+
+@pytest.mark.parametrize('text, expected, repair', [
+    ('{"a": 1, "b": [1, 2,],}', {'a': 1, 'b': [1, 2]}, 'trailing_commas'),
+    ('{"a": 1 "b": 2}', {'a': 1, 'b': 2}, 'missing_comma'),
+    ('{"a": True, "b": None}', {'a': True, 'b': None}, 'python_literals'),
+    ('{title: "Deck"}', {'title': 'Deck'}, 'unquoted_keys'),
+    ('{“title”: “Deck”}', {'title': 'Deck'}, 'smart_quotes'),
+    ('{"a": "line one\nline two"}', {'a': 'line one\nline two'}, 'control_characters'),
+    ('{"a": "say "hi" now", "b": 2}', {'a': 'say "hi" now', 'b': 2}, 'unescaped_quotes'),
+    ('{"a": [1, 2}, "b": 3}', {'a': [1, 2], 'b': 3}, 'mismatched_brackets'),
+])
+def test_common_model_mistakes_are_repaired(text, expected, repair):
+    value, repairs = extract_json(text)
+
+    assert value == expected
+    assert repair in repairs
+
+def test_truncated_output_keeps_complete_values():
+    text = '{"title": "Deck", "slides": [{"title": "One"}, {"title": "Tw'
+
+    value, repairs = extract_json(text)
+
+    # Containers opened before the cut are closed, so the last slide is kept empty
+    assert value == {'title': 'Deck', 'slides': [{'title': 'One'}, {}]}
+    assert 'truncated' in repairs
+
+def test_widest_candidate_wins_over_braces_in_prose():
+    text = 'Use {braces} sparingly. {"title": "Deck", "slides": [1, 2,]}'
+
+    assert extract_json(text)[0] == {'title': 'Deck', 'slides': [1, 2]}
+
+@pytest.mark.parametrize('text', [
+    'no json here',
+    '{"title": ',
+    # The apostrophe-like quote swallows the next key, which would shift every key after it
+    '{"a": "it\'s, "b": 2}',
+    '{"title": "Deck", "note": "it\'s, "slides": 3, "theme": "blue"}',
+])
+def test_unrecoverable_text_raises(text):
+    with pytest.raises(JsonRepairError):
+        extract_json(text)
+
+def test_runaway_nesting_does_not_escape_as_recursion_error():
+    # Both are nested deeper than the decoder can recurse
+    assert extract_json('[' * 50000 + '{"a": 1}') == ({'a': 1}, ['surrounding_text'])
+    with pytest.raises(JsonRepairError):
+        extract_json('text {' * 50000 + '{"a": 1}')
+
+def test_a_long_truncated_deck_is_recovered_in_one_pass():
+    slides = [{'title': f'Slide {i}', 'type': 'table', 'layout': 'table', 'content': [['Region', 'Sales'], ['North', str(i)]]}
+              for i in range(3000)]
+    text = 'Sure! ' + json.dumps({'title': 'Deck', 'subtitle': 'Numbers', 'slides': slides})[:-3]
+
+    started = time.perf_counter()
+    value, repairs = extract_json(text)
+
+    # Nested three levels deep, which the old two-level regex could not match
+    assert value['slides'][:2999] == slides[:2999]
+    assert repairs == ['surrounding_text', 'truncated']
+    # A single pass over ~300 KB finishes far inside this bound
+    assert time.perf_counter() - started < 5
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.services import llm_cache
+from src.services.llm_cache import LLMResponseCache
+
+DECK = {'title': 'Quarterly Review', 'slides': [{'title': 'Highlights', 'content': ['Revenue up']}]}
+
+@pytest.fixture
+def make_cache(tmp_path):
+    def make(**kwargs):
+        return LLMResponseCache(cache_dir=str(tmp_path / 'llm'), **kwargs)
+    return make
+
+def test_key_covers_every_part_and_ignores_their_order():
+    key = LLMResponseCache.make_key(topic='energy', model='qwen', temperature=0.7)
+
+    assert key == LLMResponseCache.make_key(temperature=0.7, model='qwen', topic='energy')
+    assert key != LLMResponseCache.make_key(topic='energy', model='llama', temperature=0.7)
+    assert LLMResponseCache.normalize_topic('  Renewable   ENERGY ') == 'renewable energy'
+
+def test_hits_return_copies(make_cache):
+    cache = make_cache()
+    cache.set('key', DECK)
+
+    first = cache.get('key')
+    first['slides'].clear()
+
+    assert cache.get('key') == DECK
+    assert cache.get('other') is None
+    stats = cache.stats()
+    assert (stats['memory_hits'], stats['misses']) == (2, 1)
+
+def test_entries_survive_a_restart_on_disk(make_cache):
+    make_cache().set('key', DECK)
+
+    restarted = make_cache()
+
+    assert restarted.get('key') == DECK
+    assert restarted.stats()['disk_hits'] == 1
+    assert restarted.get('key') == DECK
+    assert restarted.stats()['memory_hits'] == 1
+
+def test_expired_entries_are_dropped_from_both_tiers(make_cache, tmp_path):
+    cache = make_cache(ttl_seconds=0.1)
+    cache.set('key', DECK)
+    time.sleep(0.2)
+
+    assert cache.get('key') is None
+    assert cache.stats()['expired'] == 1
+    assert [name for name in os.listdir(tmp_path / 'llm') if name.endswith('.json')] == []
+
+def test_memory_evicts_least_recently_used_to_disk(make_cache):
+    cache = make_cache(max_memory_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, DECK)
+
+    assert cache.stats()['memory_entries'] == 2
+    assert cache.get('a') == DECK
+    assert cache.stats()['disk_hits'] == 1
+
+def test_disk_evicts_least_recently_used_over_budget(tmp_path):
+    probe = LLMResponseCache(cache_dir=str(tmp_path / 'probe'))
+    probe.set('a', DECK)
+    cache = LLMResponseCache(cache_dir=str(tmp_path / 'llm'), max_memory_entries=1,
+                             max_disk_bytes=int(probe.stats()['disk_bytes'] * 2.5))
+
+    for key in ('a', 'b', 'c'):
+        cache.set(key, DECK)
+
+    assert cache.stats()['disk_entries'] == 2
+    assert cache.get('a') is None
+    assert cache.get('b') == DECK
+
+def test_workers_sharing_a_directory_see_each_others_entries(make_cache):
+    first, second = make_cache(), make_cache()
+
+    first.set('key', DECK)
+
+    assert second.get('key') == DECK
+    assert second.stats()['disk_hits'] == 1
+    assert second.stats()['disk_entries'] == 1
+
+def test_the_disk_budget_covers_every_worker_sharing_the_directory(tmp_path):
+    probe = LLMResponseCache(cache_dir=str(tmp_path / 'probe'))
+    probe.set('a', DECK)
+    entry_bytes = probe.stats()['disk_bytes']
+    workers = [LLMResponseCache(cache_dir=str(tmp_path / 'llm'), max_memory_entries=1,
+                                max_disk_bytes=int(entry_bytes * 2.5)) for _ in range(2)]
+
+    for i, key in enumerate('abcd'):
+        workers[i % 2].set(key, DECK)
+        time.sleep(0.01)
+
+    files = sorted(name for name in os.listdir(tmp_path / 'llm') if name.endswith('.json'))
+    assert files == ['c.json', 'd.json']
+    assert workers[1].stats()['disk_bytes'] == 2 * entry_bytes
+    assert workers[0].get('a') is None
+    assert workers[0].get('d') == DECK
+
+def test_memory_hits_do_not_wait_behind_disk_io(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.set('hot', DECK)
+    writing, release = threading.Event(), threading.Event()
+    replace = os.replace
+
+    def slow_replace(src, dst):
+        writing.set()
+        release.wait(5)
+        replace(src, dst)
+
+    monkeypatch.setattr(llm_cache.os, 'replace', slow_replace)
+    writer = threading.Thread(target=cache.set, args=('cold', DECK))
+    writer.start()
+    assert writing.wait(5)
+
+    started = time.perf_counter()
+    hit = cache.get('hot')
+    elapsed = time.perf_counter() - started
+    release.set()
+    writer.join(5)
+
+    assert hit == DECK
+    assert elapsed < 0.5
+    assert cache.stats()['disk_entries'] == 2
+
+def test_unreadable_files_are_discarded(make_cache, tmp_path):
+    make_cache().set('key', DECK)
+    (tmp_path / 'llm' / 'key.json').write_text('{not json')
+
+    assert make_cache().get('key') is None
+    assert not (tmp_path / 'llm' / 'key.json').exists()
+
+def test_disabled_cache_stores_nothing(make_cache, tmp_path):
+    cache = make_cache(enabled=False)
+    cache.set('key', DECK)
+
+    assert cache.get('key') is None
+    assert not (tmp_path / 'llm').exists()
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.services.llm_client import AsyncPooledLLMClient, PooledLLMClient
+
+class _ModelsHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+
+    def do_GET(self):
+        _ModelsHandler.connections.add(self.client_address)
+        body = json.dumps({'object': 'list', 'data': [{'id': 'test', 'object': 'model', 'created': 0,
+                                                        'owned_by': 'test'}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def base_url():
+    _ModelsHandler.connections = set()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ModelsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/v1'
+    server.shutdown()
+    server.server_close()
+
+def test_requests_reuse_one_keep_alive_connection(base_url):
+    pool = PooledLLMClient(api_key='test', base_url=base_url)
+    try:
+        for _ in range(3):
+            assert [model.id for model in pool.client.models.list()] == ['test']
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert len(_ModelsHandler.connections) == 1
+    assert (stats['clients_created'], stats['requests_total'], stats['in_flight']) == (1, 3, 0)
+    assert stats['idle_connections'] == 1
+
+def test_client_is_recreated_in_a_forked_process(base_url):
+    pool = PooledLLMClient(api_key='test', base_url=base_url)
+    parent = pool.client
+    # What a fork looks like to the pool: the client was created under another pid
+    pool._pid = -1
+
+    child = pool.client
+    pool.close()
+
+    assert child is not parent
+    assert pool.stats()['clients_created'] == 2
+
+def test_async_client_is_bound_to_its_event_loop(base_url):
+    pool = AsyncPooledLLMClient(api_key='test', base_url=base_url)
+
+    async def list_models():
+        clients = [pool.client, pool.client]
+        models = await pool.client.models.list()
+        stats = pool.stats()
+        await pool.aclose()
+        return clients, [model.id for model in models.data], stats
+
+    (first, second), models, stats = asyncio.run(list_models())
+    (third, _), _, _ = asyncio.run(list_models())
+
+    assert first is second
+    assert third is not first
+    assert models == ['test']
+    assert (stats['requests_total'], stats['in_flight']) == (1, 0)
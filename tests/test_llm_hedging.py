@@ -0,0 +1,95 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from conftest import DECK, FakeBackend
+from src.services.llm_hedging import RequestHedger
+
+@pytest.fixture
+def make_service(make_llm_service):
+    def make(*backends):
+        return make_llm_service(
+            *backends,
+            LLM_HEDGE_ENABLED='true',
+            LLM_HEDGE_INITIAL_DELAY='0.2',
+            LLM_BACKENDS=json.dumps([
+                {'name': 'primary', 'base_url': 'http://127.0.0.1:9/v1'},
+                {'name': 'secondary', 'base_url': 'http://127.0.0.2:9/v1'},
+            ])
+        )
+    return make
+
+def test_hedged_calls_request_and_record_token_usage(make_service):
+    primary = FakeBackend()
+    service = make_service(primary, FakeBackend())
+
+    data = service.generate_presentation_content('Renewable energy adoption')
+
+    assert data['title'] == DECK['title']
+    assert primary.requests[0]['stream'] is True
+    assert primary.requests[0]['extra_body'] == {'stream_options': {'include_usage': True}}
+    usage = service.usage.stats()
+    assert (usage['prompt_tokens'], usage['completion_tokens'], usage['unreported_calls']) == (120, 45, 0)
+
+def test_async_hedged_calls_record_token_usage(make_service):
+    service = make_service(FakeBackend(), FakeBackend())
+
+    asyncio.run(service.agenerate_presentation_content('Renewable energy adoption'))
+
+    usage = service.usage.stats()
+    assert (usage['prompt_tokens'], usage['completion_tokens'], usage['unreported_calls']) == (120, 45, 0)
+
+def test_stalled_backend_is_hedged_to_another(make_service):
+    stalled, healthy = FakeBackend(stall=True), FakeBackend()
+    service = make_service(stalled, healthy)
+
+    data = service.generate_presentation_content('Renewable energy adoption')
+
+    assert data['title'] == DECK['title']
+    assert len(stalled.requests) == len(healthy.requests) == 1
+    stats = service.hedger.stats()
+    assert (stats['fired'], stats['won']) == (1, 1)
+    assert service.usage.stats()['prompt_tokens'] == 120
+
+def test_the_hedge_deadline_follows_recent_first_token_times():
+    hedger = RequestHedger(enabled=True, percentile=90, initial_delay=2.0, min_delay=0.25, max_delay=5.0, min_samples=10)
+    assert hedger.deadline() == 2.0
+
+    hedger._samples.extend([0.1] * 5 + [float(i) for i in range(1, 6)])
+    assert hedger.deadline() == 4.0
+
+    hedger._samples.extend([30.0] * 10)
+    assert hedger.deadline() == 5.0
+
+def test_fast_requests_are_not_hedged():
+    hedger = RequestHedger(enabled=True, initial_delay=1.0)
+
+    assert hedger.run(lambda attempt: 'first token', discard=lambda result: None) == 'first token'
+
+    stats = hedger.stats()
+    assert (stats['calls'], stats['fired'], stats['samples']) == (1, 0, 1)
+    hedger.close()
+
+def test_hedges_are_limited_to_a_share_of_recent_calls():
+    hedger = RequestHedger(enabled=True, initial_delay=0.05, min_delay=0.01, max_ratio=0.25)
+    discarded = []
+
+    def request(attempt):
+        # The primary is always slow, so each call wants a hedge; the hedge excludes what it tried
+        if attempt.exclude:
+            return 'hedge'
+        attempt.tried.append('primary')
+        time.sleep(0.2)
+        return 'slow'
+
+    results = [hedger.run(request, discard=discarded.append) for _ in range(8)]
+
+    stats = hedger.stats()
+    assert (stats['fired'], stats['skipped']) == (2, 6)
+    assert results.count('hedge') == 2
+    hedger.close()
+    time.sleep(0.3)
+    # The primaries that lost were released once they finished
+    assert discarded == ['slow', 'slow']
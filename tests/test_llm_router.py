@@ -0,0 +1,141 @@
+import json
+
+import httpx
+import openai
+import pytest
+
+from conftest import DECK, FakeBackend
+from src.services import llm_router
+from src.services.llm_router import Backend, LLMRouter
+
+def _connection_error():
+    return openai.APIConnectionError(request=httpx.Request('POST', 'http://fake/v1/chat/completions'))
+
+@pytest.fixture
+def make_router():
+    routers = []
+
+    def make(*weights, **options):
+        backends = [Backend(f'b{i}', f'http://127.0.0.{i + 1}:9/v1', 'test', 'key', weight=weight)
+                    for i, weight in enumerate(weights)]
+        router = LLMRouter(backends, **dict({'health_interval': 0}, **options))
+        routers.append(router)
+        return router
+
+    yield make
+    for router in routers:
+        router.close()
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Answer health probes with a status and model list per backend URL; unknown URLs refuse."""
+    answers = {}
+
+    def get(url, headers=None, timeout=None):
+        if url not in answers:
+            raise httpx.ConnectError('connection refused')
+        status, models = answers[url]
+        return httpx.Response(status, json={'data': [{'id': model} for model in models]},
+                              request=httpx.Request('GET', url))
+
+    monkeypatch.setattr(llm_router.httpx, 'get', get)
+    return answers
+
+def test_requests_go_to_the_least_loaded_backend_by_weight(make_router):
+    router = make_router(2, 1)
+    heavy, light = router.backends
+
+    picked = [router.acquire() for _ in range(6)]
+
+    assert (picked.count(heavy), picked.count(light)) == (4, 2)
+    for backend in picked[:3]:
+        router.release(backend)
+    assert heavy.outstanding + light.outstanding == 3
+    assert router.stats()['dispatched'] == 6
+
+def test_a_failing_backend_is_drained_then_rejoins_after_a_probe(make_router, probes):
+    router = make_router(1, 1, failure_threshold=2, min_drain_seconds=0)
+    failing, healthy = router.backends
+
+    for _ in range(2):
+        router.release(router.acquire(exclude=[healthy]), _connection_error())
+
+    assert failing.state() == 'draining'
+    assert all(router.acquire() is healthy for _ in range(3))
+
+    probes[failing.base_url.rstrip('/') + '/models'] = (200, ['test'])
+    probes[healthy.base_url.rstrip('/') + '/models'] = (200, ['test'])
+    router.check_health()
+
+    assert failing.state() == 'healthy'
+    assert router.acquire() is failing
+    stats = router.stats()
+    assert (stats['drains'], stats['recoveries']) == (1, 1)
+
+def test_a_drained_backend_stays_out_for_the_minimum_drain_time(make_router, probes):
+    router = make_router(1, 1, failure_threshold=1, min_drain_seconds=60)
+    failing = router.backends[0]
+    router.release(router.acquire(), _connection_error())
+    probes[failing.base_url.rstrip('/') + '/models'] = (200, ['test'])
+
+    router.check_health()
+
+    assert failing.state() == 'draining'
+
+def test_rejected_requests_do_not_count_against_a_backend(make_router):
+    router = make_router(1, failure_threshold=1)
+    backend = router.backends[0]
+    request = httpx.Request('POST', 'http://fake/v1/chat/completions')
+    rejected = openai.BadRequestError('context too long', response=httpx.Response(400, request=request), body=None)
+
+    router.release(router.acquire(), rejected)
+
+    assert (backend.state(), backend.failures) == ('healthy', 0)
+
+def test_probes_mark_unreachable_or_wrong_model_backends_unhealthy(make_router, probes):
+    router = make_router(1, 1, 1, failure_threshold=5)
+    up, wrong_model, down = router.backends
+    probes[up.base_url.rstrip('/') + '/models'] = (200, ['test'])
+    probes[wrong_model.base_url.rstrip('/') + '/models'] = (200, ['other'])
+
+    router.check_health()
+
+    assert [backend.state() for backend in router.backends] == ['healthy', 'unhealthy', 'unhealthy']
+    assert 'not served' in wrong_model.last_error
+    assert 'ConnectError' in down.last_error
+    # Unhealthy backends only get requests when nothing else is left
+    assert all(router.acquire() is up for _ in range(3))
+    assert router.acquire(exclude=[up]) in (wrong_model, down)
+    assert router.stats()['fallbacks'] == 1
+
+def test_only_unopened_connections_are_retried(make_router):
+    router = make_router(1, 1, retries=1)
+    first, second = router.backends
+    timeout = openai.APITimeoutError(request=httpx.Request('POST', 'http://fake/v1/chat/completions'))
+
+    assert router.should_retry(_connection_error(), [first]) is True
+    assert router.should_retry(_connection_error(), [first, second]) is False
+    assert router.should_retry(timeout, [first]) is False
+    assert router.should_retry(ValueError('bad'), [first]) is False
+
+@pytest.mark.parametrize('raw', ['not json', '{"base_url": "http://a/v1"}', '[{"model": "x"}]'])
+def test_invalid_backend_lists_are_rejected(monkeypatch, raw):
+    monkeypatch.setenv('LLM_BACKENDS', raw)
+
+    with pytest.raises(ValueError):
+        LLMRouter.from_env('key', 'http://localhost:1234/v1', 'test')
+
+def test_a_refused_connection_moves_to_another_backend(make_llm_service):
+    down, up = FakeBackend(down=True), FakeBackend()
+    service = make_llm_service(down, up, LLM_BACKENDS=json.dumps([
+        {'name': 'down', 'base_url': 'http://127.0.0.1:9/v1'},
+        {'name': 'up', 'base_url': 'http://127.0.0.2:9/v1'},
+    ]))
+
+    data = service.generate_presentation_content('Renewable energy adoption')
+
+    assert data['title'] == DECK['title']
+    assert (len(down.requests), len(up.requests)) == (1, 1)
+    stats = service.router.stats()
+    assert stats['retries'] == 1
+    assert [backend['failures'] for backend in stats['backends']] == [1, 0]
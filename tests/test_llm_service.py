@@ -0,0 +1,199 @@
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import DECK, FakeBackend
+from src.services.llm_service import CONTINUE_PROMPT, LLMService
+
+TOPIC = 'Renewable energy adoption'
+
+def test_identical_concurrent_generations_share_one_call(make_llm_service):
+    backend = FakeBackend(delay=0.3)
+    service = make_llm_service(backend)
+
+    with ThreadPoolExecutor(6) as pool:
+        results = list(pool.map(lambda _: service.generate_presentation_content(TOPIC), range(6)))
+
+    assert len(backend.requests) == 1
+    assert all(result['title'] == DECK['title'] for result in results)
+    # Every caller gets its own copy
+    results[0]['slides'].clear()
+    assert results[1]['slides']
+    assert service.single_flight.stats()['coalesced'] == 5
+
+def test_different_topics_are_not_coalesced(make_llm_service):
+    backend = FakeBackend(delay=0.1)
+    service = make_llm_service(backend)
+
+    with ThreadPoolExecutor(2) as pool:
+        list(pool.map(service.generate_presentation_content, [TOPIC, 'Urban cycling infrastructure']))
+
+    assert len(backend.requests) == 2
+
+OUTLINE = {
+    'title': 'Quarterly Review',
+    'subtitle': 'Results and outlook',
+    'slides': [
+        {'title': 'Quarterly Review', 'type': 'title'},
+        {'title': 'Highlights', 'type': 'content'},
+        {'title': 'Risks', 'type': 'content'},
+        {'title': 'Numbers', 'type': 'table'},
+    ]
+}
+
+def _outlined_reply(on_slide=None):
+    """Answer outline requests with OUTLINE and slide requests with content for the named slide."""
+    def reply(request):
+        prompt = request['messages'][-1]['content']
+        if prompt.startswith('Create an outline'):
+            return json.dumps(OUTLINE)
+        title = prompt.split('Write slide ')[1].split('"')[1]
+        if on_slide is not None:
+            on_slide(title)
+        if title == 'Numbers':
+            return json.dumps({'title': title, 'content': [['Region', 'Sales'], ['North', '10']]})
+        return json.dumps({'title': title, 'content': [f'{title} point 1', f'{title} point 2', f'{title} point 3']})
+    return reply
+
+def test_outline_mode_writes_slides_concurrently_and_in_order(make_llm_service):
+    # Passes only if all three written slides are requested at the same time
+    barrier = threading.Barrier(3, timeout=5)
+    backend = FakeBackend(reply=_outlined_reply(lambda title: barrier.wait()))
+    service = make_llm_service(backend)
+
+    data = service.generate_presentation_content(TOPIC, mode='outline')
+
+    assert [slide['title'] for slide in data['slides']] == [entry['title'] for entry in OUTLINE['slides']]
+    assert data['slides'][0]['content'] == [OUTLINE['subtitle']]
+    assert data['slides'][1]['content'][0] == 'Highlights point 1'
+    assert data['slides'][3]['layout'] == 'table'
+    # One outline call and one call per written slide; the title slide comes from the outline
+    assert len(backend.requests) == 4
+
+def test_outline_mode_retries_only_the_failed_slide(make_llm_service):
+    failed = []
+
+    def reply(request):
+        prompt = request['messages'][-1]['content']
+        if '"Risks"' in prompt and not failed:
+            failed.append(1)
+            return 'I cannot write this slide.'
+        return _outlined_reply()(request)
+
+    backend = FakeBackend(reply=reply)
+    service = make_llm_service(backend)
+
+    data = service.generate_presentation_content(TOPIC, mode='outline')
+
+    assert data['slides'][2]['content'][0] == 'Risks point 1'
+    assert len(backend.requests) == 5
+    assert service.get_stats()['fanout']['slide_retries'] == 1
+
+def test_async_outline_mode_matches_the_sync_path(make_llm_service):
+    service = make_llm_service(FakeBackend(reply=_outlined_reply(), delay=0.05))
+
+    data = asyncio.run(service.agenerate_presentation_content(TOPIC, mode='outline'))
+
+    assert data == service.generate_presentation_content(TOPIC, mode='outline', use_cache=False)
+
+def test_malformed_replies_are_repaired_instead_of_regenerated(make_llm_service):
+    reply = 'Here is your deck:\n```json\n' + json.dumps(DECK)[:-1] + ',}\n```'
+    backend = FakeBackend(reply=lambda request: reply)
+    service = make_llm_service(backend)
+
+    data = service.generate_presentation_content(TOPIC)
+
+    assert data['slides'][0]['content'] == DECK['slides'][0]['content']
+    assert len(backend.requests) == 1
+    stats = service.get_stats()['json']
+    assert stats['repaired'] == 1
+    assert set(stats['repairs']) == {'surrounding_text', 'trailing_commas'}
+
+def test_unparseable_replies_are_logged_as_a_bounded_excerpt(make_llm_service, caplog):
+    reply = 'I cannot help with that. ' + 'x' * 5000 + ' Sorry.'
+    service = make_llm_service(FakeBackend(reply=lambda request: reply))
+
+    with caplog.at_level(logging.DEBUG, logger='src.services.llm_service'):
+        with pytest.raises(ValueError, match='invalid response format'):
+            service.generate_presentation_content(TOPIC)
+
+    raw = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Raw content')]
+    # The whole reply is only logged at DEBUG, and formatted only if a handler takes it
+    full = [record for record in caplog.records if record.msg.startswith('Unparseable')]
+    assert [(record.levelno, record.args[1]) for record in full] == [(logging.DEBUG, reply)]
+    assert all(reply not in record.getMessage() for record in caplog.records if record.levelno > logging.DEBUG)
+    assert len(raw) == 1
+    assert raw[0].startswith(f'Raw content ({len(reply)} chars): I cannot help')
+    assert raw[0].endswith('x Sorry.')
+    assert len(raw[0]) < 500
+    assert service.get_stats()['json']['unrecoverable'] == 1
+
+def _cut_reply(text, cut, overlap=0, fence=False):
+    """Reply with ``text`` cut off at the length limit after ``cut`` characters, then with the rest."""
+    def reply(request):
+        if request['messages'][-1]['content'] != CONTINUE_PROMPT:
+            return text[:cut], 'length'
+        rest = text[cut - overlap:]
+        return ('```json\n' + rest if fence else rest), 'stop'
+    return reply
+
+def test_truncated_replies_are_continued_and_stitched(make_llm_service):
+    text = json.dumps(DECK)
+    backend = FakeBackend(reply=_cut_reply(text, 60, overlap=12, fence=True))
+    service = make_llm_service(backend)
+
+    data = service.generate_presentation_content(TOPIC)
+
+    assert data == DECK
+    continuation = backend.requests[1]['messages']
+    assert continuation[-2] == {'role': 'assistant', 'content': text[:60]}
+    assert continuation[-1]['content'] == CONTINUE_PROMPT
+    usage = service.get_stats()['usage']
+    assert (usage['calls'], usage['truncated_calls'], usage['continuations']) == (2, 1, 1)
+
+def test_streamed_replies_are_continued_and_stitched(make_llm_service):
+    backend = FakeBackend(reply=_cut_reply(json.dumps(DECK), 90, overlap=20))
+    service = make_llm_service(backend)
+
+    events = list(service.stream_presentation_content(TOPIC))
+
+    slides = [payload['slide'] for event, payload in events if event == 'slide']
+    assert slides == DECK['slides']
+    assert len(backend.requests) == 2
+    assert service.get_stats()['usage']['continuations'] == 1
+
+def test_continuations_stop_at_the_configured_limit(make_llm_service):
+    def reply(request):
+        return '{"title": "Quarterly Review", "subtitle": "Results", "slides": [', 'length'
+
+    backend = FakeBackend(reply=reply)
+    service = make_llm_service(backend, LLM_MAX_CONTINUATIONS='1')
+
+    with pytest.raises(ValueError):
+        service.generate_presentation_content(TOPIC)
+
+    assert len(backend.requests) == 2
+    assert service.get_stats()['usage']['failed_requests'] == 1
+
+def test_the_token_budget_scales_with_the_slide_count(make_llm_service):
+    backend = FakeBackend()
+    service = make_llm_service(backend, LLM_MAX_TOKENS='2000', LLM_DECK_BASE_TOKENS='300',
+                               LLM_TOKENS_PER_SLIDE='200', LLM_MAX_TOKEN_BUDGET='3000')
+
+    for slide_count in (None, 5, 20):
+        service.generate_presentation_content(TOPIC, slide_count=slide_count)
+
+    assert [request['max_tokens'] for request in backend.requests] == [2000, 1300, 3000]
+
+def test_stitching_drops_fences_and_repeated_text():
+    stitch = LLMService._stitch
+
+    assert stitch('', '{"a": 1}') == '{"a": 1}'
+    assert stitch('{"title": "Quarterly', '```json\n Review"}') == ' Review"}'
+    assert stitch('{"title": "Quarterly', 'Quarterly Review"}') == ' Review"}'
+    # An overlap shorter than STITCH_MIN_OVERLAP is treated as new text
+    assert stitch('{"a": [1, 2', ', 2, 3]}') == ', 2, 3]}'
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+
+from src.utils.logging_config import JsonFormatter, _AsyncHandler, _DebugSampler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _record(msg='hello %s', args=('world',), level=logging.INFO, name='src.services.llm_service', **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_records_are_formatted_as_one_json_object():
+    record = _record(topic='Renewable energy', slides=6)
+    try:
+        raise ValueError("bad deck")
+    except ValueError:
+        record.exc_info = sys.exc_info()
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert (entry['level'], entry['logger'], entry['message']) == ('INFO', 'src.services.llm_service', 'hello world')
+    assert (entry['topic'], entry['slides']) == ('Renewable energy', 6)
+    assert entry['exception'].endswith('ValueError: bad deck')
+    assert entry['time'].endswith('+00:00')
+
+def test_debug_records_are_rate_limited_per_logger():
+    sampler = _DebugSampler(sample_rate=1.0, per_second=2)
+
+    kept = [sampler.filter(_record(level=logging.DEBUG)) for _ in range(5)]
+    other = sampler.filter(_record(level=logging.DEBUG, name='httpx'))
+    info = [sampler.filter(_record(level=logging.INFO)) for _ in range(5)]
+
+    assert kept == [True, True, False, False, False]
+    assert other is True
+    assert all(info)
+    assert sampler.rate_limited == 3
+
+def test_debug_records_can_be_sampled_out():
+    sampler = _DebugSampler(sample_rate=0.0, per_second=0)
+
+    assert not any(sampler.filter(_record(level=logging.DEBUG)) for _ in range(10))
+    assert sampler.filter(_record(level=logging.WARNING))
+    assert sampler.sampled_out == 10
+
+def test_queued_records_are_rendered_and_truncated_copies():
+    handler = _AsyncHandler(queue.Queue(10), max_message_chars=20)
+    payload = {'raw': 'x' * 100}
+    record = _record('LLM said %s', (payload,))
+    try:
+        raise RuntimeError("timeout")
+    except RuntimeError:
+        record.exc_info = sys.exc_info()
+
+    handler.handle(record)
+
+    queued = handler.queue.get_nowait()
+    assert queued is not record
+    assert queued.msg.startswith("LLM said {'raw': 'xx... [")
+    assert queued.msg.endswith(' more chars]')
+    assert (queued.args, queued.exc_info) == (None, None)
+    assert 'RuntimeError: timeout' in queued.exc_text
+    # The caller's record, and the objects it refers to, are left alone
+    assert (record.msg, record.getMessage()) == ('LLM said %s', f'LLM said {payload}')
+    assert record.exc_info is not None
+    assert handler.truncated == 1
+
+def test_a_full_queue_drops_records_instead_of_blocking():
+    handler = _AsyncHandler(queue.Queue(2), max_message_chars=0)
+
+    for _ in range(5):
+        handler.handle(_record())
+
+    assert (handler.queue.qsize(), handler.dropped) == (2, 3)
+
+def test_the_pipeline_writes_json_lines_from_parent_and_forked_child(tmp_path):
+    log_file = tmp_path / 'app.log'
+    script = '''
+import logging, os, sys
+from src.utils.logging_config import configure_logging, stats
+configure_logging()
+configure_logging()
+logging.getLogger('noisy').debug('hidden')
+logging.getLogger('app').info('from parent', extra={'request_id': 'r1'})
+pid = os.fork()
+if pid == 0:
+    logging.getLogger('app').info('from child')
+    sys.exit(0)
+os.waitpid(pid, 0)
+logging.getLogger('app').warning('parent after fork')
+assert stats()['configured']
+'''
+    env = dict(os.environ, PYTHONPATH=ROOT, LOG_FILE=str(log_file), LOG_FORMAT='json',
+               LOG_LEVEL='DEBUG', LOG_LEVELS='noisy=INFO')
+    result = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+    messages = {entry['message']: entry for entry in entries}
+    assert set(messages) == {'from parent', 'from child', 'parent after fork'}
+    assert messages['from parent']['request_id'] == 'r1'
+    assert messages['from child']['process'] != messages['from parent']['process']
+    # Console output is the same records, written once each even though configure_logging ran twice
+    assert len(result.stderr.strip().splitlines()) == 3
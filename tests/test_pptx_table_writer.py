@@ -0,0 +1,78 @@
+import io
+
+from pptx import Presentation as PPTXPresentation
+from pptx.dml.color import RGBColor
+from pptx.util import Inches
+
+from src.models import Presentation
+from src.services import pptx_table_writer
+from src.services.presentation_generator import PresentationGenerator
+
+COLORS = {
+    'primary': RGBColor(0x1A, 0x73, 0xE8),
+    'secondary': RGBColor(0xF1, 0xF3, 0xF4),
+    'background': RGBColor(0xFF, 0xFF, 0xFF),
+    'text': RGBColor(0x20, 0x21, 0x24),
+}
+
+def _table(rows):
+    prs = PPTXPresentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    pptx_table_writer.add_table(slide.shapes, rows, Inches(1), Inches(1), Inches(8), Inches(0.5), COLORS)
+    # Round-trip through a saved file, as PowerPoint would read it
+    output = io.BytesIO()
+    prs.save(output)
+    shapes = PPTXPresentation(io.BytesIO(output.getvalue())).slides[0].shapes
+    return next(shape.table for shape in shapes if shape.has_table)
+
+def _texts(table):
+    return [[cell.text for cell in row.cells] for row in table.rows]
+
+def test_short_rows_are_padded_and_text_escaped():
+    table = _table([['Region', 'Sales'], ['North', '10', 'extra'], ['<South> & "East"'], ['line one\nline two\x07', 3]])
+
+    assert _texts(table) == [
+        ['Region', 'Sales', ''],
+        ['North', '10', 'extra'],
+        ['<South> & "East"', '', ''],
+        ['line one\nline two', '3', ''],
+    ]
+
+def test_header_and_bands_are_styled():
+    table = _table([['Region', 'Sales'], ['North', '10'], ['South', '12']])
+    header, first, second = (row.cells[0] for row in table.rows)
+
+    assert header.fill.fore_color.rgb == COLORS['primary']
+    assert header.text_frame.paragraphs[0]._pPr.find(
+        '{http://schemas.openxmlformats.org/drawingml/2006/main}defRPr').get('b') == '1'
+    assert first.fill.fore_color.rgb == COLORS['secondary']
+    assert second.fill.fore_color.rgb == COLORS['background']
+    assert len(table.columns) == 2
+
+def test_long_tables_repeat_the_header_on_every_page():
+    rows = [['Region', 'Sales']] + [[f'Region {i}', str(i)] for i in range(7)]
+
+    pages = pptx_table_writer.paginate_rows(rows, 3)
+
+    assert [len(page) for page in pages] == [3, 3, 3, 2]
+    assert all(page[0] == ['Region', 'Sales'] for page in pages)
+    assert [row for page in pages for row in page[1:]] == rows[1:]
+    assert pptx_table_writer.paginate_rows(rows[:3], 3) == [rows[:3]]
+
+def test_generator_continues_long_tables_on_new_slides():
+    per_slide = PresentationGenerator.TABLE_ROWS_PER_SLIDE
+    rows = [['Region', 'Sales']] + [[f'Region {i}', str(i)] for i in range(per_slide * 2)]
+    deck = {
+        'title': 'Sales', 'subtitle': 'By region',
+        'slides': [
+            {'title': 'Sales', 'type': 'title', 'layout': 'centered', 'content': ['By region']},
+            {'title': 'Sales by region', 'type': 'table', 'layout': 'table', 'content': rows},
+        ]
+    }
+
+    data = PresentationGenerator().generate(Presentation.from_dict(deck))
+
+    slides = PPTXPresentation(io.BytesIO(data)).slides
+    titles = [shape.text_frame.text.strip() for slide in slides for shape in slide.shapes
+              if shape.has_text_frame and shape.text_frame.text.strip().startswith('Sales by region')]
+    assert titles == ['Sales by region', 'Sales by region (cont.)', 'Sales by region (cont.)']
@@ -0,0 +1,238 @@
+import asyncio
+import io
+import json
+import os
+import time
+
+import pytest
+from flask import Flask
+from lxml import etree
+from pptx import Presentation as PPTXPresentation
+
+from src.controllers.presentation_controller import PresentationController
+from src.models import Presentation
+from src.services.admission import AdmissionController
+from src.services.presentation_generator import PresentationGenerator
+
+DECK = {
+    'title': 'Quarterly Review',
+    'subtitle': 'Results and outlook',
+    'slides': [{'title': 'Highlights', 'type': 'content', 'layout': 'split', 'content': ['Revenue up']}]
+}
+
+class RecordingLLMService:
+    """Stands in for LLMService and records the options each route passes on."""
+
+    def __init__(self):
+        self.calls = []
+        self.admission = AdmissionController(enabled=False)
+
+    def generate_presentation_content(self, topic, client='local', **options):
+        self.calls.append(('generate', topic, options))
+        return json.loads(json.dumps(DECK))
+
+    async def agenerate_presentation_content(self, topic, client='local', **options):
+        self.calls.append(('agenerate', topic, options))
+        return json.loads(json.dumps(DECK))
+
+    def stream_presentation_content(self, topic, client='local', **options):
+        self.calls.append(('stream', topic, options))
+        deck = json.loads(json.dumps(DECK))
+        slides = deck.pop('slides')
+        yield 'meta', deck
+        for index, slide in enumerate(slides):
+            yield 'slide', {'index': index, 'slide': slide}
+        yield 'done', {'slide_count': len(slides)}
+
+@pytest.fixture
+def controller(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PRESENTATION_DB", str(tmp_path / "presentations.db"))
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    monkeypatch.setenv("LLM_HEALTH_INTERVAL", "0")
+    monkeypatch.setenv("EXPORT_START_METHOD", "fork")
+    monkeypatch.setenv("LOG_FILE", "")
+    controller = PresentationController()
+    controller.llm_service = RecordingLLMService()
+    yield controller
+    controller.export_jobs.shutdown()
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def client(controller):
+    # Laid out like app.py, which serves the repository's templates and static files
+    app = Flask(__name__, root_path=ROOT)
+    app.register_blueprint(controller.blueprint, url_prefix='/api')
+    return app.test_client()
+
+@pytest.mark.parametrize('body, error', [
+    (b'', 'No data provided'),
+    (b'not json', 'No data provided'),
+    (b'["a list"]', 'No data provided'),
+    (b'{"topic": "   "}', 'Please provide a presentation topic'),
+    (b'{"topic": 42}', 'Please provide a presentation topic'),
+])
+def test_generate_routes_reject_the_same_requests(client, controller, body, error):
+    for path in ('/api/generate', '/api/generate/stream'):
+        response = client.post(path, data=body, content_type='application/json')
+
+        assert response.status_code == 400
+        assert response.get_json() == {'error': error}
+
+    payload, status, _ = asyncio.run(controller.generate_preview_async(body, 'local'))
+    assert (payload, status) == ({'error': error}, 400)
+    assert controller.llm_service.calls == []
+
+@pytest.mark.parametrize('body, error', [
+    (b'["a"]', 'No data provided'),
+    (b'{"topics": ["Renewable energy adoption"], "options": "fast"}', 'Batch options must be an object'),
+    (b'{"topics": []}', 'Please provide a non-empty list of topics'),
+])
+def test_batch_rejects_malformed_requests(client, controller, body, error):
+    response = client.post('/api/generate/batch', data=body, content_type='application/json')
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
+    assert controller.llm_service.calls == []
+
+def test_generate_routes_pass_the_same_options(client, controller):
+    body = {'topic': 'Renewable energy adoption', 'fresh': True, 'mode': 'outline', 'slide_count': 6}
+
+    client.post('/api/generate', json=body)
+    client.post('/api/generate/stream', json=body).get_data()
+    asyncio.run(controller.generate_preview_async(json.dumps(body).encode(), 'local'))
+
+    assert [call[0] for call in controller.llm_service.calls] == ['generate', 'stream', 'agenerate']
+    for _, topic, options in controller.llm_service.calls:
+        assert topic == body['topic']
+        assert options == {'use_cache': False, 'mode': 'outline', 'slide_count': 6}
+
+def test_stream_stores_the_assembled_deck(client, controller):
+    response = client.post('/api/generate/stream', json={'topic': 'Renewable energy adoption'})
+    events = [
+        (block.split('\n')[0][len('event: '):], json.loads(block.split('\n')[1][len('data: '):]))
+        for block in response.get_data(as_text=True).strip().split('\n\n')
+    ]
+
+    done = dict(events)['done']
+    stored, version = controller.presentation_store.get(done['presentation_id'])
+    assert version == 1
+    assert stored['slides'] == DECK['slides']
+
+def test_export_job_runs_in_the_background(client):
+    response = client.post('/api/export/jobs', json={'format': 'pptx', 'presentation': DECK})
+    assert response.status_code == 202
+    status_url = response.headers['Location']
+
+    deadline = time.time() + 20
+    job = client.get(status_url).get_json()
+    while job['status'] in ('queued', 'running') and time.time() < deadline:
+        time.sleep(0.1)
+        job = client.get(status_url).get_json()
+
+    assert job['status'] == 'done'
+    result = client.get(job['result_url'])
+    assert len(PPTXPresentation(io.BytesIO(result.data)).slides) == len(DECK['slides'])
+    assert client.delete(status_url).get_json()['status'] == 'done'
+
+def test_export_job_api_rejects_bad_requests(client):
+    assert client.post('/api/export/jobs', json={'format': 'pptx'}).status_code == 400
+    assert client.post('/api/export/jobs', json={'format': 'docx', 'presentation': DECK}).status_code == 400
+    assert client.post('/api/export/jobs', json={'presentation_id': 'missing'}).status_code == 404
+    assert client.get('/api/export/jobs/missing').status_code == 404
+
+def test_repeated_exports_are_served_from_the_artifact_cache(client, controller):
+    first = client.post('/api/export/ppt', json={'presentation': DECK})
+    etag = first.headers['ETag']
+
+    again = client.post('/api/export/ppt', json={'presentation': DECK})
+    unchanged = client.post('/api/export/ppt', json={'presentation': DECK}, headers={'If-None-Match': etag})
+    edited = client.post('/api/export/ppt', json={'presentation': dict(DECK, title='Annual Review')})
+
+    assert first.status_code == again.status_code == 200
+    assert again.data == first.data
+    assert unchanged.status_code == 304
+    assert edited.headers['ETag'] != etag
+    stats = controller.artifact_cache.stats()
+    assert (stats['hits'], stats['misses'], stats['not_modified']) == (1, 2, 1)
+
+def test_large_decks_are_rendered_in_chunks_with_their_slide_positions(client, controller, monkeypatch):
+    rendered = []
+    monkeypatch.setattr(controller.pdf_renderer, 'max_workers', 2)
+    monkeypatch.setattr(controller.pdf_renderer, 'chunk_size', 2)
+    monkeypatch.setattr(controller.pdf_renderer, 'min_slides', 4)
+    monkeypatch.setattr(controller.pdf_renderer, 'render', lambda chunks, **options: rendered.extend(chunks) or b'%PDF')
+    slides = [{'title': f'Slide {i}', 'type': 'content', 'layout': 'split', 'content': [f'Point {i}']}
+              for i in range(5)]
+
+    deck = dict(DECK, slides=slides, theme={'background_color': '#ffffff'})
+
+    response = client.post('/api/export/pdf', json={'presentation': deck})
+
+    assert response.status_code == 200
+    assert len(rendered) == 3
+    # Only the first chunk starts with the title slide; later chunks keep their slides' positions
+    assert '<h1>Quarterly Review</h1>' in rendered[0]
+    assert all('<h1>' not in chunk for chunk in rendered[1:])
+    assert 'Point 2' in rendered[1] and 'Point 3' in rendered[1] and 'Point 4' in rendered[2]
+
+@pytest.mark.parametrize('path', ['/api/export/ppt', '/api/export/pdf'])
+def test_re_export_after_an_edit_rebuilds_only_the_changed_slide(client, controller, monkeypatch, path):
+    monkeypatch.setattr(controller.pdf_renderer, 'render', lambda chunks, **options: b'%PDF')
+    slides = [{'title': f'Slide {i}', 'type': 'content', 'layout': 'split', 'content': [f'Point {i}']}
+              for i in range(3)]
+    deck = dict(DECK, slides=slides, theme={'background_color': '#ffffff'})
+    edited = dict(deck, slides=slides[:2] + [dict(slides[2], content=['Changed'])])
+
+    first = client.post(path, json={'presentation': deck})
+    second = client.post(path, json={'presentation': edited})
+    retheme = {'background_color': '#000000', 'primary_color': '#000000'}
+    rethemed = client.post(path, json={'presentation': dict(edited, theme=retheme)})
+
+    assert (first.headers['X-Slide-Cache-Hits'], first.headers['X-Slide-Cache-Misses']) == ('0', '3')
+    assert (second.headers['X-Slide-Cache-Hits'], second.headers['X-Slide-Cache-Misses']) == ('2', '1')
+    assert rethemed.headers['X-Slide-Cache-Hits'] == '0'
+
+def test_stored_decks_are_edited_with_json_patch(client):
+    presentation_id = client.post('/api/generate', json={'topic': 'Renewable energy adoption'}).get_json()['presentation_id']
+    url = f'/api/presentations/{presentation_id}'
+    rename = [{'op': 'replace', 'path': '/slides/0/title', 'value': 'Key results'}]
+
+    fetched = client.get(url)
+    patched = client.patch(url, json={'patch': rename, 'version': 1})
+    stale = client.patch(url, json=rename, headers={'If-Match': '"1"'})
+    invalid = client.patch(url, json={'patch': [{'op': 'replace', 'path': '/slides', 'value': 'none'}]})
+    current = client.get(url)
+
+    assert (fetched.get_json()['version'], fetched.headers['ETag']) == (1, '"1"')
+    assert (patched.status_code, patched.get_json()['version'], patched.headers['ETag']) == (200, 2, '"2"')
+    assert stale.status_code == 409
+    assert invalid.status_code == 400
+    assert current.get_json()['version'] == 2
+    assert current.get_json()['presentation']['slides'][0]['title'] == 'Key results'
+
+def test_exports_can_reference_a_stored_deck(client):
+    presentation_id = client.post('/api/generate', json={'topic': 'Renewable energy adoption'}).get_json()['presentation_id']
+    url = f'/api/presentations/{presentation_id}'
+    client.patch(url, json=[{'op': 'replace', 'path': '/slides/0/title', 'value': 'Key results'}])
+
+    response = client.post('/api/export/ppt', json={'presentation_id': presentation_id})
+
+    slides = PPTXPresentation(io.BytesIO(response.data)).slides
+    assert any(shape.has_text_frame and shape.text_frame.text.strip() == 'Key results'
+               for slide in slides for shape in slide.shapes)
+    assert client.delete(url).get_json()['deleted'] is True
+    assert client.delete(url).status_code == 404
+    assert client.post('/api/export/ppt', json={'presentation_id': presentation_id}).status_code == 404
+
+def test_pptx_export_is_the_styled_generator_deck(client):
+    deck = dict(DECK, theme={'primary_color': '#123456'})
+
+    response = client.post('/api/export/ppt', json={'presentation': deck})
+
+    exported = PPTXPresentation(io.BytesIO(response.data)).slides
+    generated = PPTXPresentation(io.BytesIO(
+        PresentationGenerator().generate(Presentation.from_dict(deck)))).slides
+    assert [etree.tostring(slide._element) for slide in exported] == \
+        [etree.tostring(slide._element) for slide in generated]
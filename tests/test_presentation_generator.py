@@ -0,0 +1,86 @@
+import io
+import os
+
+from pptx import Presentation as PPTXDocument
+from pptx.oxml.ns import qn
+
+from src.models import Presentation
+from src.services.presentation_generator import PresentationGenerator
+
+DECK = {
+    'title': 'Quarterly Review',
+    'subtitle': 'Results and outlook',
+    'slides': [
+        {'title': 'Quarterly Review', 'type': 'title', 'layout': 'centered', 'content': ['Results and outlook']},
+        {'title': 'Highlights', 'type': 'content', 'layout': 'split', 'content': ['Revenue up', 'Costs down']},
+        {'title': 'Numbers', 'type': 'table', 'layout': 'table',
+         'table_data': {'headers': ['Region', 'Sales'], 'rows': [['North', '10'], ['South', '12']]}},
+    ]
+}
+
+# Child order of a:pPr (CT_TextParagraphProperties) in the DrawingML schema
+PPR_SEQUENCE = [qn(tag) for tag in (
+    'a:lnSpc', 'a:spcBef', 'a:spcAft', 'a:buClrTx', 'a:buClr', 'a:buSzTx', 'a:buSzPct', 'a:buSzPts',
+    'a:buFontTx', 'a:buFont', 'a:buNone', 'a:buAutoNum', 'a:buChar', 'a:buBlip', 'a:tabLst',
+    'a:defRPr', 'a:extLst'
+)]
+
+def _generate(deck=DECK, tally=None):
+    return PresentationGenerator().generate(Presentation.from_dict(deck), tally)
+
+def _bullet_paragraph_properties(data):
+    document = PPTXDocument(io.BytesIO(data))
+    return [
+        pPr
+        for slide in document.slides
+        for pPr in slide._element.iter(qn('a:pPr'))
+        if pPr.find(qn('a:buChar')) is not None
+    ]
+
+def test_generate_returns_a_deck_with_every_slide():
+    document = PPTXDocument(io.BytesIO(_generate()))
+
+    assert len(document.slides) == 3
+
+def test_bullet_elements_follow_schema_order():
+    bullets = _bullet_paragraph_properties(_generate())
+
+    assert len(bullets) == 2
+    for pPr in bullets:
+        tags = [child.tag for child in pPr]
+        assert tags == sorted(tags, key=PPR_SEQUENCE.index)
+        assert tags.index(qn('a:buChar')) < tags.index(qn('a:defRPr'))
+
+def test_cached_slides_are_replayed_unchanged():
+    generator = PresentationGenerator()
+    first, second = {}, {}
+    cold = generator.generate(Presentation.from_dict(DECK), first)
+    warm = generator.generate(Presentation.from_dict(DECK), second)
+
+    assert second['hits'] == len(DECK['slides'])
+    assert [child.tag for pPr in _bullet_paragraph_properties(warm) for child in pPr] == \
+        [child.tag for pPr in _bullet_paragraph_properties(cold) for child in pPr]
+
+def test_concurrent_generates_do_not_share_state():
+    from concurrent.futures import ThreadPoolExecutor
+
+    generator = PresentationGenerator()
+    decks = [dict(DECK, title=f'Deck {i}', slides=[dict(DECK['slides'][0], title=f'Deck {i}')] + DECK['slides'][1:])
+             for i in range(8)]
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda deck: generator.generate(Presentation.from_dict(deck)), decks))
+
+    assert all(len(PPTXDocument(io.BytesIO(data)).slides) == 3 for data in results)
+    # Each deck carries its own title only
+    for deck, data in zip(decks, results):
+        titles = {shape.text_frame.text.strip() for slide in PPTXDocument(io.BytesIO(data)).slides
+                  for shape in slide.shapes if shape.has_text_frame and shape.text_frame.text.strip().startswith('Deck')}
+        assert titles == {deck['title']}
+
+def test_generate_writes_nothing_to_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    data = _generate()
+
+    assert data[:2] == b'PK'
+    assert os.listdir(tmp_path) == []
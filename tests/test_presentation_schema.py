@@ -0,0 +1,81 @@
+import pytest
+
+from src.services.presentation_schema import INCOMPLETE_MESSAGE, PRESENTATION_SCHEMA, SchemaError
+
+def _deck(*slides):
+    return {'title': 'Quarterly Review', 'subtitle': 'Results and outlook', 'slides': list(slides)}
+
+def test_every_string_is_cleaned_in_one_pass():
+    deck = _deck(
+        {'title': '<b>Highlights</b>', 'type': 'content', 'layout': 'split',
+         'content': ['**Revenue**  up &amp; costs\n down'], 'notes': {'speaker': ['<i>smile</i>']}},
+        {'title': 'Numbers', 'type': 'table', 'layout': 'table', 'content': [['Region', '<b>Sales</b>'], ['North', 10]]},
+    )
+    deck['title'] = ' Quarterly   *Review* '
+
+    cleaned = PRESENTATION_SCHEMA.normalize(deck)
+
+    assert cleaned['title'] == 'Quarterly Review'
+    assert cleaned['slides'][0]['title'] == 'Highlights'
+    assert cleaned['slides'][0]['content'] == ['Revenue up & costs down']
+    assert cleaned['slides'][0]['notes'] == {'speaker': ['smile']}
+    assert cleaned['slides'][1]['content'] == [['Region', 'Sales'], ['North', 10]]
+    # The input is left as it was
+    assert deck['slides'][0]['title'] == '<b>Highlights</b>'
+
+def test_content_is_optional():
+    deck = _deck({'title': 'Thanks', 'type': 'title', 'layout': 'centered'})
+
+    assert PRESENTATION_SCHEMA.normalize(deck)['slides'][0] == {'title': 'Thanks', 'type': 'title', 'layout': 'centered'}
+
+def test_every_error_is_reported_with_its_path():
+    deck = _deck(
+        {'title': 'Highlights', 'type': 'content', 'layout': 'split', 'content': ['ok', 3]},
+        'not a slide',
+        {'title': 7, 'type': 'chart', 'content': 'text'},
+        {'title': 'Numbers', 'type': 'table', 'layout': 'table', 'content': ['not a row']},
+    )
+
+    with pytest.raises(SchemaError) as raised:
+        PRESENTATION_SCHEMA.normalize(deck)
+
+    assert str(raised.value) == "Invalid content in slide 1. Please try again."
+    assert raised.value.errors == [
+        ('slides[0].content[1]', 'expected a string, got int'),
+        ('slides[1]', 'expected an object, got str'),
+        ('slides[2].layout', 'is required'),
+        ('slides[2].title', 'expected a string, got int'),
+        ('slides[2].type', 'expected one of content, table, title, got \'chart\''),
+        ('slides[2].content', 'expected an array, got str'),
+        ('slides[3].content[0]', 'expected a table row array, got str'),
+    ]
+    assert raised.value.describe().startswith('slides[0].content[1]: expected a string, got int; slides[1]:')
+
+@pytest.mark.parametrize('data, errors', [
+    (['a list'], [('', 'expected an object, got list')]),
+    ({'slides': [{}]}, [('title', 'is required'), ('subtitle', 'is required')]),
+    ({'title': ' ', 'subtitle': None, 'slides': []},
+     [('title', 'expected a non-empty string'), ('subtitle', 'expected a non-empty string'),
+      ('slides', 'expected a non-empty array')]),
+    ({'title': 'Deck', 'subtitle': 'Sub'}, [('slides', 'is required')]),
+])
+def test_header_problems_are_reported_as_incomplete(data, errors):
+    assert PRESENTATION_SCHEMA.validate_header(data) == errors
+
+    with pytest.raises(SchemaError, match=INCOMPLETE_MESSAGE) as raised:
+        PRESENTATION_SCHEMA.normalize(data)
+    assert raised.value.errors == errors
+
+def test_the_header_check_does_not_walk_the_slides():
+    assert PRESENTATION_SCHEMA.validate_header(_deck('not a slide')) == []
+
+def test_single_slides_are_numbered_by_their_deck_position():
+    slide = {'title': 'Risks', 'type': 'content', 'layout': 'split', 'content': ['<p>Supply</p>']}
+
+    assert PRESENTATION_SCHEMA.normalize_slide(4, slide)['content'] == ['Supply']
+    with pytest.raises(SchemaError, match='Invalid layout in slide 5') as raised:
+        PRESENTATION_SCHEMA.normalize_slide(4, dict(slide, layout='grid'))
+    assert raised.value.errors[0][0] == 'slides[4].layout'
+
+def test_schema_errors_are_value_errors():
+    assert issubclass(SchemaError, ValueError)
@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+from src.services.presentation_store import PresentationStore, VersionConflictError
+from src.utils.json_patch import JsonPatchError
+
+DECK = {
+    'title': 'Quarterly Review',
+    'slides': [{'title': 'Highlights', 'type': 'content', 'layout': 'split', 'content': ['Revenue up']}]
+}
+RENAME = [{'op': 'replace', 'path': '/title', 'value': 'Annual Review'}]
+
+@pytest.fixture
+def store(tmp_path):
+    store = PresentationStore(db_path=str(tmp_path / 'presentations.db'))
+    yield store
+    store.close()
+
+def test_saved_decks_start_at_version_one(store):
+    presentation_id, version = store.save(DECK)
+
+    assert version == 1
+    assert store.get(presentation_id) == (DECK, 1)
+    assert store.get('missing') is None
+
+def test_every_patch_bumps_the_version(store):
+    presentation_id, _ = store.save(DECK)
+
+    deck, version = store.patch(presentation_id, RENAME)
+    _, version_after_second = store.patch(presentation_id, RENAME, expected_version=2)
+
+    assert (deck['title'], version, version_after_second) == ('Annual Review', 2, 3)
+    assert store.get(presentation_id) == (deck, 3)
+    assert store.patch('missing', RENAME) is None
+
+def test_stale_versions_conflict_and_change_nothing(store):
+    presentation_id, _ = store.save(DECK)
+    store.patch(presentation_id, RENAME)
+
+    with pytest.raises(VersionConflictError):
+        store.patch(presentation_id, [{'op': 'remove', 'path': '/slides/0'}], expected_version=1)
+
+    deck, version = store.get(presentation_id)
+    assert (len(deck['slides']), version) == (1, 2)
+    assert store.stats()['conflicts'] == 1
+
+def test_invalid_edits_leave_the_deck_unchanged(store):
+    presentation_id, _ = store.save(DECK)
+
+    def validate(deck):
+        if not deck['slides']:
+            raise ValueError("A deck needs at least one slide")
+
+    with pytest.raises(JsonPatchError):
+        store.patch(presentation_id, RENAME + [{'op': 'remove', 'path': '/missing'}])
+    with pytest.raises(ValueError, match='at least one slide'):
+        store.patch(presentation_id, [{'op': 'remove', 'path': '/slides/0'}], validate=validate)
+
+    assert store.get(presentation_id) == (DECK, 1)
+
+def test_deleted_decks_are_gone(store):
+    presentation_id, _ = store.save(DECK)
+
+    assert store.delete(presentation_id) is True
+    assert store.delete(presentation_id) is False
+    assert store.get(presentation_id) is None
+
+def test_decks_survive_a_restart_and_expired_ones_are_purged(tmp_path):
+    db_path = str(tmp_path / 'presentations.db')
+    first = PresentationStore(db_path=db_path)
+    kept, _ = first.save(DECK)
+    expired, _ = first.save(DECK)
+    first.close()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('UPDATE presentations SET updated_at = ? WHERE id = ?', (time.time() - 2 * 86400, expired))
+
+    second = PresentationStore(db_path=db_path, max_age_days=1)
+
+    assert second.get(kept) == (DECK, 1)
+    assert second.get(expired) is None
+    assert second.stats()['purged'] == 1
+    second.close()
+
+def test_a_forked_process_opens_its_own_connection(store):
+    presentation_id, _ = store.save(DECK)
+    inherited = store._conn
+    store._pid = -1  # as seen from a child process after fork
+
+    assert store.get(presentation_id) == (DECK, 1)
+    assert store._conn is not inherited
+    assert store._pid == os.getpid()
+    inherited.close()
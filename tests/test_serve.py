@@ -0,0 +1,75 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import serve
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_options_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("SERVE_WORKERS", "3")
+    monkeypatch.setenv("SERVE_MAX_REQUESTS", "50")
+    monkeypatch.setenv("SERVE_ACCESS_LOG", "")
+
+    options = serve.options_from_env()
+
+    assert (options['workers'], options['max_requests'], options['preload_app']) == (3, 50, True)
+    assert options['worker_class'] is serve.RecyclingThreadWorker
+    assert options['accesslog'] is None
+
+    monkeypatch.setenv("SERVE_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+    assert serve.options_from_env()['worker_class'] == 'uvicorn.workers.UvicornWorker'
+
+def test_unset_options_keep_the_gunicorn_defaults():
+    server = serve.PresentationServer({'workers': 2, 'accesslog': None, 'worker_class': serve.RecyclingThreadWorker})
+
+    assert (server.cfg.workers, server.cfg.accesslog, server.cfg.worker_class) == (2, None, serve.RecyclingThreadWorker)
+
+@pytest.fixture
+def server(tmp_path):
+    """Run serve.py with two workers that are recycled every five requests."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    env = dict(os.environ, PYTHONPATH=ROOT, SERVE_BIND=f'127.0.0.1:{port}', SERVE_WORKERS='2',
+               SERVE_MAX_REQUESTS='5', SERVE_MAX_REQUESTS_JITTER='0', LOG_FILE='',
+               LLM_HEALTH_INTERVAL='0', LLM_CACHE_ENABLED='false')
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'serve.py')], cwd=tmp_path, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}/ready'
+    deadline = time.time() + 30
+    while True:
+        try:
+            urllib.request.urlopen(url, timeout=2).close()
+            break
+        except OSError:
+            assert process.poll() is None and time.time() < deadline, "server did not start"
+            time.sleep(0.1)
+    yield process, url
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+def test_recycled_workers_drop_no_connections(server):
+    process, url = server
+
+    def ready(_):
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.status, json.loads(response.read())['pid']
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(ready, range(40)))
+
+    assert {status for status, _ in results} == {200}
+    # Forty requests at five per worker: every worker was replaced several times
+    assert len({pid for _, pid in results}) > 4
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(30) == 0
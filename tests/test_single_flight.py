@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'title': 'Deck'}
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: flight.do('key', fn), range(8)))
+
+    assert len(calls) == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(result == {'title': 'Deck'} for result, _ in results)
+    assert flight.stats()['coalesced'] == 7
+    assert flight.stats()['in_flight'] == 0
+
+def test_errors_are_shared_as_separate_objects():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def fn():
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("model unavailable")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, 'key', fn)
+        started.wait()
+        waiter = pool.submit(flight.do, 'key', fn)
+        errors = [future.exception() for future in (leader, waiter)]
+
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert errors[0] is not errors[1]
+    assert flight.stats()['shared_errors'] == 1
+
+def test_different_keys_run_independently():
+    flight = SingleFlight()
+
+    assert flight.do('a', lambda: 1) == (1, False)
+    assert flight.do('b', lambda: 2) == (2, False)
+    assert flight.stats()['executions'] == 2
+
+def test_async_waiters_hold_no_executor_threads():
+    flight = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+
+    def thread_leader():
+        def fn():
+            started.set()
+            release.wait(5)
+            return 'shared'
+        return flight.do('key', fn)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        # With one executor thread, a waiter parked on it would block to_thread below
+        loop.set_default_executor(ThreadPoolExecutor(1))
+        leader = threading.Thread(target=thread_leader)
+        leader.start()
+        started.wait()
+        waiters = [asyncio.create_task(flight.ado('key', None)) for _ in range(20)]
+        await asyncio.sleep(0.05)
+        unrelated = await asyncio.wait_for(asyncio.to_thread(lambda: 'free'), 1.0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        leader.join()
+        return unrelated, results
+
+    unrelated, results = asyncio.run(main())
+
+    assert unrelated == 'free'
+    assert results == [('shared', True)] * 20
+
+def test_cancelled_leader_hands_over_to_a_waiter():
+    flight = SingleFlight()
+    runs = []
+
+    async def fn(name):
+        runs.append(name)
+        await asyncio.sleep(0.2)
+        return name
+
+    async def main():
+        leader = asyncio.create_task(flight.ado('key', lambda: fn('leader')))
+        await asyncio.sleep(0.05)
+        waiters = [asyncio.create_task(flight.ado('key', lambda i=i: fn(f'waiter-{i}'))) for i in range(3)]
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(main())
+
+    # One waiter took over; the others share its result instead of being cancelled
+    assert len(runs) == 2
+    assert runs[0] == 'leader'
+    assert [shared for _, shared in results].count(False) == 1
+    assert {result for result, _ in results} == {runs[1]}
+    assert flight.stats()['handoffs'] == 1
+
+def test_cancelled_waiter_does_not_affect_the_leader():
+    flight = SingleFlight()
+
+    async def fn():
+        await asyncio.sleep(0.2)
+        return 'done'
+
+    async def main():
+        leader = asyncio.create_task(flight.ado('key', fn))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(flight.ado('key', fn))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        return await leader, waiter
+
+    (result, waiter) = asyncio.run(main())
+
+    assert result == ('done', False)
+    assert waiter.cancelled()
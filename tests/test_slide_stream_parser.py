@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from src.services.slide_stream_parser import SlideStreamParser
+
+DECK = {
+    'title': 'Quarterly {Review}',
+    'subtitle': 'Results, "outlook" and plans',
+    'theme': {'primary_color': '#1a73e8', 'fonts': {'title': 'Inter'}},
+    'slides': [
+        {'title': 'Highlights', 'type': 'content', 'content': ['Revenue up', 'Brackets ] and } in text']},
+        {'title': 'Numbers', 'type': 'table', 'table_data': {'headers': ['Region'], 'rows': [['North']]}},
+    ]
+}
+
+def _feed(parser, text, size):
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return events
+
+@pytest.mark.parametrize('size', [1, 7, 10000])
+def test_events_do_not_depend_on_chunking(size):
+    parser = SlideStreamParser()
+
+    events = _feed(parser, 'Here you go:\n```json\n' + json.dumps(DECK, indent=2) + '\n```', size)
+
+    assert events == [
+        ('meta', 'title', DECK['title']),
+        ('meta', 'subtitle', DECK['subtitle']),
+        ('meta', 'theme', DECK['theme']),
+        ('slide', 0, DECK['slides'][0]),
+        ('slide', 1, DECK['slides'][1]),
+    ]
+    assert parser.complete
+    assert parser.slide_count == 2
+
+def test_slides_are_reported_as_soon_as_they_close():
+    parser = SlideStreamParser()
+    text = json.dumps(DECK)
+    first_end = text.index('"Numbers"')
+
+    events = parser.feed(text[:first_end])
+
+    assert events[-1] == ('slide', 0, DECK['slides'][0])
+    assert not parser.complete
+
+def test_trailing_commas_are_tolerated_and_broken_slides_reported():
+    parser = SlideStreamParser()
+
+    events = parser.feed('{"title": "Deck", "slides": [{"title": "One", "content": ["a",],}, {"title": "Two" "x"}]}')
+
+    assert events[1] == ('slide', 0, {'title': 'One', 'content': ['a']})
+    assert events[2][:2] == ('invalid_slide', 1)
+    assert parser.slide_count == 2
+
+def test_text_after_the_object_is_ignored():
+    parser = SlideStreamParser()
+    parser.feed('{"title": "Deck", "slides": []}')
+
+    assert parser.feed('{"title": "Another"}') == []
+    assert parser.text == '{"title": "Deck", "slides": []}'
@@ -0,0 +1,59 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import types
+
+from src.utils.startup import LAZY_MODULES, StartupProfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _run_app(tmp_path, code):
+    """Import the app in a fresh interpreter, run ``code`` and return what it prints as JSON."""
+    env = dict(os.environ, PYTHONPATH=ROOT, LOG_FILE='', LLM_HEALTH_INTERVAL='0', LLM_CACHE_ENABLED='false')
+    env.pop('RENDERER_WARMUP', None)
+    script = 'import json, sys\nfrom app import app, presentation_controller\n' + code
+    result = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_renderers_are_not_imported_at_startup(tmp_path):
+    stats = _run_app(tmp_path, 'from src.utils.startup import startup_profile\n'
+                               'print(json.dumps(startup_profile.stats()))')
+
+    assert stats['loaded_renderers'] == []
+    assert list(stats['phases_ms']) == ['imports', 'init']
+
+def test_renderers_load_on_the_first_export(tmp_path):
+    loaded = _run_app(tmp_path, '''
+deck = {'title': 'Deck', 'subtitle': 'Sub', 'slides': [{'title': 'One', 'type': 'content', 'layout': 'split', 'content': ['a']}]}
+response = app.test_client().post('/api/export/ppt', json={'presentation': deck})
+assert response.status_code == 200, response.data
+print(json.dumps([name for name in ('weasyprint', 'pptx') if name in sys.modules]))
+''')
+
+    assert loaded == ['pptx']
+
+def test_the_report_flags_slow_imports_and_eager_renderers(monkeypatch, caplog):
+    profile = StartupProfile(import_budget_ms=5)
+    time.sleep(0.02)
+    profile.mark('imports')
+    profile.mark('init')
+    profile.record('renderer_warm_up', 1.5)
+    for name in LAZY_MODULES:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    monkeypatch.setitem(sys.modules, 'weasyprint', types.ModuleType('weasyprint'))
+
+    with caplog.at_level(logging.INFO, logger='src.utils.startup'):
+        profile.report()
+
+    warnings = [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING]
+    assert any('over the 5 ms budget' in message for message in warnings)
+    assert any(message.endswith('imported at startup: weasyprint') for message in warnings)
+    stats = profile.stats()
+    assert stats['phases_ms']['renderer_warm_up'] == 1500.0
+    assert stats['within_budget'] is False
+    assert stats['loaded_renderers'] == ['weasyprint']
@@ -0,0 +1,94 @@
+import io
+
+import pytest
+from pptx import Presentation as PPTXPresentation
+from pptx.util import Inches
+
+from src.models import Presentation
+from src.services.presentation_generator import PresentationGenerator
+from src.services.template_library import DEFAULT_TEMPLATE, TemplateLibrary
+
+DECK = {
+    'title': 'Quarterly Review',
+    'subtitle': 'Results and outlook',
+    'slides': [
+        {'title': 'Quarterly Review', 'type': 'title', 'layout': 'centered', 'content': ['Results and outlook']},
+        {'title': 'Highlights', 'type': 'content', 'layout': 'split', 'content': ['Revenue up', 'Costs down']},
+        {'title': 'Numbers', 'type': 'table', 'layout': 'table',
+         'table_data': {'headers': ['Region', 'Sales'], 'rows': [['North', '10']]}},
+    ]
+}
+
+def _save(prs, path):
+    prs.save(str(path))
+
+def _template_with_sample_slides(path):
+    prs = PPTXPresentation()
+    for text in ('Sample agenda', 'Sample closing'):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = text
+    _save(prs, path)
+
+def _template_with_few_layouts(path, keep=3):
+    prs = PPTXPresentation()
+    for layout in list(prs.slide_layouts)[keep:]:
+        prs.slide_layouts.remove(layout)
+    _save(prs, path)
+
+def _texts(data):
+    return [
+        shape.text_frame.text
+        for slide in PPTXPresentation(io.BytesIO(data)).slides
+        for shape in slide.shapes if shape.has_text_frame
+    ]
+
+@pytest.fixture
+def library(tmp_path):
+    _template_with_sample_slides(tmp_path / 'corporate.pptx')
+    _template_with_few_layouts(tmp_path / 'compact.pptx')
+    (tmp_path / 'broken.pptx').write_bytes(b'not a pptx')
+    return TemplateLibrary(template_dir=str(tmp_path))
+
+def test_templates_are_loaded_by_file_name(library):
+    assert library.names() == [DEFAULT_TEMPLATE, 'compact', 'corporate']
+    assert library.resolve('corporate') == 'corporate'
+    assert library.resolve('missing') == DEFAULT_TEMPLATE
+
+def test_sample_slides_are_dropped_from_templates(library):
+    assert len(library.open('corporate').slides) == 0
+
+    data = PresentationGenerator(templates=library).generate(
+        Presentation.from_dict(dict(DECK, template='corporate'))
+    )
+
+    assert len(PPTXPresentation(io.BytesIO(data)).slides) == len(DECK['slides'])
+    assert not any(text.startswith('Sample') for text in _texts(data))
+
+def test_layout_falls_back_to_the_last_layout(library):
+    prs = library.open('compact')
+
+    assert library.layout(prs, 'compact', 'Title Slide', 0).name == 'Title Slide'
+    assert library.layout(prs, 'compact', 'Blank', 6) == prs.slide_layouts[-1]
+
+def test_templates_with_few_layouts_can_be_generated(library):
+    data = PresentationGenerator(templates=library).generate(
+        Presentation.from_dict(dict(DECK, template='compact'))
+    )
+
+    assert len(PPTXPresentation(io.BytesIO(data)).slides) == len(DECK['slides'])
+
+def test_themed_master_is_built_once_per_theme(library):
+    built = []
+
+    def style_master(slide):
+        built.append(slide)
+        slide.shapes.add_shape(1, Inches(0), Inches(0), Inches(1), Inches(1))
+
+    first = library.open(DEFAULT_TEMPLATE, theme_key=('blue',), style_master=style_master)
+    second = library.open(DEFAULT_TEMPLATE, theme_key=('blue',), style_master=style_master)
+    library.open(DEFAULT_TEMPLATE, theme_key=('green',), style_master=style_master)
+
+    assert len(built) == 2
+    assert len(first.slides) == len(second.slides) == 0
+    assert len(second.slide_master.shapes) == len(PPTXPresentation().slide_master.shapes) + 1
+    assert library.stats()['themed_cached'] == 2
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from src.services.token_usage import TokenUsageRecorder
+
+def test_calls_are_summed_into_one_record_per_request():
+    recorder = TokenUsageRecorder()
+    tally = recorder.start(mode='single', slide_count=4)
+
+    recorder.add_call(tally, SimpleNamespace(prompt_tokens=100, completion_tokens=400), 'length')
+    # A streamed usage chunk arrives as a plain dict
+    recorder.add_call(tally, {'prompt_tokens': 500, 'completion_tokens': 200}, 'stop', continuation=True)
+    recorder.finish(tally, slides=4)
+
+    stats = recorder.stats()
+    record = stats['recent'][0]
+    assert (record['mode'], record['slide_count'], record['status']) == ('single', 4, 'ok')
+    assert (record['calls'], record['prompt_tokens'], record['completion_tokens']) == (2, 600, 600)
+    assert (record['truncated_calls'], record['continuations']) == (1, 1)
+    assert record['completion_tokens_per_slide'] == 150.0
+    assert (stats['requests'], stats['calls'], stats['completion_tokens_per_slide']) == (1, 2, 150.0)
+    assert '_started' not in record
+
+def test_unreported_usage_is_kept_out_of_the_per_slide_average():
+    recorder = TokenUsageRecorder()
+    reported, unreported = recorder.start(), recorder.start()
+    recorder.add_call(reported, {'prompt_tokens': 10, 'completion_tokens': 300}, 'stop')
+    recorder.add_call(unreported, None, 'stop')
+
+    recorder.finish(reported, slides=3)
+    recorder.finish(unreported, slides=5)
+
+    stats = recorder.stats()
+    assert stats['recent'][1]['completion_tokens_per_slide'] is None
+    assert (stats['slides'], stats['unreported_calls'], stats['completion_tokens_per_slide']) == (8, 1, 100.0)
+
+def test_failed_requests_are_counted_and_the_log_is_bounded():
+    recorder = TokenUsageRecorder(max_recent=2)
+    for topic in ('a', 'b', 'c'):
+        tally = recorder.start(topic=topic)
+        recorder.add_call(tally, {'prompt_tokens': 10, 'completion_tokens': 5}, 'stop')
+        recorder.finish(tally, status='error')
+
+    stats = recorder.stats()
+    assert [record['topic'] for record in stats['recent']] == ['b', 'c']
+    assert (stats['requests'], stats['failed_requests'], stats['prompt_tokens']) == (3, 3, 30)
+    assert stats['completion_tokens_per_slide'] is None
+
+def test_calls_without_a_tally_are_ignored():
+    recorder = TokenUsageRecorder()
+
+    recorder.add_call(None, {'prompt_tokens': 10}, 'stop')
+    recorder.finish(None, slides=2)
+
+    assert recorder.stats()['requests'] == 0